@@ -0,0 +1,298 @@
+import numpy as np
+
+from snake import Snake
+from food import Food
+from population_brain import PopulationBrain
+from food_sequence import FoodSequence
+from brain_config import DEFAULT_BRAIN_CONFIG
+from early_exit import CYCLE, NO_PROGRESS, THRESHOLD, end_time, can_reach_length
+import utils
+
+
+class BatchBoard:
+	# Steps one independent board per genome in lockstep, with the state of every
+	# snake held in arrays. Each board reproduces Board(..., animation_on=False).run
+	# for the same genome and seed.
+	def __init__(self, width, height, snake_genomes, num_food=1, seed=2188357, brain_dtype=np.float64, profile=None, brain_config=DEFAULT_BRAIN_CONFIG):
+		self.width = width
+		self.height = height
+		self.num_boards = len(snake_genomes)
+		self.profile = profile
+		self.num_food = num_food
+		self.brain_config = brain_config
+
+		seeds = seed if np.ndim(seed) else [seed] * self.num_boards
+		self.food_sequences = [FoodSequence(width, height, s) for s in seeds]
+
+		body_piece = Snake.BodyPiece([0,0])
+		food = Food((0,0))
+		self.body_size = body_piece.size
+		self.food_size = food.size
+		self.body_encoding = np.array(brain_config.encode(body_piece.visual_encoding), dtype=float)
+		self.food_encoding = np.array(brain_config.encode(food.visual_encoding), dtype=float)
+		self.max_history = body_piece.max_history
+
+		self.spawn_snakes(snake_genomes, seeds, brain_dtype)
+		self.foods = np.array([food_sequence.take(num_food) for food_sequence in self.food_sequences], dtype=float).reshape(self.num_boards, num_food, 2)
+
+	def spawn_snakes(self, genomes, seeds, brain_dtype):
+		n = self.num_boards
+		# genomes without weights get the random brain a Board with the same seed gives them
+		snakes = [Snake([self.width/2, self.height/2], 0, genome=genome, rng=np.random.default_rng(s), brain_config=self.brain_config) for genome, s in zip(genomes, seeds)]
+
+		self.eye_angles = np.array([s.eye_angles for s in snakes], dtype=float).reshape(n, self.brain_config.num_eyes)
+		# indexed by decision, mirroring Snake.act
+		self.turn_table = np.array([s.turns for s in snakes], dtype=float).reshape(n, len(self.brain_config.turns))
+		self.brain = PopulationBrain([s.brain for s in snakes], dtype=brain_dtype)
+		self.speed = snakes[0].speed if snakes else 0
+
+		self.direction = np.zeros(n)
+		self.is_alive = np.array([s.is_alive for s in snakes], dtype=bool)
+		self.lengths = np.ones(n, dtype=int)
+
+		capacity = 8
+		self.positions = np.zeros((n, capacity, 2))
+		self.history = np.zeros((n, capacity, self.max_history, 2))
+		self.history_counts = np.zeros((n, capacity), dtype=int)
+		self.positions[:, 0] = [self.width/2, self.height/2]
+		self.history[:, 0, 0] = self.positions[:, 0]
+		self.history_counts[:, 0] = 1
+
+	def run(self, time_limit=np.inf, time_bonus=0, max_time=np.inf, early_exit=None):
+		# early_exit, an EarlyExit, stops boards as Board.run does; exit_reasons then
+		# says which detector stopped each board, or None
+		time_limit = np.broadcast_to(np.asarray(time_limit, dtype=float), (self.num_boards,)).copy()
+		time_passed = np.zeros(self.num_boards, dtype=int)
+		if self.profile is not None:
+			self.profile.count("evaluations", self.num_boards)
+		self.exit_reasons = [None] * self.num_boards
+		self.has_exited = np.zeros(self.num_boards, dtype=bool)
+		if early_exit is not None:
+			self.start_early_exit()
+
+		while True:
+			active = np.flatnonzero(self.is_alive & ~self.has_exited & (time_passed < np.minimum(time_limit, max_time)))
+			if not len(active):
+				break
+			food_eaten = self.update(active)
+			time_limit[active] += food_eaten * time_bonus
+			time_passed[active] += 1
+			if early_exit is not None:
+				self.check_early_exit(early_exit, active, food_eaten, time_passed, time_limit, time_bonus, max_time)
+
+		return [(int(length), int(t), bool(alive)) for length, t, alive in zip(self.lengths, time_passed, self.is_alive)]
+
+	def start_early_exit(self):
+		n = self.num_boards
+		# each board's head state and body saved at the last power of two ticks since its
+		# last food, see EarlyExit.Episode
+		self.ticks_since_food = np.zeros(n, dtype=int)
+		self.saved_keys = np.zeros((n, 3), dtype=np.int64)
+		self.has_saved_key = np.zeros(n, dtype=bool)
+		self.saved_positions = np.zeros_like(self.positions)
+		self.saved_history = np.zeros_like(self.history)
+		self.saved_history_counts = np.zeros_like(self.history_counts)
+
+	def check_early_exit(self, early_exit, active, food_eaten, time_passed, time_limit, time_bonus, max_time):
+		# the same detectors, checked at the same ticks, as EarlyExit.Episode.check
+		end = np.minimum(time_limit, max_time)
+		running = self.is_alive[active] & (time_passed[active] < end[active])
+		boards = active[running]
+		ate = boards[food_eaten[running] > 0]
+		self.ticks_since_food[boards] += 1
+		self.ticks_since_food[ate] = 0
+		self.has_saved_key[ate] = False
+		limited = boards[end[boards] < np.inf]
+
+		if early_exit.detect_cycles and len(limited):
+			keys = early_exit.quantize_array(self.positions[limited, 0], self.direction[limited])
+			matches = self.has_saved_key[limited] & (keys == self.saved_keys[limited]).all(axis=1)
+			for board in limited[matches]:
+				# no food has been eaten since the body was saved, so it is as long as it was
+				length = self.lengths[board]
+				saved_body = early_exit.quantize_body(self.saved_positions[board, :length], self.saved_history[board, :length], self.saved_history_counts[board, :length])
+				if early_exit.quantize_body(self.positions[board, :length], self.history[board, :length], self.history_counts[board, :length]) == saved_body:
+					self.exit_early(board, CYCLE, time_passed, time_limit, max_time)
+			ticks = self.ticks_since_food[limited]
+			save = ((ticks & (ticks - 1)) == 0) & ~self.has_exited[limited]
+			saving = limited[save]
+			self.saved_keys[saving] = keys[save]
+			self.has_saved_key[saving] = True
+			if self.saved_positions.shape != self.positions.shape:
+				# the boards have room for longer snakes now
+				capacity = self.saved_positions.shape[1]
+				self.saved_positions, self.saved_history, self.saved_history_counts = [
+					np.concatenate([saved, np.zeros_like(current[:, capacity:])], axis=1)
+					for saved, current in [(self.saved_positions, self.positions), (self.saved_history, self.history), (self.saved_history_counts, self.history_counts)]
+				]
+			self.saved_positions[saving] = self.positions[saving]
+			self.saved_history[saving] = self.history[saving]
+			self.saved_history_counts[saving] = self.history_counts[saving]
+
+		if early_exit.no_progress_time is not None:
+			for board in limited[self.ticks_since_food[limited] >= early_exit.no_progress_time]:
+				if not self.has_exited[board]:
+					self.exit_early(board, NO_PROGRESS, time_passed, time_limit, max_time)
+
+		min_length = early_exit.min_length
+		if early_exit.pool_size is not None and early_exit.pool_size <= self.num_boards:
+			pool_min_length = np.partition(self.lengths, -early_exit.pool_size)[-early_exit.pool_size] - 1
+			min_length = pool_min_length if min_length is None else max(min_length, pool_min_length)
+		if min_length is not None:
+			checked = boards[(time_passed[boards] % early_exit.check_interval == 0) & (self.lengths[boards] < min_length)]
+			for board in checked:
+				if self.has_exited[board]:
+					continue
+				food_sequence = self.food_sequences[board]
+				upcoming = food_sequence.precompute(food_sequence.num_taken + min_length - self.lengths[board])[food_sequence.num_taken:]
+				if not can_reach_length(min_length, self.lengths[board], self.positions[board, 0], self.foods[board], upcoming, time_passed[board], time_limit[board], time_bonus, max_time):
+					self.exit_early(board, THRESHOLD, time_passed, time_limit, max_time)
+
+	def exit_early(self, board, reason, time_passed, time_limit, max_time):
+		self.has_exited[board] = True
+		self.exit_reasons[board] = reason
+		if self.profile is not None:
+			self.profile.count(reason + "_exits")
+		if reason != THRESHOLD:
+			# the snake would go on like this until the time is up
+			time_passed[board] = end_time(time_passed[board], time_limit[board], max_time)
+
+	def update(self, active):
+		if self.profile is not None:
+			return self.update_with_profile(active)
+		vision = self.look(active)
+		decisions = self.decide(active, vision)
+		self.act(active, decisions)
+		self.move(active)
+		self.check_if_touching_tail(active)
+		return self.eat(active)
+
+	def update_with_profile(self, active):
+		profile = self.profile
+		profile.start()
+		vision = self.look(active)
+		profile.lap("look")
+		decisions = self.decide(active, vision)
+		profile.lap("decide")
+		self.act(active, decisions)
+		profile.lap("act")
+		self.move(active)
+		profile.lap("move")
+		self.check_if_touching_tail(active)
+		profile.lap("check_tail")
+		food_eaten = self.eat(active) # respawns too
+		profile.lap("eat")
+		profile.count("ticks", len(active))
+		profile.count("food_eaten", int(food_eaten.sum()))
+		return food_eaten
+
+	def look(self, active):
+		lengths = self.lengths[active]
+		heads = self.positions[active, 0]
+		tails = self.positions[active, 2:]
+		n, num_food, num_tail = len(active), self.num_food, tails.shape[1]
+
+		# same object order as Snake.look: foods, then body[2:]
+		objects = np.concatenate([self.foods[active], tails], axis=1)
+		sizes = np.concatenate([np.full(num_food, self.food_size, dtype=float), np.full(num_tail, self.body_size, dtype=float)])
+		is_present = np.concatenate([np.ones((n, num_food), dtype=bool), np.arange(2, 2 + num_tail) < lengths[:, None]], axis=1)
+		if self.profile is not None:
+			self.profile.count("objects_seen", int(is_present.sum()))
+
+		distances = utils.calc_distances(heads, objects)
+		angles = utils.calc_angles(heads, objects)
+		with np.errstate(divide='ignore', invalid='ignore'):
+			view_angle_freedom = np.where(distances >= sizes, np.arcsin(sizes / distances), 2*np.pi)
+
+		view_angles = (self.eye_angles[active] + self.direction[active, None]) % (2*np.pi)
+		can_see = is_present[:, None, :] & (np.abs(view_angles[..., None] - angles[:, None, :]) <= view_angle_freedom[:, None, :])
+		seen_distances = np.where(can_see, distances[:, None, :], np.inf)
+
+		# Snake.look keeps the last of several equally close objects
+		num_objects = objects.shape[1]
+		closest = num_objects - 1 - np.argmin(seen_distances[..., ::-1], axis=-1) if num_objects else np.zeros(can_see.shape[:2], dtype=int)
+		sees_something = can_see.any(axis=-1)
+
+		encodings = np.where((closest < num_food)[..., None], self.food_encoding, self.body_encoding)
+		closest_distances = np.take_along_axis(distances, closest.reshape(n, -1), axis=1) if num_objects else np.zeros(sees_something.shape)
+		visuals = np.concatenate([encodings, closest_distances[..., None]], axis=-1)
+		visuals[~sees_something] = 0
+		return visuals.reshape(n, -1)
+
+	def decide(self, active, information):
+		return self.brain.decide(information, rows=active)
+
+	def act(self, active, decisions):
+		angles = self.turn_table[active, decisions]
+		turning = angles != 0
+		self.direction[active[turning]] = (self.direction[active[turning]] + angles[turning]) % (2*np.pi)
+
+	def move(self, active):
+		lengths = self.lengths[active]
+		positions = self.positions[active]
+		history = self.history[active]
+		counts = self.history_counts[active]
+		n, capacity = counts.shape
+
+		# each piece follows the oldest entry of the preceding piece's history, as it
+		# stands after that piece has moved (the entry drops off once history is full)
+		oldest = np.where((counts[:, :-1] < self.max_history)[..., None], history[:, :-1, 0], history[:, :-1, 1])
+		next_positions = np.empty_like(positions)
+		direction = self.direction[active]
+		next_positions[:, 0, 0] = positions[:, 0, 0] + self.speed * np.cos(direction)
+		next_positions[:, 0, 1] = positions[:, 0, 1] + self.speed * np.sin(direction)
+		next_positions[:, 1:] = oldest
+
+		is_piece = np.arange(capacity) < lengths[:, None]
+		positions = np.where(is_piece[..., None], next_positions, positions)
+
+		is_full = is_piece & (counts == self.max_history)
+		history[is_full, :-1] = history[is_full, 1:]
+		slots = np.minimum(counts, self.max_history - 1)
+		rows, pieces = np.nonzero(is_piece)
+		history[rows, pieces, slots[rows, pieces]] = positions[rows, pieces]
+		counts = np.where(is_piece, np.minimum(counts + 1, self.max_history), counts)
+
+		self.positions[active] = positions
+		self.history[active] = history
+		self.history_counts[active] = counts
+
+	def check_if_touching_tail(self, active):
+		heads = self.positions[active, 0]
+		tails = self.positions[active, 2:]
+		is_tail = np.arange(2, 2 + tails.shape[1]) < self.lengths[active, None]
+		touching = (is_tail & utils.find_touching(heads, np.full(len(heads), self.body_size), tails, self.body_size)).any(axis=1)
+		self.is_alive[active[touching]] = False
+
+	def eat(self, active):
+		heads = self.positions[active, 0]
+		foods = self.foods[active]
+		eaten = utils.find_touching(heads, np.full(len(heads), self.body_size), foods, self.food_size)
+		food_eaten = eaten.sum(axis=1)
+
+		for i in np.flatnonzero(food_eaten):
+			board = active[i]
+			self.grow(board, food_eaten[i])
+			# uneaten food keeps its order and new food is appended, as in Board.update
+			remaining = foods[i][~eaten[i]]
+			self.foods[board] = np.concatenate([remaining, self.food_sequences[board].take(food_eaten[i])])
+		return food_eaten
+
+	def grow(self, board, num):
+		length = self.lengths[board]
+		self.ensure_capacity(length + num)
+		position = self.history[board, length - 1, 0]
+		self.positions[board, length:length + num] = position
+		self.history[board, length:length + num, 0] = position
+		self.history_counts[board, length:length + num] = 1
+		self.lengths[board] += num
+
+	def ensure_capacity(self, length):
+		capacity = self.positions.shape[1]
+		if length <= capacity:
+			return
+		extra = max(length, 2*capacity) - capacity
+		n = self.num_boards
+		self.positions = np.concatenate([self.positions, np.zeros((n, extra, 2))], axis=1)
+		self.history = np.concatenate([self.history, np.zeros((n, extra, self.max_history, 2))], axis=1)
+		self.history_counts = np.concatenate([self.history_counts, np.zeros((n, extra), dtype=int)], axis=1)
@@ -0,0 +1,39 @@
+import sys
+import time
+import random
+
+from board import Board
+from batch_board import BatchBoard
+from brain_config import BrainConfig
+from genomes import generate_random_genome
+
+CONFIGS = [
+	("default", BrainConfig()),
+	("3 eyes", BrainConfig(num_eye_angles=1)),
+	("hidden 6", BrainConfig(hidden_width=6)),
+	("signed", BrainConfig(encoding="signed")),
+	("3 eyes, hidden 6, signed", BrainConfig(num_eye_angles=1, hidden_width=6, encoding="signed"))
+]
+
+
+def time_ticks(run):
+	start = time.perf_counter()
+	results = run()
+	return sum(t for length, t, alive in results) / (time.perf_counter() - start)
+
+def main(population_size=200, num_food=5):
+	# the cost of a tick for random snakes of each brain, on Board and on BatchBoard
+	params = {"width": 400, "height": 300, "num_food": num_food, "seed": 1}
+	run_params = {"time_limit": 500, "max_time": 500}
+	print('{:>26} {:>8} {:>12} {:>12}'.format('', 'genes', 'board', 'batch board'))
+	for name, brain_config in CONFIGS:
+		rng = random.Random(1)
+		genomes = [generate_random_genome(rng, max_eye_angle=1, brain_config=brain_config) for _ in range(population_size)]
+		board_ticks = time_ticks(lambda: [Board(snake_genome=genome, animation_on=False, brain_config=brain_config, **params).run(**run_params) for genome in genomes[:population_size // 10]])
+		batch_ticks = time_ticks(lambda: BatchBoard(snake_genomes=genomes, brain_config=brain_config, **params).run(**run_params))
+		print('{:>26} {:>8} {:>12.0f} {:>12.0f}'.format(name, brain_config.genome_size, board_ticks, batch_ticks))
+	print('(ticks per second)')
+
+
+if __name__ == '__main__':
+	main(*[int(arg) for arg in sys.argv[1:]])
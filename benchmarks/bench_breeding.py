@@ -0,0 +1,23 @@
+import sys
+import time
+import numpy as np
+
+from evolver import Evolver
+
+
+def time_breeding(evolver, population_size):
+	gene_pool = evolver.generate_random_genes(population_size)
+	scores = np.random.default_rng(0).random(population_size) * 1000
+	results = [[score, genes] for score, genes in zip(scores, gene_pool)]
+	start = time.perf_counter()
+	evolver.generate_next_generation(results)
+	return time.perf_counter() - start
+
+def main(population_size=10000):
+	lists = time_breeding(Evolver(1, population_size, population_size // 10), population_size)
+	arrays = time_breeding(Evolver(1, population_size, population_size // 10, vectorized=True, seed=0), population_size)
+	print('breeding {} genomes: lists {:.1f} ms, arrays {:.1f} ms, speedup {:.0f}x'.format(population_size, lists * 1e3, arrays * 1e3, lists / arrays))
+
+
+if __name__ == '__main__':
+	main(*[int(arg) for arg in sys.argv[1:]])
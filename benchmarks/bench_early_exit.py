@@ -0,0 +1,48 @@
+import sys
+import time
+import random
+
+from batch_board import BatchBoard
+from early_exit import EarlyExit, DETECTORS
+from genomes import load_samples, generate_population, generate_random_genome
+from profiling import Profile
+import evolution
+
+DETECTOR_SETS = [
+	("none", None),
+	("cycles", EarlyExit()),
+	("coarse cycles", EarlyExit(position_quantum=0.1, angle_quantum=0.01)),
+	("pool", EarlyExit(detect_cycles=False, pool_size=15)),
+	("no progress", EarlyExit(detect_cycles=False, no_progress_time=150)),
+]
+
+
+def run_batch(genomes, seed, early_exit):
+	profile = Profile()
+	board = BatchBoard(snake_genomes=genomes, profile=profile, **dict(evolution.board_params, seed=seed))
+	start = time.perf_counter()
+	results = board.run(early_exit=early_exit, **evolution.run_params)
+	return time.perf_counter() - start, profile.counts, [evolution.calc_score(*result) for result in results]
+
+def top(scores, num):
+	return set(sorted(range(len(scores)), key=lambda i: scores[i])[-num:])
+
+def main(population_size=256, num_seeds=3, top_size=15):
+	# half mutated samples, half random genomes, as in early generations
+	rng = random.Random(0)
+	genomes = generate_population(load_samples(), population_size // 2, rng) + [generate_random_genome(rng) for _ in range(population_size - population_size // 2)]
+	seeds = list(range(num_seeds))
+	print('{:>14} {:>8} {:>8} {:>8} {:>8} {:>11} {:>9} {:>8} {:>8}'.format('', 'ticks', 'saved', 'seconds', *DETECTORS, 'changed', 'top same'))
+	full = [run_batch(genomes, seed, None) for seed in seeds]
+	full_ticks = sum(counts["ticks"] for seconds, counts, scores in full)
+	for name, early_exit in DETECTOR_SETS:
+		runs = [run_batch(genomes, seed, early_exit) for seed in seeds]
+		ticks = sum(counts["ticks"] for seconds, counts, scores in runs)
+		exits = [sum(counts[detector + "_exits"] for seconds, counts, scores in runs) for detector in DETECTORS]
+		changed = sum(a != b for run, full_run in zip(runs, full) for a, b in zip(run[2], full_run[2]))
+		top_same = all(top(run[2], top_size) == top(full_run[2], top_size) for run, full_run in zip(runs, full))
+		print('{:>14} {:>8} {:>7.1f}% {:>8.2f} {:>8} {:>11} {:>9} {:>8} {:>8}'.format(name, ticks, 100 * (1 - ticks / full_ticks), sum(run[0] for run in runs), *exits, changed, 'yes' if top_same else 'no'))
+
+
+if __name__ == '__main__':
+	main(*[int(arg) for arg in sys.argv[1:]])
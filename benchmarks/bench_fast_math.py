@@ -0,0 +1,61 @@
+import sys
+import time
+
+from board import Board
+from fast_math import FastMath
+from genomes import load_samples
+
+
+def compare_decisions(genome, seed, params, run_params):
+	# plays the exact episode and, every tick, also looks and decides with fast math from
+	# the same state; returns the ticks and how many of them the vision, the decision made
+	# from the exact vision and the decision made from fast math's own vision differed on
+	board = Board(snake_genome=genome, seed=seed, animation_on=False, **params)
+	snake = board.snake
+	fast_math = FastMath()
+	ticks = vision_differences = brain_differences = decision_differences = 0
+	time_passed, time_limit = 0, run_params["time_limit"]
+	while snake.is_alive and time_passed < min(time_limit, run_params["max_time"]):
+		vision = snake.look(board.foods)
+		fast_vision = fast_math.look(snake.body[0].position, snake.direction, snake.eye_angles, board.foods + snake.body[2:], [food.position for food in board.foods] + snake.body.positions[2:len(snake.body)].tolist())
+		ticks += 1
+		decision = int(snake.decide(vision))
+		vision_differences += vision != fast_vision
+		brain_differences += decision != int(fast_math.decide(snake.brain.layers, vision))
+		decision_differences += decision != int(fast_math.decide(snake.brain.layers, fast_vision))
+
+		starting_length = len(snake.body)
+		board.update()
+		time_limit += (len(snake.body) - starting_length) * run_params.get("time_bonus", 0)
+		time_passed += 1
+	return ticks, vision_differences, brain_differences, decision_differences
+
+def time_episodes(genomes, seeds, params, run_params, use_fast_math):
+	start = time.perf_counter()
+	results = [Board(snake_genome=genome, seed=seed, animation_on=False, use_fast_math=use_fast_math, **params).run(**run_params) for genome in genomes for seed in seeds]
+	return time.perf_counter() - start, results
+
+def main(num_seeds=5, num_food=5):
+	genomes = load_samples()
+	seeds = list(range(num_seeds))
+	params = {"width": 400, "height": 300, "num_food": num_food}
+	run_params = {"time_limit": 2000, "max_time": 2000}
+
+	counts = [compare_decisions(genome, seed, params, run_params) for genome in genomes for seed in seeds]
+	ticks, vision_differences, brain_differences, decision_differences = [sum(column) for column in zip(*counts)]
+	print('ticks played exactly: {}'.format(ticks))
+	print('fast math saw differently on {:.3%}, decided differently from the same vision on {:.3%} and decided differently overall on {:.3%} of them'.format(vision_differences / ticks, brain_differences / ticks, decision_differences / ticks))
+
+	exact_seconds, exact_results = time_episodes(genomes, seeds, params, run_params, False)
+	fast_seconds, fast_results = time_episodes(genomes, seeds, params, run_params, True)
+	exact_ticks = sum(t for length, t, alive in exact_results)
+	fast_ticks = sum(t for length, t, alive in fast_results)
+	print('{:>6} {:>16} {:>8}'.format('', 'ticks per second', 'speedup'))
+	print('{:>6} {:>16.0f}'.format('exact', exact_ticks / exact_seconds))
+	print('{:>6} {:>16.0f} {:>8.2f}'.format('fast', fast_ticks / fast_seconds, (fast_ticks / fast_seconds) / (exact_ticks / exact_seconds)))
+	changed = sum(a != b for a, b in zip(exact_results, fast_results))
+	print('episodes that ended differently: {} of {}'.format(changed, len(exact_results)))
+
+
+if __name__ == '__main__':
+	main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,50 @@
+import sys
+import random
+
+import evolution
+import profiling
+from multi_fidelity import SuccessiveHalvingFitness
+from multi_seed_fitness import MultiSeedFitness
+from genomes import load_samples, generate_population, generate_random_genome
+
+SEEDS = [98, 99, 100]
+RUNGS = [
+	{"seeds": SEEDS[:1], "max_time": 200},
+	{"seeds": SEEDS[:1], "max_time": 1000},
+	{"seeds": SEEDS, "max_time": 1000},
+]
+
+
+def count_ticks(fitness_function, genomes):
+	# the fitness and the snake ticks it took; evolution's boards profile into
+	# profiling.collected while its storage_options ask for a profile
+	evolution.storage_options["profile"] = {}
+	profiling.drain()
+	fitness = fitness_function(genomes)
+	return fitness, profiling.drain().counts["ticks"]
+
+def top(fitness, num):
+	return set(sorted(range(len(fitness)), key=lambda i: fitness[i])[-num:])
+
+def main(population_size=1000, eta=4, pool_size=30):
+	# half mutated samples, half random genomes, as in early generations
+	rng = random.Random(0)
+	genomes = generate_population(load_samples(), population_size // 2, rng) + [generate_random_genome(rng) for _ in range(population_size - population_size // 2)]
+
+	full_fitness, full_ticks = count_ticks(MultiSeedFitness(evolution.population_fitness_function, SEEDS), genomes)
+	halving = SuccessiveHalvingFitness(evolution.population_fitness_function, RUNGS, eta=eta, min_promoted=pool_size)
+	halving_fitness, halving_ticks = count_ticks(halving, genomes)
+
+	best = top(full_fitness, pool_size)
+	print('genomes per rung: {}'.format(halving.history[-1]["rung_sizes"]))
+	print('ticks: {} with every genome on every seed, {} with successive halving ({:.1f}x fewer)'.format(full_ticks, halving_ticks, full_ticks / halving_ticks))
+	print('top {} in common: {}; full fitness of the top {} picked: {:.2f} (best possible {:.2f})'.format(
+		pool_size, len(best & top(halving_fitness, pool_size)), pool_size,
+		sum(full_fitness[i] for i in top(halving_fitness, pool_size)) / pool_size, sum(full_fitness[i] for i in best) / pool_size
+	))
+	same = sum(full_fitness[i] == halving_fitness[i] for i in top(halving_fitness, pool_size))
+	print('top {} picked with full fidelity scores: {}'.format(pool_size, same))
+
+
+if __name__ == '__main__':
+	main(*[int(arg) for arg in sys.argv[1:]])
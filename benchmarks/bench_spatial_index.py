@@ -0,0 +1,39 @@
+import sys
+import time
+import random
+
+from board import Board
+from spatial_grid import SpatialGrid
+from genomes import generate_random_genome
+
+
+def build_board(length, num_food, use_spatial_index, seed=3):
+	board = Board(400, 300, snake_genome=dict(generate_random_genome(random.Random(seed)), eye_angles=[0.3, 1.2]), num_food=num_food, seed=seed, animation_on=False, use_spatial_index=use_spatial_index)
+	snake = board.snake
+	# coil the snake up so its body is spread out rather than stacked on one point
+	for _ in range(length - 1):
+		snake.grow()
+	for _ in range(snake.body[0].max_history * length):
+		snake.turn(0.02)
+		snake.move()
+	return board
+
+def time_ticks(board, num_ticks):
+	start = time.perf_counter()
+	for _ in range(num_ticks):
+		board.update()
+	return (time.perf_counter() - start) / num_ticks
+
+def main(num_ticks=200):
+	# index us keeps the index whatever the size, default us uses it only where
+	# SpatialGrid's thresholds say it pays off
+	print('{:>7} {:>6} {:>12} {:>12} {:>8} {:>12} {:>8}'.format('length', 'foods', 'scan us', 'index us', 'speedup', 'default us', 'speedup'))
+	for num_food in [1, 25, 100, 200]:
+		for length in [1, 50, 200, 800]:
+			scan = time_ticks(build_board(length, num_food, False), num_ticks)
+			indexed = time_ticks(build_board(length, num_food, SpatialGrid(min_foods=0, foods_per_piece=0)), num_ticks)
+			default = time_ticks(build_board(length, num_food, True), num_ticks)
+			print('{:>7} {:>6} {:>12.1f} {:>12.1f} {:>8.2f} {:>12.1f} {:>8.2f}'.format(length, num_food, scan * 1e6, indexed * 1e6, scan / indexed, default * 1e6, scan / default))
+
+if __name__ == '__main__':
+	main(*[int(arg) for arg in sys.argv[1:]])
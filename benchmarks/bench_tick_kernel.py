@@ -0,0 +1,33 @@
+import sys
+import time
+
+import tick_kernel
+from board import Board
+from genomes import load_samples
+
+
+def time_episodes(run_episode, genomes, seeds):
+	start = time.perf_counter()
+	results = [run_episode(genome, seed) for genome in genomes for seed in seeds]
+	return time.perf_counter() - start, results
+
+def main(num_seeds=10, num_food=5):
+	genomes = load_samples()
+	seeds = list(range(num_seeds))
+	params = {"width": 400, "height": 300, "num_food": num_food}
+	run_params = {"time_limit": 2000, "max_time": 2000}
+	# the first call compiles the kernel
+	tick_kernel.run(snake_genome=genomes[0], **params, **run_params)
+
+	board_seconds, board_results = time_episodes(lambda genome, seed: Board(snake_genome=genome, seed=seed, animation_on=False, **params).run(**run_params), genomes, seeds)
+	kernel_seconds, kernel_results = time_episodes(lambda genome, seed: tick_kernel.run(snake_genome=genome, seed=seed, **params, **run_params), genomes, seeds)
+	ticks = sum(t for length, t, alive in board_results)
+	print('numba: {}'.format('yes' if tick_kernel.compiled_run_episode is not None else 'no, the kernel runs as plain Python'))
+	print('{:>8} {:>16} {:>8}'.format('', 'ticks per second', 'speedup'))
+	print('{:>8} {:>16.0f}'.format('board', ticks / board_seconds))
+	print('{:>8} {:>16.0f} {:>8.2f}'.format('kernel', ticks / kernel_seconds, board_seconds / kernel_seconds))
+	print('same results: {}'.format(board_results == kernel_results))
+
+
+if __name__ == '__main__':
+	main(*[int(arg) for arg in sys.argv[1:]])
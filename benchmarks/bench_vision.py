@@ -0,0 +1,33 @@
+import sys
+import time
+
+from vision_prefilter import VisionPrefilter
+from benchmarks.bench_spatial_index import build_board
+
+
+def time_looks(board, num_ticks):
+	# only look is timed; the board moves on between looks so the geometry changes
+	total = 0
+	for _ in range(num_ticks):
+		start = time.perf_counter()
+		board.snake.look(board.foods)
+		total += time.perf_counter() - start
+		board.update()
+	return total / num_ticks
+
+def main(num_ticks=200):
+	# filtered us always prefilters, default us only from VisionPrefilter's min_objects on
+	print('{:>7} {:>6} {:>12} {:>12} {:>8} {:>12} {:>8}'.format('length', 'foods', 'scan us', 'filtered us', 'speedup', 'default us', 'speedup'))
+	for num_food in [1, 25, 100]:
+		for length in [1, 10, 50, 200, 800]:
+			scan = time_looks(build_board(length, num_food, False), num_ticks)
+			timings = []
+			for vision_prefilter in [VisionPrefilter(min_objects=0), VisionPrefilter()]:
+				board = build_board(length, num_food, False)
+				board.snake.vision_prefilter = vision_prefilter
+				timings.append(time_looks(board, num_ticks))
+			filtered, default = timings
+			print('{:>7} {:>6} {:>12.1f} {:>12.1f} {:>8.2f} {:>12.1f} {:>8.2f}'.format(length, num_food, scan * 1e6, filtered * 1e6, scan / filtered, default * 1e6, scan / default))
+
+if __name__ == '__main__':
+	main(*[int(arg) for arg in sys.argv[1:]])
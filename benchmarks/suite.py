@@ -0,0 +1,148 @@
+import gc
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import numpy as np
+
+import evolution
+from board import Board
+from evolver import Evolver
+from genomes import load_samples, generate_population
+from benchmarks.bench_spatial_index import build_board, time_ticks
+from benchmarks.bench_breeding import time_breeding
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def fastest(timer, repeat):
+	# timer runs once and returns how long the part it times took; the fastest of
+	# repeat runs after a warm-up run is kept, with the garbage collector off as in timeit
+	timer()
+	gc.disable()
+	try:
+		return min(timer() for _ in range(repeat))
+	finally:
+		gc.enable()
+
+def best_time(function, repeat):
+	# fastest for a whole function call; the result of the last call comes back too
+	results = []
+	def timer():
+		start = time.perf_counter()
+		results.append(function())
+		return time.perf_counter() - start
+	return fastest(timer, repeat), results[-1]
+
+def bench_board(samples, repeat):
+	def run():
+		return [Board(400, 300, snake_genome=genome, num_food=5, seed=seed, animation_on=False).run(time_limit=2000, max_time=2000) for genome in samples for seed in [1, 2, 3]]
+	seconds, results = best_time(run, repeat)
+	ticks = sum(t for length, t, alive in results)
+	return {"board_ticks_per_second": ticks / seconds}, {"board_results": [list(result) for result in results]}
+
+def bench_look(samples, repeat):
+	def run():
+		board = Board(400, 300, snake_genome=samples[0], num_food=25, seed=1, animation_on=False)
+		for _ in range(300):
+			board.snake.grow()
+		looks = []
+		for _ in range(200):
+			looks.append(board.snake.look(board.foods))
+			board.snake.turn(0.05)
+			board.snake.move()
+		return looks
+	seconds, looks = best_time(run, repeat)
+	return {"look_microseconds": seconds / len(looks) * 1e6}, {"look_checksum": float(np.sum(looks))}
+
+def bench_fitness(population, repeat):
+	seconds, scores = best_time(lambda: [evolution.fitness_function(genome) for genome in population], repeat)
+	batch_seconds, batch_scores = best_time(lambda: evolution.population_fitness_function(population), repeat)
+	metrics = {
+		"fitness_evaluations_per_second": len(population) / seconds,
+		"batch_fitness_evaluations_per_second": len(population) / batch_seconds
+	}
+	return metrics, {"fitness_scores": scores, "batch_fitness_scores": batch_scores}
+
+def bench_breeding(repeat, population_size=2000):
+	lists = fastest(lambda: time_breeding(Evolver(1, population_size, population_size // 10), population_size), repeat)
+	arrays = fastest(lambda: time_breeding(Evolver(1, population_size, population_size // 10, vectorized=True, seed=0), population_size), repeat)
+	return {"breeding_milliseconds": lists * 1e3, "vectorized_breeding_milliseconds": arrays * 1e3}, {}
+
+def bench_scaling(repeat, num_ticks=500):
+	metrics = {}
+	for num_food in [1, 25, 100]:
+		for length in [1, 50, 200]:
+			seconds = fastest(lambda: time_ticks(build_board(length, num_food, False), num_ticks), repeat)
+			metrics["tick_microseconds_length_{}_food_{}".format(length, num_food)] = seconds * 1e6
+	return metrics, {}
+
+def run_suite(repeat=5):
+	samples = load_samples()
+	population = generate_population(samples, 64, random.Random(7))
+	metrics, checks = {}, {}
+	for bench in [
+		lambda: bench_board(samples, repeat),
+		lambda: bench_look(samples, repeat),
+		lambda: bench_fitness(population, repeat),
+		lambda: bench_breeding(repeat),
+		lambda: bench_scaling(repeat)
+	]:
+		bench_metrics, bench_checks = bench()
+		metrics.update(bench_metrics)
+		checks.update(bench_checks)
+	machine = {"python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform(), "cpus": os.cpu_count()}
+	return {"machine": machine, "metrics": metrics, "checks": checks}
+
+def is_rate(metric):
+	return metric.endswith("per_second")
+
+def compare(results, baseline, tolerance):
+	# speed relative to the baseline (above 1 is faster); slower than 1/tolerance is a regression
+	regressions = []
+	print('{:<45} {:>14} {:>14} {:>8}'.format('metric', 'baseline', 'current', 'speed'))
+	for metric, value in results["metrics"].items():
+		if metric not in baseline["metrics"]:
+			print('{:<45} {:>14} {:>14.2f}'.format(metric, '-', value))
+			continue
+		baseline_value = baseline["metrics"][metric]
+		speed = value / baseline_value if is_rate(metric) else baseline_value / value
+		flag = ' REGRESSION' if speed < 1 / tolerance else ''
+		print('{:<45} {:>14.2f} {:>14.2f} {:>7.2f}x{}'.format(metric, baseline_value, value, speed, flag))
+		if flag:
+			regressions.append(metric)
+
+	changed = [check for check, value in results["checks"].items() if baseline["checks"].get(check, value) != value]
+	for check in changed:
+		print('{} differs from the baseline: the simulation no longer does the same work for the same seeds'.format(check))
+	if baseline["machine"] != results["machine"]:
+		print('the baseline was recorded on {}'.format(baseline["machine"]))
+	return regressions, changed
+
+def main():
+	parser = argparse.ArgumentParser(description='Time the simulation and evolution hot paths and compare them against a baseline.')
+	parser.add_argument('--baseline', default=BASELINE_PATH)
+	parser.add_argument('--save-baseline', action='store_true', help='store this run as the baseline instead of comparing')
+	parser.add_argument('--tolerance', type=float, default=1.5, help='how many times slower than the baseline counts as a regression')
+	parser.add_argument('--repeat', type=int, default=5)
+	args = parser.parse_args()
+
+	results = run_suite(args.repeat)
+
+	if args.save_baseline or not os.path.exists(args.baseline):
+		with open(args.baseline, 'w') as f:
+			json.dump(results, f, indent=1)
+		print('baseline saved to {}'.format(args.baseline))
+		return 0
+
+	with open(args.baseline, 'r') as f:
+		baseline = json.load(f)
+	regressions, changed = compare(results, baseline, args.tolerance)
+	return 1 if regressions or changed else 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -1,22 +1,36 @@
-import sys
 import numpy as np
-import random
-import pygame
-from pygame.locals import *
 
 from snake import Snake
 from food import Food
+from spatial_grid import SpatialGrid
+from vision_prefilter import VisionPrefilter
+from food_sequence import FoodSequence
+from fast_math import FastMath
+from brain_config import DEFAULT_BRAIN_CONFIG
+from early_exit import THRESHOLD, end_time
 import utils
 
 
 class Board:
-	def __init__(self, width, height, snake_genome=[0,0], num_food=1, seed=2188357, animation_on=True):
+	def __init__(self, width, height, snake_genome=[0,0], num_food=1, seed=2188357, animation_on=True, use_spatial_index=False, use_vision_prefilter=False, use_fast_math=False, profile=None, recorder=None, brain_config=DEFAULT_BRAIN_CONFIG):
 		self.width = width
 		self.height = height
 		self.animation_on = animation_on
 		self.color = (34, 139, 34)
-
-		random.seed(seed)
+		# use_spatial_index and use_vision_prefilter may also be the SpatialGrid or
+		# VisionPrefilter to use, e.g. one with other thresholds
+		self.spatial_index = use_spatial_index if isinstance(use_spatial_index, SpatialGrid) else SpatialGrid() if use_spatial_index else None
+		if self.spatial_index is not None and not self.spatial_index.pays_off(num_food, 1):
+			self.spatial_index = None
+		self.vision_prefilter = use_vision_prefilter if isinstance(use_vision_prefilter, VisionPrefilter) else VisionPrefilter() if use_vision_prefilter else None
+		self.fast_math = FastMath() if use_fast_math else None
+		self.profile = profile
+		self.recorder = recorder
+		self.brain_config = brain_config
+
+		# the board's own generators, so boards never share random state
+		self.food_sequence = FoodSequence(width, height, seed)
+		self.rng = np.random.default_rng(seed)
 
 		self.snake = self.spawn_snake(genome=snake_genome)
 
@@ -24,75 +38,107 @@ class Board:
 		self.foods = self.spawn_food(num_food)
 
 		if self.animation_on:
-			pygame.init()
-			self.fps_clock = pygame.time.Clock()
-			self.fps = 60
-			self.surface = pygame.display.set_mode((self.width, self.height))
-			pygame.display.set_caption('Snake')
-
-	def run(self, time_limit=np.inf, time_bonus=0, max_time=np.inf):
+			from renderer import Renderer # only rendering needs pygame
+			self.renderer = Renderer(self.width, self.height, self.color)
+
+	def run(self, time_limit=np.inf, time_bonus=0, max_time=np.inf, early_exit=None):
+		# early_exit, an EarlyExit, may stop the run before the time is up; exit_reason
+		# then says which of its detectors fired
+		if self.profile is not None:
+			self.profile.count("evaluations")
 		time_passed = 0
+		self.exit_reason = None
+		episode = early_exit.start() if early_exit is not None else None
+		if self.recorder is not None:
+			self.recorder.start(self)
 		while self.snake.is_alive and time_passed < min(time_limit, max_time):
 			starting_length = len(self.snake.body)
 			self.update()
+			if self.recorder is not None:
+				self.recorder.record_tick(self)
 			food_eaten = len(self.snake.body) - starting_length
 			time_limit += food_eaten * time_bonus
 
 			if self.animation_on:
+				if self.profile is not None:
+					self.profile.start()
 				self.update_animation()
+				if self.profile is not None:
+					self.profile.lap("render")
 			
 			time_passed += 1
 
+			if episode is not None and self.snake.is_alive and time_passed < min(time_limit, max_time):
+				self.exit_reason = episode.check(self, time_passed, time_limit, time_bonus, max_time, food_eaten)
+				if self.exit_reason is not None:
+					if self.profile is not None:
+						self.profile.count(self.exit_reason + "_exits")
+					if self.exit_reason != THRESHOLD:
+						# the snake would go on like this until the time is up
+						time_passed = end_time(time_passed, time_limit, max_time)
+					break
+
 		return len(self.snake.body), time_passed, self.snake.is_alive
 
 	def update(self):
 		self.snake.update(self.foods)
 
+		if self.spatial_index is not None:
+			self.update_foods_with_index()
+		else:
+			head = self.snake.body[0]
+			if len(self.foods) < utils.MIN_ARRAY_POINTS:
+				eaten = [utils.are_touching(head, food) for food in self.foods]
+			else:
+				food_positions = np.array([food.position for food in self.foods], dtype=float).reshape(-1, 2)
+				food_sizes = np.array([food.size for food in self.foods], dtype=float)
+				eaten = utils.find_touching(head.position, head.size, food_positions, food_sizes).tolist()
+			for _ in range(sum(eaten)):
+				self.snake.grow()
+			self.foods = [food for food, is_eaten in zip(self.foods, eaten) if not is_eaten]
+		if self.profile is not None:
+			self.profile.lap("eat")
+		if len(self.foods) != self.num_food:
+			if self.profile is not None:
+				self.profile.count("food_eaten", self.num_food - len(self.foods))
+			self.foods += self.spawn_food(self.num_food - len(self.foods))
+			if self.profile is not None:
+				self.profile.lap("respawn")
+		if self.spatial_index is not None and not self.spatial_index.pays_off(self.num_food, len(self.snake.body)):
+			self.drop_spatial_index()
+
+	def drop_spatial_index(self):
+		# once the body outgrows the index the array scans are quicker; both see the same
+		self.spatial_index = None
+		self.snake.spatial_index = None
+
+	def update_foods_with_index(self):
+		head = self.snake.body[0]
+		nearby = self.spatial_index.query_radius(head.position, head.size)
+		eaten = {id(o) for o in nearby if isinstance(o, Food) and utils.are_touching(head, o)}
+		if not eaten:
+			return
+
 		next_foods = []
 		for food in self.foods:
-			if utils.are_touching(self.snake.body[0], food):
+			if id(food) in eaten:
 				self.snake.grow()
+				self.spatial_index.remove(food)
 			else:
 				next_foods.append(food)
 		self.foods = next_foods
-		if len(self.foods) != self.num_food:
-			self.foods += self.spawn_food(self.num_food - len(self.foods))
 
 	def spawn_snake(self, genome):
 		init_snake_position = [self.width/2, self.height/2]
 		init_snake_direction = 0
-		return Snake(init_snake_position, init_snake_direction, genome=genome)
+		return Snake(init_snake_position, init_snake_direction, genome=genome, spatial_index=self.spatial_index, vision_prefilter=self.vision_prefilter, profile=self.profile, rng=self.rng, fast_math=self.fast_math, brain_config=self.brain_config)
 
 	def spawn_food(self, num):
-		return [Food(self.get_random_position()) for _ in range(num)]
+		foods = [Food(tuple(position)) for position in self.food_sequence.take(num).tolist()]
+		if self.spatial_index is not None:
+			for food in foods:
+				self.spatial_index.insert(food)
+		return foods
 
 	def update_animation(self):
-		self.draw()
-		self.check_quit()
-		self.fps_clock.tick(self.fps)
-
-	def draw(self):
-		self.surface.fill(self.color)
-		
-		self.snake.draw(self.surface)
-		for food in self.foods:
-			food.draw(self.surface)
-
-		pygame.display.update()
-
-	def get_random_position(self):
-		x = random.random() * self.width
-		y = random.random() * self.height
-		return x,y
-
-	def check_quit(self):
-		for event in pygame.event.get(QUIT):
-			self.terminate()
-		for event in pygame.event.get(KEYUP):
-			if event.key == K_ESCAPE:
-				self.terminate()
-			pygame.event.post(event)
-
-	def terminate(self):
-		pygame.quit()
-		sys.exit()
\ No newline at end of file
+		self.renderer.update(self)
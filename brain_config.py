@@ -0,0 +1,67 @@
+import numpy as np
+
+# the visual_encoding of each kind of object a snake sees: a body piece, then food
+OBJECT_ENCODINGS = [[1,0], [0,1]]
+# ways to show the brain what an eye sees, as matrices applied to the object's
+# visual_encoding; the distance always follows
+ENCODINGS = {
+	"one_hot": [[1,0], [0,1]],
+	"signed": [[-1,1]], # body -1, food 1
+	"distance": [] # only how far away the closest thing is
+}
+
+
+class BrainConfig:
+	# The shape of a snake's senses and brain, which fixes the sizes of its genome.
+	# A genome's num_eye_angles eye_angles give it an eye straight ahead and one either
+	# side at each angle, and are the angles it turns by. Every eye shows the brain the
+	# encoding of the closest thing it sees, then its distance, or zeros if it sees
+	# nothing; a hidden layer of hidden_width maps that to one output per decision.
+	# turns is the decision table: decision i turns by turns[i] . eye_angles, and by
+	# default the decisions turn by minus each angle, then plus each, then not at all.
+	# The defaults are the original snakes, whose genomes hold 2 eye_angles, a 15x15 w1
+	# and a 5x15 w2.
+	def __init__(self, num_eye_angles=2, hidden_width=15, encoding="one_hot", turns=None):
+		if encoding not in ENCODINGS:
+			raise ValueError("unknown encoding {}, not one of {}".format(encoding, list(ENCODINGS)))
+		self.num_eye_angles = num_eye_angles
+		self.num_eyes = 1 + 2 * num_eye_angles
+		self.hidden_width = hidden_width
+		self.encoding = encoding
+
+		self.matrix = np.array(ENCODINGS[encoding], dtype=float).reshape(-1, 2)
+		# visual_encoding, as a tuple -> what the brain is shown
+		self.encodings = {tuple(e): (self.matrix @ e).tolist() for e in OBJECT_ENCODINGS}
+		self.encoding_width = len(self.matrix) + 1
+		self.unseen = [0] * self.encoding_width
+
+		if turns is None:
+			identity = np.eye(num_eye_angles)
+			turns = np.concatenate([-identity, identity, np.zeros((1, num_eye_angles))])
+		self.turns = np.array(turns, dtype=float).reshape(-1, num_eye_angles)
+
+		self.dimensions = [self.num_eyes * self.encoding_width, hidden_width, len(self.turns)]
+		self.gene_sizes = {
+			"eye_angles": num_eye_angles,
+			"w1": self.dimensions[1] * self.dimensions[0],
+			"w2": self.dimensions[2] * self.dimensions[1]
+		}
+		self.genome_size = sum(self.gene_sizes.values())
+
+	def __repr__(self):
+		return "BrainConfig(num_eye_angles={}, hidden_width={}, encoding={!r}, turns={})".format(self.num_eye_angles, self.hidden_width, self.encoding, self.turns.tolist())
+
+	def encode(self, visual_encoding):
+		encoded = self.encodings.get(tuple(visual_encoding))
+		return encoded if encoded is not None else (self.matrix @ visual_encoding).tolist()
+
+	def eye_angles(self, angles):
+		# [0, a1, -a1, a2, -a2, ...]
+		return [0] + [eye_angle for angle in angles for eye_angle in (angle, -angle)]
+
+	def turn_angles(self, angles):
+		# the angle each decision turns by
+		return (self.turns @ np.asarray(angles, dtype=float)).tolist()
+
+
+DEFAULT_BRAIN_CONFIG = BrainConfig()
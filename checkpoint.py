@@ -0,0 +1,119 @@
+import os
+import json
+import random
+import threading
+import numpy as np
+
+# A checkpoint is one uncompressed .npz of named arrays: the generation counter, the
+# population about to be evaluated, the results it was bred from and the states of the
+# random number generators breeding draws from. Genomes that are dicts (holland's) are
+# stored as one (N, size) array per gene, flat gene lists as one (N, num_genes) array.
+
+
+def genomes_to_arrays(name, genomes):
+	if len(genomes) and isinstance(genomes[0], dict):
+		arrays = {"{}/{}".format(name, gene): np.array([genome[gene] for genome in genomes]) for gene in genomes[0]}
+		arrays[name + "/genes"] = np.array(list(genomes[0]))
+		return arrays
+	return {name: np.array(genomes, dtype=float).reshape(len(genomes), -1)}
+
+def arrays_to_genomes(name, arrays):
+	if name in arrays:
+		return arrays[name]
+	genes = arrays[name + "/genes"].tolist()
+	columns = [arrays["{}/{}".format(name, gene)].tolist() for gene in genes]
+	return [dict(zip(genes, values)) for values in zip(*columns)]
+
+def results_to_arrays(name, fitness_results):
+	# (fitness, genome) pairs
+	fitness = np.array([result[0] for result in fitness_results], dtype=float)
+	return {name + "/fitness": fitness, **genomes_to_arrays(name, [result[1] for result in fitness_results])}
+
+def arrays_to_results(name, arrays):
+	if name + "/fitness" not in arrays:
+		return []
+	return list(zip(arrays[name + "/fitness"].tolist(), arrays_to_genomes(name, arrays)))
+
+def random_states(generator=None):
+	# the states of random, numpy's global generator and, if given, a numpy Generator
+	version, mt_state, gauss_next = random.getstate()
+	name, keys, position, has_gauss, cached_gaussian = np.random.get_state()
+	arrays = {
+		"random/state": np.array(mt_state, dtype=np.uint32),
+		"random/version": np.array(version),
+		"random/gauss_next": np.array(np.nan if gauss_next is None else gauss_next),
+		"numpy/keys": keys,
+		"numpy/position": np.array([position, has_gauss]),
+		"numpy/cached_gaussian": np.array(cached_gaussian),
+	}
+	if generator is not None:
+		# a Generator's state is a small dict of (possibly 128-bit) integers
+		arrays["generator/state"] = np.array(json.dumps(generator.bit_generator.state))
+	return arrays
+
+def set_random_states(arrays, generator=None):
+	gauss_next = float(arrays["random/gauss_next"])
+	random.setstate((int(arrays["random/version"]), tuple(arrays["random/state"].tolist()), None if np.isnan(gauss_next) else gauss_next))
+	position, has_gauss = arrays["numpy/position"].tolist()
+	np.random.set_state(("MT19937", arrays["numpy/keys"], position, has_gauss, float(arrays["numpy/cached_gaussian"])))
+	if generator is not None and "generator/state" in arrays:
+		generator.bit_generator.state = json.loads(str(arrays["generator/state"]))
+
+def write_checkpoint(path, arrays):
+	# written next to path and renamed over it, so path always holds a whole checkpoint
+	temporary_path = path + ".tmp"
+	with open(temporary_path, 'wb') as f:
+		np.savez(f, **arrays)
+		f.flush()
+		os.fsync(f.fileno())
+	os.replace(temporary_path, path)
+
+def load_checkpoint(path):
+	with np.load(path) as checkpoint:
+		return {name: checkpoint[name] for name in checkpoint.files}
+
+
+class Checkpointer:
+	# Saves a checkpoint every interval generations on a background thread, so the
+	# evolution loop does not wait on the disk. The arrays are built before save
+	# returns; a save only waits if the previous checkpoint is still being written.
+	def __init__(self, path, interval=1):
+		self.path = path
+		self.interval = interval
+		self.thread = None
+		self.error = None
+		if os.path.dirname(path):
+			os.makedirs(os.path.dirname(path), exist_ok=True)
+
+	def should_save(self, generation_num):
+		return generation_num % self.interval == 0
+
+	def save(self, arrays):
+		self.wait()
+		self.thread = threading.Thread(target=self.write, args=(arrays,), daemon=True)
+		self.thread.start()
+
+	def write(self, arrays):
+		try:
+			write_checkpoint(self.path, arrays)
+		except Exception as e:
+			self.error = e
+
+	def finish(self):
+		# waits for the checkpoint being written, if any
+		if self.thread is not None:
+			self.thread.join()
+			self.thread = None
+
+	def wait(self):
+		# finishes the checkpoint being written and raises what went wrong writing it
+		self.finish()
+		if self.error is not None:
+			error, self.error = self.error, None
+			raise error
+
+	def exists(self):
+		return os.path.exists(self.path)
+
+	def load(self):
+		return load_checkpoint(self.path)
@@ -0,0 +1,143 @@
+import math
+import numpy as np
+
+from snake import SNAKE_SPEED, BODY_PIECE_SIZE
+from food import Food
+import utils
+
+CYCLE = "cycle"
+NO_PROGRESS = "no_progress"
+THRESHOLD = "threshold"
+DETECTORS = [CYCLE, NO_PROGRESS, THRESHOLD]
+
+FOOD_REACH = BODY_PIECE_SIZE + Food((0, 0)).size
+
+
+def end_time(time_passed, time_limit, max_time):
+	# the time_passed Board.run stops at if the snake neither eats nor dies any more
+	return max(time_passed, math.ceil(min(time_limit, max_time)))
+
+def ticks_to_reach(distance):
+	# the fewest ticks after which a head distance away from a food can be touching it;
+	# at least one, as food is eaten after the head has moved. Rounded down a hair so
+	# rounding in the simulation can not beat it
+	return max(1, math.ceil((distance - FOOD_REACH) / SNAKE_SPEED - 1e-6))
+
+def can_reach_length(min_length, length, head, foods, upcoming, time_passed, time_limit, time_bonus, max_time):
+	# Whether the snake could still be min_length long when its time is up, eating every
+	# food as soon as the distances allow. upcoming are the positions the next foods
+	# spawn at, in order (min_length - length - 1 of them are needed).
+	needed = min_length - length
+	if needed <= 0:
+		return True
+	if len(foods) == 1:
+		# each food spawns once the last is eaten, with the head within FOOD_REACH of the last
+		position, reach = head, 0.0
+		for food in [foods[0]] + list(upcoming[:needed - 1]):
+			time_passed += ticks_to_reach(utils.calc_distance(position, food) - reach)
+			# the tick the food is eaten on has to start before the time is up
+			if time_passed - 1 >= min(time_limit, max_time):
+				return False
+			time_limit += time_bonus
+			position, reach = food, FOOD_REACH
+		return True
+	# with several foods, the k-th food eaten has to be one the head can get to before the
+	# time it has after eating k - 1 runs out, among the foods there and the k - 1 spawned since
+	distances = [utils.calc_distance(head, food) for food in foods]
+	for num_eaten in range(needed):
+		end = min(time_limit + num_eaten * time_bonus, max_time)
+		if sum(time_passed + ticks_to_reach(distance) - 1 < end for distance in distances) <= num_eaten:
+			return False
+		if num_eaten < len(upcoming):
+			distances.append(utils.calc_distance(head, upcoming[num_eaten]))
+	return True
+
+class EarlyExit:
+	# Detectors that stop Board.run and BatchBoard.run before the time is up, once how
+	# an episode ends is settled or no longer matters. The board says which one fired.
+	#   "cycle": the snake's head state (position and direction, quantized) is back where
+	#     it was since it last ate, and so is the rest of the snake, every piece and its
+	#     history. It would go round until the time is up, so it finishes alive and as
+	#     long as it is, at the time the run would have ended.
+	#   "no_progress": the snake has not eaten for no_progress_time ticks. It is taken
+	#     to go on like that, finishing like a cycle. This is a guess, so it is off unless
+	#     no_progress_time is given.
+	#   "threshold": even eating every food as soon as the distances allow, the snake
+	#     can not reach min_length before its time is up. It finishes as it is, which is
+	#     still too short. BatchBoard can also take min_length to be one less than the
+	#     pool_size-th longest snake of the batch, so that cut snakes rank below those
+	#     pool_size whether or not any of them die. Checked every check_interval ticks.
+	# Cycles and no progress are only detected when the time is limited.
+	def __init__(self, detect_cycles=True, no_progress_time=None, min_length=None, pool_size=None, check_interval=10, position_quantum=1e-6, angle_quantum=1e-6):
+		self.detect_cycles = detect_cycles
+		self.no_progress_time = no_progress_time
+		self.min_length = min_length
+		self.pool_size = pool_size
+		self.check_interval = check_interval
+		self.position_quantum = position_quantum
+		self.angle_quantum = angle_quantum
+
+	def __repr__(self):
+		return "EarlyExit(detect_cycles={}, no_progress_time={}, min_length={}, pool_size={}, check_interval={}, position_quantum={}, angle_quantum={})".format(self.detect_cycles, self.no_progress_time, self.min_length, self.pool_size, self.check_interval, self.position_quantum, self.angle_quantum)
+
+	def quantize(self, position, direction):
+		return (math.floor(position[0] / self.position_quantum), math.floor(position[1] / self.position_quantum), math.floor(direction / self.angle_quantum))
+
+	def quantize_array(self, positions, directions):
+		# quantize for many snakes; the same keys as quantize gives
+		return np.floor(np.column_stack([positions, directions]) / [self.position_quantum, self.position_quantum, self.angle_quantum]).astype(np.int64)
+
+	def quantize_body(self, positions, histories, counts):
+		# a snake's pieces and their histories, oldest first, with unfilled entries as zeros
+		is_filled = np.arange(histories.shape[1]) < counts[:, None]
+		histories = np.where(is_filled[..., None], histories, 0)
+		return np.floor(positions / self.position_quantum).astype(np.int64).tobytes() + np.floor(histories / self.position_quantum).astype(np.int64).tobytes() + counts.astype(np.int64).tobytes()
+
+	def start(self):
+		return self.Episode(self)
+
+	class Episode:
+		# one Board.run's detectors. The head state is compared every tick with the one
+		# saved at the last power of two ticks since the last food, which finds a cycle
+		# of any period (Brent's cycle detection); the body is compared when they match.
+		def __init__(self, early_exit):
+			self.early_exit = early_exit
+			self.ticks_since_food = 0
+			self.saved_key = None
+			self.saved_body = None
+
+		def check(self, board, time_passed, time_limit, time_bonus, max_time, food_eaten):
+			early_exit = self.early_exit
+			snake = board.snake
+			length = len(snake.body)
+			self.ticks_since_food += 1
+			if food_eaten:
+				self.ticks_since_food = 0
+				self.saved_key = None
+			is_limited = min(time_limit, max_time) < np.inf
+
+			if early_exit.detect_cycles and is_limited:
+				key = early_exit.quantize(snake.body[0].position, snake.direction)
+				if key == self.saved_key and early_exit.quantize_body(*self.body_state(snake)) == early_exit.quantize_body(*self.saved_body):
+					return CYCLE
+				if self.ticks_since_food & (self.ticks_since_food - 1) == 0:
+					self.saved_key, self.saved_body = key, self.body_state(snake)
+
+			if early_exit.no_progress_time is not None and is_limited and self.ticks_since_food >= early_exit.no_progress_time:
+				return NO_PROGRESS
+
+			if early_exit.min_length is not None and time_passed % early_exit.check_interval == 0:
+				food_sequence = board.food_sequence
+				upcoming = food_sequence.precompute(food_sequence.num_taken + max(early_exit.min_length - length, 0))[food_sequence.num_taken:]
+				foods = [food.position for food in board.foods]
+				if not can_reach_length(early_exit.min_length, length, snake.body[0].position, foods, upcoming, time_passed, time_limit, time_bonus, max_time):
+					return THRESHOLD
+			return None
+
+		def body_state(self, snake):
+			# the pieces' positions, histories (oldest first) and history counts
+			body = snake.body
+			length = len(body)
+			# Snake.Body keeps each piece's history in a ring starting at its oldest entry
+			rings = body.ring_offsets[:length, None] + (body.history_start[:length, None] + np.arange(body.max_history)) % body.max_history
+			return body.positions[:length].copy(), body.history[rings], body.history_count[:length].copy()
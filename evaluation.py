@@ -0,0 +1,183 @@
+import os
+import math
+import logging
+import multiprocessing
+import numpy as np
+from functools import partial
+from holland import Evolver
+from holland.evolution.evaluation import Evaluator
+from holland.evolution.breeding import PopulationGenerator
+from holland.storage import StorageManager
+
+from genome_store import GenomeStore
+from shared_population import SharedPopulation, score_rows
+from checkpoint import Checkpointer, genomes_to_arrays, arrays_to_genomes, results_to_arrays, arrays_to_results, random_states, set_random_states
+import profiling
+
+
+class PopulationEvaluator(Evaluator):
+	# fitness_function takes the whole gene pool and returns one score per genome, in order
+	def evaluate_fitness(self, gene_pool):
+		scores = self.fitness_function(gene_pool)
+		results = list(zip(scores, gene_pool))
+		return sorted(results, key=lambda x: x[0], reverse=(not self.ascending))
+
+
+class PopulationEvolver(Evolver):
+	# holland's Evolver, but each generation is handed to the fitness function in one call,
+	# storage_options["genome_store"] streams every generation's genomes to a GenomeStore and
+	# storage_options["profile"] records what the boards were profiled into during a generation.
+	# storage_options["checkpoint"] ({"path": ..., "interval": ...}) saves the population bred
+	# for every interval-th generation along with the random states, and resume=True picks the
+	# evolution up from there as if it had never stopped. migrate, if given, is called as migrate(generation_num, fitness_results) before each
+	# generation is bred and returns the results to breed from (see islands.py)
+	def evolve(
+		self,
+		generation_params={},
+		initial_population=None,
+		stop_conditions={"n_generations": 100, "target_fitness": math.inf},
+		storage_options={},
+		logging_options={"level": logging.INFO, "format": "%(message)s"},
+		migrate=None,
+		resume=False,
+	):
+		n_random_per_generation = generation_params.get("n_random", 0)
+		n_elite_per_generation = generation_params.get("n_elite", 0)
+		population_size = generation_params.get("population_size", 1000)
+		n_generations = stop_conditions.get("n_generations", math.inf)
+		target_fitness = stop_conditions.get("target_fitness", math.inf)
+		should_stop = lambda gen_num, max_fit: gen_num == n_generations - 1 or max_fit == target_fitness
+
+		if n_random_per_generation < 0 or n_elite_per_generation < 0:
+			raise ValueError("Number of random and elite genomes per generation cannot be negative")
+		if population_size < 1:
+			raise ValueError("Population size must be at least 1")
+		if n_generations < 1:
+			raise ValueError("Number of generations must be at least 1")
+
+		logging.basicConfig(**logging_options)
+		logger = logging.getLogger(__name__)
+
+		evaluator = PopulationEvaluator(self.fitness_function, ascending=self.should_maximize_fitness)
+		storage_manager = StorageManager(
+			fitness_storage_options=storage_options.get("fitness", {}),
+			genome_storage_options=storage_options.get("genomes", {}),
+		)
+		genome_store = GenomeStore(**storage_options["genome_store"]) if "genome_store" in storage_options else None
+		population_generator = PopulationGenerator(self.genome_params, self.selection_strategy, generation_params=generation_params)
+		checkpointer = Checkpointer(**storage_options["checkpoint"]) if "checkpoint" in storage_options else None
+
+		generation_num = 0
+		fitness_results = []
+		population = initial_population
+		if resume:
+			if checkpointer is None:
+				raise ValueError("Resuming needs storage_options[\"checkpoint\"]")
+			checkpoint = checkpointer.load()
+			generation_num = int(checkpoint["generation"])
+			population = arrays_to_genomes("population", checkpoint)
+			fitness_results = arrays_to_results("results", checkpoint)
+			set_random_states(checkpoint)
+			logger.info(f"Resuming from generation {generation_num}")
+		if population is None:
+			population = population_generator.generate_random_genomes(population_size)
+
+		while True:
+			try:
+				fitness_results = evaluator.evaluate_fitness(population)
+
+				best_fitness = fitness_results[-1][0]
+				logger.info(f"Generation: {generation_num}; Top Score: {best_fitness}")
+
+				storage_manager.update_storage(generation_num, fitness_results)
+				if genome_store is not None:
+					genome_store.append(generation_num, fitness_results)
+				if "profile" in storage_options:
+					profiling.record_profile(generation_num, **storage_options["profile"])
+
+				if should_stop(generation_num, best_fitness):
+					break
+
+				if migrate is not None:
+					fitness_results = migrate(generation_num, fitness_results)
+
+				population = population_generator.generate_next_generation(fitness_results)
+
+				generation_num += 1
+				if checkpointer is not None and checkpointer.should_save(generation_num):
+					checkpointer.save({
+						"generation": np.array(generation_num),
+						**genomes_to_arrays("population", population),
+						**results_to_arrays("results", fitness_results),
+						**random_states()
+					})
+			except:
+				storage_manager.react_to_interruption(generation_num, fitness_results)
+				if checkpointer is not None:
+					checkpointer.finish()
+				raise
+
+		if checkpointer is not None:
+			checkpointer.wait()
+
+		if storage_options.get("fitness", {}).get("should_record_fitness", False) and storage_options.get("fitness", {}).get("format") == "memory":
+			return fitness_results, storage_manager.fitness_history
+		return fitness_results
+
+
+def score_each(fitness_function, genomes):
+	return [fitness_function(genome) for genome in genomes]
+
+def score_chunk(population_fitness_function, genomes):
+	# runs in a worker; the profile the worker's boards collected goes back with the scores
+	scores = population_fitness_function(genomes)
+	return scores, profiling.drain()
+
+def for_each_genome(fitness_function):
+	# adapts a per-genome fitness function to one that scores a list of genomes
+	return partial(score_each, fitness_function)
+
+
+class ProcessPoolFitness:
+	# A population fitness function that splits the population into chunks and
+	# scores them on a pool of worker processes. The pool lives as long as this
+	# object, so workers import the simulation once and are reused every generation.
+	# Populations whose genomes are laid out alike are written to a SharedPopulation,
+	# and a worker is only sent the range of rows to score (see shared_population.py);
+	# others are sent to the workers chunk by chunk.
+	def __init__(self, population_fitness_function, num_workers=None, chunk_size=None):
+		self.population_fitness_function = population_fitness_function
+		self.num_workers = num_workers or os.cpu_count()
+		self.chunk_size = chunk_size
+		self.pool = multiprocessing.Pool(self.num_workers)
+		self.population = SharedPopulation()
+
+	def __call__(self, genomes, **kwargs):
+		# kwargs (e.g. a seed) are passed along to the fitness function with every chunk
+		fitness_function = partial(self.population_fitness_function, **kwargs) if kwargs else self.population_fitness_function
+		chunk_size = self.chunk_size or max(1, math.ceil(len(genomes) / (self.num_workers * 4)))
+		starts = list(range(0, len(genomes), chunk_size))
+		if len(genomes) and self.population.write(genomes):
+			population = self.population
+			self.pool.starmap(partial(score_rows, fitness_function, population.name, population.capacity, population.layout), [(start, min(start + chunk_size, len(genomes))) for start in starts])
+			population.merge_profiles(starts)
+			return population.scores[:len(genomes)].tolist()
+		# imap keeps chunks in submission order even though they finish out of order
+		scores = []
+		for chunk_scores, profile in self.pool.imap(partial(score_chunk, fitness_function), [genomes[start:start + chunk_size] for start in starts]):
+			scores += chunk_scores
+			profiling.collected.merge(profile)
+		return scores
+
+	def close(self):
+		self.pool.close()
+		self.pool.join()
+		self.population.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.pool.terminate()
+		self.pool.join()
+		self.population.close()
@@ -0,0 +1,239 @@
+import os
+import sys
+import json
+import math
+import socket
+import asyncio
+import argparse
+import logging
+import multiprocessing
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+from evaluation import score_chunk
+from shared_population import SharedPopulation, score_rows
+import profiling
+
+# The protocol is newline-delimited JSON. A client sends batches:
+#   {"batch": 1, "genomes": [...], "kwargs": {...}}
+# and the server answers with one message per chunk of the batch, in the order the
+# chunks finish, then one saying the batch is done:
+#   {"batch": 1, "start": 40, "scores": [...], "profile": {"times": {...}, "counts": {...}}}
+#   {"batch": 1, "done": true}
+# A chunk that fails is answered with {"batch": 1, "error": "..."} instead, and a request
+# that can not be read with {"batch": null, "error": "..."} (or its batch, if it has one).
+# A client on the same machine can instead write the genomes to a SharedPopulation and
+# send where they are:
+#   {"batch": 1, "shared": {"name": "psm_...", "capacity": 1000, "layout": [["eye_angles", 2], ...], "size": 1000}, "kwargs": {...}}
+# The workers then write the scores and profiles to the shared memory, and a chunk is
+# answered with only its rows: {"batch": 1, "start": 40, "stop": 80}
+
+
+def parse_address(address):
+	# "unix:/path/to.sock" or "host:port"
+	if address.startswith('unix:'):
+		return socket.AF_UNIX, address[len('unix:'):]
+	host, port = address.rsplit(':', 1)
+	return socket.AF_INET, (host, int(port))
+
+def read_request(line):
+	# the request and None, or what could be read of it and why it is not a batch of genomes
+	try:
+		request = json.loads(line)
+	except ValueError:
+		return {}, "malformed request: not JSON"
+	if not isinstance(request, dict):
+		return {}, "malformed request: not a JSON object"
+	if request.get("batch") is None or not (isinstance(request.get("genomes"), list) or is_shared_population(request.get("shared"))) or not isinstance(request.get("kwargs", {}), dict):
+		return request, "malformed request: expected a batch, a list of genomes or a shared population, and optional kwargs"
+	return request, None
+
+def is_shared_population(shared):
+	return isinstance(shared, dict) and isinstance(shared.get("name"), str) and isinstance(shared.get("capacity"), int) and isinstance(shared.get("size"), int) and isinstance(shared.get("layout"), list)
+
+def encode(message):
+	# numpy scalars, which scores often are, are sent as plain numbers
+	return (json.dumps(message, default=lambda o: o.item()) + '\n').encode()
+
+
+class EvaluationServer:
+	# Scores batches of genomes with population_fitness_function on a pool of worker
+	# processes, for any number of clients at once. Batches are split into chunks, and
+	# at most max_pending_chunks chunks (from all clients) are queued on the pool; the
+	# server stops reading a client's batches until a chunk finishes, so clients that
+	# submit faster than the pool scores are held back by their sockets.
+	def __init__(self, population_fitness_function, num_workers=None, chunk_size=None, max_pending_chunks=None):
+		self.population_fitness_function = population_fitness_function
+		self.num_workers = num_workers or os.cpu_count()
+		self.chunk_size = chunk_size
+		self.max_pending_chunks = max_pending_chunks or self.num_workers * 2
+		# workers are started lazily, once clients are connected; forked from this process
+		# they would hold every open connection (and the listening socket) open with them
+		self.executor = ProcessPoolExecutor(self.num_workers, mp_context=multiprocessing.get_context('forkserver'))
+		self.pending = None
+
+	async def start(self, address):
+		self.pending = asyncio.Semaphore(self.max_pending_chunks)
+		family, location = parse_address(address)
+		if family == socket.AF_UNIX:
+			return await asyncio.start_unix_server(self.handle_connection, location)
+		return await asyncio.start_server(self.handle_connection, *location)
+
+	async def serve_forever(self, address):
+		server = await self.start(address)
+		logging.getLogger(__name__).info("Serving evaluations on {} with {} workers".format(address, self.num_workers))
+		async with server:
+			await server.serve_forever()
+
+	async def handle_connection(self, reader, writer):
+		write_lock = asyncio.Lock()
+		batch_tasks = []
+		try:
+			while True:
+				line = await reader.readline()
+				if not line:
+					break
+				request, error = read_request(line)
+				if error is not None:
+					await self.send({"batch": request.get("batch"), "error": error}, writer, write_lock)
+					continue
+				batch_tasks.append(await self.submit_batch(request, writer, write_lock))
+			await asyncio.gather(*batch_tasks)
+		except ConnectionError:
+			pass
+		finally:
+			writer.close()
+
+	async def submit_batch(self, request, writer, write_lock):
+		# queues the batch's chunks as the pool makes room for them; returns a task that
+		# says the batch is done once all of them are answered
+		num_genomes = request["shared"]["size"] if "shared" in request else len(request["genomes"])
+		kwargs = request.get("kwargs", {})
+		fitness_function = partial(self.population_fitness_function, **kwargs) if kwargs else self.population_fitness_function
+		chunk_size = self.chunk_size or max(1, math.ceil(num_genomes / (self.num_workers * 4)))
+		chunk_tasks = []
+		for start in range(0, num_genomes, chunk_size):
+			await self.pending.acquire()
+			chunk_tasks.append(asyncio.create_task(
+				self.run_chunk(request, start, min(start + chunk_size, num_genomes), fitness_function, writer, write_lock)
+			))
+		return asyncio.create_task(self.finish_batch(request["batch"], chunk_tasks, writer, write_lock))
+
+	async def run_chunk(self, request, start, stop, fitness_function, writer, write_lock):
+		batch = request["batch"]
+		loop = asyncio.get_running_loop()
+		try:
+			if "shared" in request:
+				shared = request["shared"]
+				await loop.run_in_executor(self.executor, partial(score_rows, fitness_function, shared["name"], shared["capacity"], shared["layout"], start, stop))
+				message = {"batch": batch, "start": start, "stop": stop}
+			else:
+				scores, profile = await loop.run_in_executor(self.executor, partial(score_chunk, fitness_function), request["genomes"][start:stop])
+				message = {"batch": batch, "start": start, "scores": scores, "profile": {"times": profile.times, "counts": profile.counts}}
+		except Exception as e:
+			message = {"batch": batch, "error": repr(e)}
+		finally:
+			# the pool has room again before the answer is written, so a client that is
+			# slow to read its answers does not hold back everyone else's chunks
+			self.pending.release()
+		await self.send(message, writer, write_lock)
+
+	async def finish_batch(self, batch, chunk_tasks, writer, write_lock):
+		await asyncio.gather(*chunk_tasks)
+		await self.send({"batch": batch, "done": True}, writer, write_lock)
+
+	async def send(self, message, writer, write_lock):
+		async with write_lock:
+			writer.write(encode(message))
+			await writer.drain()
+
+	def close(self):
+		self.executor.shutdown()
+
+
+class RemoteFitness:
+	# A population fitness function, like ProcessPoolFitness, that has the genomes
+	# scored by an EvaluationServer. The profile the server's boards collected for a
+	# batch is merged into profiling.collected, as ProcessPoolFitness does. With shared
+	# (the default for unix sockets, whose server is on the same machine) the genomes go
+	# to the server in a SharedPopulation rather than in the request.
+	def __init__(self, address, timeout=None, shared=None):
+		self.shared = address.startswith('unix:') if shared is None else shared
+		self.population = SharedPopulation()
+		family, location = parse_address(address)
+		self.socket = socket.socket(family, socket.SOCK_STREAM)
+		self.socket.settimeout(timeout)
+		self.socket.connect(location)
+		self.file = self.socket.makefile('rb')
+		self.num_batches = 0
+
+	def stream(self, genomes, **kwargs):
+		# yields (start, scores) for each chunk of the genomes as the server finishes it
+		self.num_batches += 1
+		batch = self.num_batches
+		population = self.population
+		if self.shared and len(genomes) and population.write(genomes):
+			shared = {"name": population.name, "capacity": population.capacity, "layout": population.layout, "size": len(genomes)}
+			self.socket.sendall(encode({"batch": batch, "shared": shared, "kwargs": kwargs}))
+		else:
+			self.socket.sendall(encode({"batch": batch, "genomes": genomes, "kwargs": kwargs}))
+		while True:
+			line = self.file.readline()
+			if not line:
+				raise ConnectionError("the evaluation server closed the connection")
+			message = json.loads(line)
+			if message["batch"] not in (batch, None):
+				continue
+			if "error" in message:
+				raise RuntimeError("evaluation failed on the server: {}".format(message["error"]))
+			if message.get("done"):
+				return
+			if "stop" in message:
+				population.merge_profiles([message["start"]])
+				yield message["start"], population.scores[message["start"]:message["stop"]].tolist()
+				continue
+			profile = profiling.Profile()
+			profile.times.update(message["profile"]["times"])
+			profile.counts.update(message["profile"]["counts"])
+			profiling.collected.merge(profile)
+			yield message["start"], message["scores"]
+
+	def __call__(self, genomes, **kwargs):
+		scores = [None] * len(genomes)
+		for start, chunk_scores in self.stream(genomes, **kwargs):
+			scores[start:start + len(chunk_scores)] = chunk_scores
+		return scores
+
+	def close(self):
+		self.file.close()
+		self.socket.close()
+		self.population.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+
+def main():
+	import evolution
+	parser = argparse.ArgumentParser(description='Score genomes for evolution.py runs on this machine, for as many runs as connect.')
+	parser.add_argument('address', nargs='?', default='unix:/tmp/snake-ai-evaluation.sock', help='unix:/path or host:port')
+	parser.add_argument('--workers', type=int, default=None)
+	parser.add_argument('--chunk-size', type=int, default=None)
+	parser.add_argument('--max-pending-chunks', type=int, default=None)
+	args = parser.parse_args()
+
+	logging.basicConfig(level=logging.INFO, format="%(message)s")
+	server = EvaluationServer(evolution.population_fitness_function, args.workers, args.chunk_size, args.max_pending_chunks)
+	try:
+		asyncio.run(server.serve_forever(args.address))
+	except KeyboardInterrupt:
+		pass
+	finally:
+		server.close()
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -1,21 +1,49 @@
-import json
+import os
 import random
 import math
-from holland import Evolver, library
+import argparse
+from holland import library
 from board import Board
+from batch_board import BatchBoard
+from evaluation import PopulationEvolver, ProcessPoolFitness
+from evaluation_server import RemoteFitness
+from islands import IslandEvolver
+from fitness_cache import CachedFitness
+from multi_seed_fitness import MultiSeedFitness
+from multi_fidelity import SuccessiveHalvingFitness
+from genome_store import GenomeStore
+from brain_config import BrainConfig
+import profiling
 
+board_params = {"width": 200, "height": 150, "num_food": 1, "seed": 98}
+# the snakes' senses and brain (see brain_config.py); fewer eyes, a narrower encoding or a
+# narrower hidden layer make cheaper snakes, and genome_params follows the sizes
+brain_params = {"num_eye_angles": 2, "hidden_width": 15, "encoding": "one_hot"}
+brain_config = BrainConfig(**brain_params)
+run_params = {"time_limit": 200, "time_bonus": 100, "max_time": 1000}
+# stops boards before their time is up (see early_exit.py), e.g. EarlyExit(pool_size=30) stops
+# snakes that can no longer make the 30 longest of their batch; None simulates every tick.
+# Scores cut by pool_size depend on the rest of the batch, so they are not cached.
+early_exit = None
 
-def fitness_function(genome):
-	board = Board(200, 150, num_food=1, snake_genome=genome, animation_on=False, seed=98)
-	length, time, is_alive = board.run(time_limit=200, time_bonus=100, max_time=1000)
+
+def calc_score(length, time, is_alive):
 	did_die = not is_alive
-	score = length - did_die
-	return score
+	return length - did_die
+
+def fitness_function(genome):
+	board = Board(snake_genome=genome, animation_on=False, brain_config=brain_config, **board_params)
+	return calc_score(*board.run(early_exit=early_exit, **run_params))
+
+def population_fitness_function(genomes, seed=board_params["seed"], max_time=run_params["max_time"]):
+	profile = profiling.collected if "profile" in storage_options else None
+	board = BatchBoard(snake_genomes=genomes, profile=profile, brain_config=brain_config, **dict(board_params, seed=seed))
+	return [calc_score(*result) for result in board.run(early_exit=early_exit, **dict(run_params, max_time=max_time))]
 
 genome_params = {
 	"eye_angles": {
 		"type": "[float]",
-		"size": 2,
+		"size": brain_config.gene_sizes["eye_angles"],
 		"max": math.pi * 2,
 		"min": 0,
 		"initial_distribution": lambda: random.random() * math.pi * 2,
@@ -25,7 +53,7 @@ genome_params = {
 	},
 	"w1": {
 		"type": "[float]",
-		"size": 15 * 15,
+		"size": brain_config.gene_sizes["w1"],
 		"initial_distribution": lambda: random.random() * 200 - 100,
 		"crossover_function": library.get_point_crossover_function(n_crossover_points=3),
 		"mutation_function": library.get_gaussian_mutation_function(sigma=50),
@@ -34,7 +62,7 @@ genome_params = {
 	},
 	"w2": {
 		"type": "[float]",
-		"size": 5 * 15,
+		"size": brain_config.gene_sizes["w2"],
 		"initial_distribution": lambda: random.random() * 200 - 100,
 		"crossover_function": library.get_point_crossover_function(n_crossover_points=3),
 		"mutation_function": library.get_gaussian_mutation_function(sigma=50),
@@ -53,9 +81,6 @@ selection_strategy = {
 	}
 }
 
-evolver = Evolver(fitness_function, genome_params, selection_strategy)
-
-
 storage_options = {
 	"fitness": {
 		"should_record_fitness": True,
@@ -63,23 +88,109 @@ storage_options = {
 		"file_name": "fitness.csv",
 		"path": "./results/"
 	},
-	"genomes": {
-		"should_record_on_interrupt": True,
-		"format": "json",
-		"file_name": "genomes.json",
-		"path": "./results/",
-		"top": 100
+	"genome_store": {
+		"path": "./results/genomes.npy",
+		"top": 100,
+		"brain_config": brain_config
+	},
+	"profile": {
+		"format": "csv",
+		"file_name": "profile.csv",
+		"path": "./results/"
+	},
+	"checkpoint": {
+		"path": "./results/checkpoint.npz", # python3 evolution.py --resume carries on from here
+		"interval": 1
 	}
 }
 
-with open("results/genomes.json", 'r') as f:
-	initial_population = [g for s,g in json.loads(f.readline())['results']]
+evaluation_options = {
+	"num_workers": os.cpu_count(),
+	"chunk_size": None # defaults to about four chunks per worker
+}
+
+# set to the address of a running evaluation_server.py (e.g. "unix:/tmp/snake-ai-evaluation.sock")
+# to have it score the genomes instead of a pool of this process's own
+evaluation_server_address = None
+
+cache_options = {
+	"max_size": 100000,
+	"path": "./results/fitness_cache.sqlite" # None keeps the cache in memory only
+}
+
+multi_seed_options = {
+	"seeds": [board_params["seed"]], # add seeds to score every genome on several food layouts
+	"aggregate": "mean",
+	"pool_size": selection_strategy["pool"]["top"],
+	"min_seeds": 2
+}
+
+# set "rungs" to score the population on cheap episodes first and only give the best 1/eta
+# of each rung the next, dearer one (see multi_fidelity.py); this takes the place of
+# multi_seed_options. e.g. [{"seeds": [98], "max_time": 200}, {"seeds": [98], "max_time": 1000},
+# {"seeds": [98, 99, 100], "max_time": 1000}]
+multi_fidelity_options = {
+	"rungs": None,
+	"eta": 4,
+	"min_promoted": selection_strategy["pool"]["top"]
+}
+
+generation_params = {"population_size": 1000, "n_elite": 0, "n_random": 20}
+
+# set "num_islands" to evolve that many populations, one per core, instead of one population
+# scored on a pool; the population_size is split between the islands
+island_options = {
+	"num_islands": None,
+	"migration_interval": 10,
+	"num_migrants": 5,
+	"topology": "ring" # or "full", or a list of the islands each island sends migrants to
+}
+
+
+def generation_fitness_function(seeded_fitness_function):
+	# scores a generation on the seeds, or the rungs, the options ask for
+	if multi_fidelity_options["rungs"] is not None:
+		return SuccessiveHalvingFitness(seeded_fitness_function, **multi_fidelity_options)
+	return MultiSeedFitness(seeded_fitness_function, **multi_seed_options)
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser()
+	parser.add_argument('--resume', action='store_true', help='carry on from the last checkpoint in storage_options["checkpoint"]')
+	args = parser.parse_args()
+
+	initial_population = GenomeStore("results/genomes.npy", brain_config=brain_config).top_genomes(1000)
+
+	if island_options["num_islands"] is not None:
+		# each island scores its own population on its own core
+		evolver = IslandEvolver(generation_fitness_function(population_fitness_function), genome_params, selection_strategy, **island_options)
+		final_pop = evolver.evolve(
+			generation_params=dict(generation_params, population_size=generation_params["population_size"] // island_options["num_islands"]),
+			# initial_population=initial_population,
+			storage_options=storage_options,
+			stop_conditions={"n_generations": math.inf},
+			resume=args.resume
+		)
+	else:
+		if evaluation_server_address is not None:
+			evaluation_function = RemoteFitness(evaluation_server_address)
+		else:
+			evaluation_function = ProcessPoolFitness(population_fitness_function, **evaluation_options)
+
+		with evaluation_function as pool_fitness_function:
+			if early_exit is not None and early_exit.pool_size is not None:
+				cached_fitness_function = pool_fitness_function
+			else:
+				cached_fitness_function = CachedFitness(pool_fitness_function, params={**board_params, **run_params, "brain_config": repr(brain_config), "early_exit": repr(early_exit)}, **cache_options)
+			evolver = PopulationEvolver(generation_fitness_function(cached_fitness_function), genome_params, selection_strategy)
 
-final_pop = evolver.evolve(
-	generation_params={"population_size": 1000, "n_elite": 0, "n_random": 20},
-	# initial_population=initial_population,
-	storage_options=storage_options,
-	stop_conditions={"n_generations": math.inf}
-)
+			final_pop = evolver.evolve(
+				generation_params=generation_params,
+				# initial_population=initial_population,
+				storage_options=storage_options,
+				stop_conditions={"n_generations": math.inf},
+				resume=args.resume
+			)
+			cached_fitness_function.close()
 
-# print(final_pop[-1])
\ No newline at end of file
+	# print(final_pop[-1])
\ No newline at end of file
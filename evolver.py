@@ -1,21 +1,48 @@
+import os
 import time
 import random
+import argparse
 import numpy as np
 from functools import reduce
 
 from board import Board
+from evaluation import ProcessPoolFitness, for_each_genome
+from genome_store import GenomeStore, genes_to_genome
+from brain_config import DEFAULT_BRAIN_CONFIG
+from checkpoint import Checkpointer, genomes_to_arrays, random_states, set_random_states
+
+def evaluate_genes(genes):
+	board = Board(400, 300, num_food=25, snake_genome=genes_to_genome(genes), animation_on=False)
+	length, time, is_alive = board.run(time_limit=200, time_bonus=100, max_time=2000)
+	return length * 100 + time
+
 
 class Evolver:
-	def __init__(self, generations, pop_per_generation, random_per_generation):
+	# With vectorized=True the gene pool is an (N, num_genes) array and a generation is
+	# bred with whole-array operations drawn from a numpy Generator seeded with seed.
+	# With a checkpoint_path the gene pool, scores and random states are saved every
+	# checkpoint_interval generations, and evolve(resume=True) carries on from there.
+	def __init__(self, generations, pop_per_generation, random_per_generation, num_workers=1, chunk_size=None, vectorized=False, seed=None, checkpoint_path=None, checkpoint_interval=1):
 		self.generations = generations
 		self.pop_per_generation = pop_per_generation
 		self.random_per_generation = random_per_generation
-
-	def evolve(self, gene_pool):
+		self.num_workers = num_workers
+		self.chunk_size = chunk_size
+		self.pool_fitness_function = None
+		self.vectorized = vectorized
+		self.rng = np.random.default_rng(seed)
+		self.checkpointer = Checkpointer(checkpoint_path, checkpoint_interval) if checkpoint_path is not None else None
+
+	def evolve(self, gene_pool=None, resume=False):
+		# resume=True starts from the checkpoint at checkpoint_path instead of gene_pool
 		generation_num = 0
 		max_scores = []
-		while generation_num < self.generations:
-			try:
+		results = []
+		if resume:
+			generation_num, gene_pool, max_scores = self.load_checkpoint()
+		self.pool_fitness_function = ProcessPoolFitness(for_each_genome(evaluate_genes), self.num_workers, self.chunk_size) if self.num_workers > 1 else None
+		try:
+			while generation_num < self.generations:
 				start_time = time.time()
 				results = self.evaluate_population(gene_pool)
 				max_score = max([r[0] for r in results])
@@ -23,21 +50,47 @@ class Evolver:
 				print('Generation {}:\r\n\tMax score: {}, Time: {}'.format(generation_num, max_score, round(time.time() - start_time, 2)))
 				gene_pool = self.generate_next_generation(results)
 				generation_num += 1
-			except:
-				# raise
-				break
+				if self.checkpointer is not None and self.checkpointer.should_save(generation_num):
+					self.save_checkpoint(generation_num, gene_pool, max_scores)
+		except KeyboardInterrupt:
+			# stopping by hand returns the last whole generation; anything else is raised,
+			# and the run can be picked up again from the last checkpoint
+			pass
+		finally:
+			if self.checkpointer is not None:
+				self.checkpointer.finish()
+			if self.pool_fitness_function is not None:
+				self.pool_fitness_function.close()
+				self.pool_fitness_function = None
 		return sorted(results, key=lambda x: x[0], reverse=True), max_scores
 
+	def save_checkpoint(self, generation_num, gene_pool, max_scores):
+		self.checkpointer.save({
+			"generation": np.array(generation_num),
+			**genomes_to_arrays("gene_pool", gene_pool),
+			"max_scores": np.array(max_scores, dtype=float),
+			**random_states(self.rng)
+		})
+
+	def load_checkpoint(self):
+		checkpoint = self.checkpointer.load()
+		set_random_states(checkpoint, self.rng)
+		gene_pool = checkpoint["gene_pool"] if self.vectorized else checkpoint["gene_pool"].tolist()
+		return int(checkpoint["generation"]), gene_pool, checkpoint["max_scores"].tolist()
+
 	def evaluate_population(self, gene_pool):
-		results = []
-		for genome in gene_pool:
-			board = Board(400, 300, num_food=25, snake_genome=genome, animation_on=False)
-			length, time = board.run(time_limit=200, time_bonus=100, max_time=2000)
-			score = length * 100 + time
-			results.append([score, genome])
-		return results
+		genes_lists = gene_pool.tolist() if isinstance(gene_pool, np.ndarray) else gene_pool
+		if self.pool_fitness_function is not None:
+			scores = self.pool_fitness_function(genes_lists)
+		else:
+			scores = [evaluate_genes(genes) for genes in genes_lists]
+		return [[score, genes] for score, genes in zip(scores, gene_pool)]
 
 	def generate_next_generation(self, results):
+		if self.vectorized:
+			scores, genes = zip(*results)
+			return self.generate_next_generation_array(np.array(scores, dtype=float), np.array(genes))
+
 		weight = lambda x: x**1.2
 		total_score = reduce(lambda a,x: a + weight(x[0]), results, 0)
 		scores, genes = zip(*results)
@@ -53,11 +106,57 @@ class Evolver:
 
 		return next_generation
 
+	def generate_next_generation_array(self, scores, gene_pool):
+		weights = scores**1.2
+		probabilities = weights / weights.sum()
+		num_children = self.pop_per_generation - self.random_per_generation
+
+		parents = self.choose_parent_pairs(probabilities, num_children)
+		children = self.mutate_array(self.crossover_array(gene_pool[parents[:, 0]], gene_pool[parents[:, 1]]))
+
+		return np.concatenate([children, self.generate_random_genes_array(self.random_per_generation)])
+
+	def choose_parent_pairs(self, probabilities, num):
+		# like np.random.choice(size=2, replace=False, p=probabilities) for every child:
+		# a second parent equal to the first is redrawn, which leaves it distributed as p
+		# without the first parent
+		if np.count_nonzero(probabilities) < 2:
+			raise ValueError("Fewer than two genomes have a chance of being chosen as parents")
+		parents = self.rng.choice(len(probabilities), size=(num, 2), p=probabilities)
+		same = np.flatnonzero(parents[:, 0] == parents[:, 1])
+		while len(same):
+			parents[same, 1] = self.rng.choice(len(probabilities), size=len(same), p=probabilities)
+			same = same[parents[same, 0] == parents[same, 1]]
+		return parents
+
+	def crossover_array(self, a, b):
+		# one random bit per gene picks the parent; unpacking random bytes is much
+		# cheaper than drawing a float per gene
+		random_bytes = self.rng.integers(0, 256, size=(len(a), (a.shape[1] + 7) // 8), dtype=np.uint8)
+		from_a = np.unpackbits(random_bytes, axis=1, count=a.shape[1]).view(bool)
+		return np.where(from_a, a, b)
+
+	def mutate_array(self, genomes):
+		factors = self.rng.random(genomes.shape)
+		factors *= 4
+		factors -= 2
+		factors *= genomes
+		return factors
+
+	def generate_random_genes_array(self, num):
+		num_turn_angles = DEFAULT_BRAIN_CONFIG.num_eye_angles
+		turn_angles = self.rng.random((num, num_turn_angles)) * np.pi
+		brain_weights = self.rng.random((num, DEFAULT_BRAIN_CONFIG.genome_size - num_turn_angles)) * 200 - 100
+		return np.concatenate([turn_angles, brain_weights], axis=1)
+
 	def generate_random_genes(self, num):
+		if self.vectorized:
+			return self.generate_random_genes_array(num)
+		num_turn_angles = DEFAULT_BRAIN_CONFIG.num_eye_angles
 		gene_pool = []
 		for _ in range(num):
-			turn_angles = [random.random() * np.pi for _ in range(2)]
-			brain_weights = [random.random() * 200 - 100 for _ in range(15 * 15 + 15 * 5)]
+			turn_angles = [random.random() * np.pi for _ in range(num_turn_angles)]
+			brain_weights = [random.random() * 200 - 100 for _ in range(DEFAULT_BRAIN_CONFIG.genome_size - num_turn_angles)]
 			gene_pool.append(turn_angles + brain_weights)
 		return gene_pool
 
@@ -81,13 +180,15 @@ class Evolver:
 
 
 if __name__ == '__main__':
+	parser = argparse.ArgumentParser()
+	parser.add_argument('--resume', action='store_true', help='carry on from the last checkpoint in brains.checkpoint.npz')
+	args = parser.parse_args()
+
 	pop = 500
-	evolver = Evolver(1000, pop, pop // 10)
-	init_gene_pool = evolver.generate_random_genes(pop)
-	results, max_scores = evolver.evolve(init_gene_pool)
+	evolver = Evolver(1000, pop, pop // 10, num_workers=os.cpu_count(), vectorized=True, checkpoint_path='brains.checkpoint.npz')
+	init_gene_pool = None if args.resume else evolver.generate_random_genes(pop)
+	results, max_scores = evolver.evolve(init_gene_pool, resume=args.resume)
 
 	print(max_scores)
 
-	with open('brains.out', 'w') as f:
-		for result in results:
-			f.write(str(result[1]) + '\r\n')
+	GenomeStore('brains.npy').append(len(max_scores) - 1, [(score, genes_to_genome(genes)) for score, genes in results])
@@ -0,0 +1,74 @@
+import math
+import numpy as np
+
+from brain_config import DEFAULT_BRAIN_CONFIG
+import utils
+
+# (to the last bit) the input from which the exact sigmoid rounds to 1.0; all outputs
+# above it tie in Snake.Brain.forward, so clipping there keeps argmax's choice among them
+SIGMOID_ONE = -math.log(np.finfo(float).eps / 2)
+
+
+class FastMath:
+	# An approximate Snake.look and Snake.decide for snakes given one. Decisions can
+	# differ from the exact ones; benchmarks/bench_fast_math.py measures how often.
+	#   look tests an object against an eye's cone with dot products and squared
+	#     distances instead of atan2, asin and sqrt (an object of size s at distance d
+	#     is in the cone of an eye whose unit vector e is within asin(s / d) of it when
+	#     e . v >= 0 and (e . v)^2 >= d^2 - s^2), and only takes the square root of the
+	#     distance an eye reports. Unlike the exact angles, cones do not stop at angle 0.
+	#   decide uses a table of the sigmoid over [-sigmoid_range, sigmoid_range], linearly
+	#     interpolated, for hidden layers, and since the sigmoid does not change which
+	#     output is largest, clips the last layer's outputs where they would round to 1.
+	def __init__(self, sigmoid_range=40, sigmoid_resolution=4096):
+		self.sigmoid_inputs = np.linspace(-sigmoid_range, sigmoid_range, sigmoid_resolution + 1)
+		with np.errstate(over='ignore'):
+			self.sigmoid_outputs = 1 / (1 + np.exp(-self.sigmoid_inputs))
+
+	def eye_vectors(self, direction, eye_angles):
+		return [(math.cos(direction + eye_angle), math.sin(direction + eye_angle)) for eye_angle in eye_angles]
+
+	def look(self, head_position, direction, eye_angles, objects, positions, brain_config=DEFAULT_BRAIN_CONFIG):
+		eye_vectors = self.eye_vectors(direction, eye_angles)
+		if len(objects) < utils.MIN_ARRAY_POINTS:
+			return self.look_at_each(head_position, eye_vectors, objects, positions, brain_config)
+
+		dx, dy = utils.calc_deltas(head_position, np.array(positions, dtype=float).reshape(-1, 2))
+		squared_distances = dx*dx + dy*dy
+		sizes = np.array([o.size for o in objects], dtype=float)
+		squared_sizes = sizes * sizes
+		eye_vectors = np.array(eye_vectors)
+		dots = eye_vectors[:, :1] * dx + eye_vectors[:, 1:] * dy
+		can_see = (squared_distances <= squared_sizes) | ((dots >= 0) & (dots * dots >= squared_distances - squared_sizes))
+		seen_distances = np.where(can_see, squared_distances, np.inf)
+		closest = len(objects) - 1 - np.argmin(seen_distances[:, ::-1], axis=1)
+
+		encode, unseen = brain_config.encode, brain_config.unseen
+		visuals = []
+		for i, k in enumerate(closest.tolist()):
+			visuals += encode(objects[k].visual_encoding) + [math.sqrt(squared_distances[k])] if can_see[i, k] else unseen
+		return visuals
+
+	def look_at_each(self, head_position, eye_vectors, objects, positions, brain_config=DEFAULT_BRAIN_CONFIG):
+		# look's result, one object at a time; seen holds each eye's (squared distance, object)
+		seen = [None for eye in eye_vectors]
+		head_x, head_y = head_position
+		for other_object, position in zip(objects, positions):
+			dx = position[0] - head_x
+			dy = position[1] - head_y
+			squared_distance = dx*dx + dy*dy
+			squared_size = other_object.size * other_object.size
+			for i, (eye_x, eye_y) in enumerate(eye_vectors):
+				if seen[i] and squared_distance > seen[i][0]: continue
+				dot = eye_x*dx + eye_y*dy
+				if squared_distance <= squared_size or (dot >= 0 and dot*dot >= squared_distance - squared_size):
+					seen[i] = (squared_distance, other_object)
+
+		encode, unseen = brain_config.encode, brain_config.unseen
+		return [value for eye in seen for value in (encode(eye[1].visual_encoding) + [math.sqrt(eye[0])] if eye else unseen)]
+
+	def decide(self, layers, information):
+		vector = information
+		for layer in layers[:-1]:
+			vector = np.interp(layer.dot(vector), self.sigmoid_inputs, self.sigmoid_outputs)
+		return np.minimum(layers[-1].dot(vector), SIGMOID_ONE).argmax()
@@ -0,0 +1,90 @@
+import json
+import sqlite3
+import hashlib
+import logging
+from collections import OrderedDict
+
+
+def hash_genome(genome, params={}):
+	# stable across runs and processes, unlike hash(); floats keep their full repr
+	encoded = json.dumps([params, genome], sort_keys=True)
+	return hashlib.sha1(encoded.encode()).hexdigest()
+
+
+class CachedFitness:
+	# Wraps a population fitness function so genomes that were already scored with
+	# the same params are not simulated again. params must hold everything the
+	# score depends on besides the genome (board and run parameters, seeds, ...);
+	# keyword arguments given per call are passed through and become part of the key.
+	# An LRU of max_size scores is kept in memory; with a path, scores are also
+	# kept in an SQLite file that persists across runs.
+	def __init__(self, population_fitness_function, params={}, max_size=100000, path=None):
+		self.population_fitness_function = population_fitness_function
+		self.params = params
+		self.max_size = max_size
+		self.scores = OrderedDict()
+		self.db = None
+		if path is not None:
+			self.db = sqlite3.connect(path)
+			self.db.execute('CREATE TABLE IF NOT EXISTS fitness (key TEXT PRIMARY KEY, score TEXT)')
+		self.history = []
+		self.logger = logging.getLogger(__name__)
+
+	def __call__(self, genomes, **kwargs):
+		params = {**self.params, **kwargs}
+		keys = [hash_genome(genome, params) for genome in genomes]
+		stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+
+		scores = {} # this generation's scores, safe from LRU eviction while it is scored
+		missing = {}
+		for key, genome in zip(keys, genomes):
+			if key in scores or key in missing:
+				stats["hits"] += 1 # duplicate within the generation
+			elif key in self.scores:
+				scores[key] = self.scores[key]
+				self.scores.move_to_end(key)
+				stats["hits"] += 1
+			else:
+				score = self.load(key)
+				if score is None:
+					missing[key] = genome
+					stats["misses"] += 1
+				else:
+					scores[key] = score
+					self.store(key, score)
+					stats["hits"] += 1
+					stats["disk_hits"] += 1
+
+		if missing:
+			new_scores = dict(zip(missing, self.population_fitness_function(list(missing.values()), **kwargs)))
+			for key, score in new_scores.items():
+				self.store(key, score)
+			self.save(new_scores.items())
+			scores.update(new_scores)
+
+		self.history.append(stats)
+		self.logger.info("Fitness cache: {hits} hits ({disk_hits} from disk), {misses} misses".format(**stats))
+		return [scores[key] for key in keys]
+
+	def store(self, key, score):
+		self.scores[key] = score
+		self.scores.move_to_end(key)
+		while len(self.scores) > self.max_size:
+			self.scores.popitem(last=False)
+
+	def load(self, key):
+		if self.db is None:
+			return None
+		row = self.db.execute('SELECT score FROM fitness WHERE key = ?', (key,)).fetchone()
+		return json.loads(row[0]) if row else None
+
+	def save(self, key_scores):
+		if self.db is None:
+			return
+		with self.db:
+			self.db.executemany('INSERT OR REPLACE INTO fitness (key, score) VALUES (?, ?)', [(key, json.dumps(score)) for key, score in key_scores])
+
+	def close(self):
+		if self.db is not None:
+			self.db.close()
+			self.db = None
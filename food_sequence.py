@@ -0,0 +1,32 @@
+import random
+import numpy as np
+
+
+class FoodSequence:
+	# The positions a board's food spawns at, in spawn order. They only depend on the
+	# board's size and seed, and come from the board's own random.Random, which gives
+	# the numbers the global random module used to give after random.seed(seed). Every
+	# engine that takes its food from the sequence in order plays the same episode, and
+	# the positions can be computed ahead as an array, e.g. to ship to other processes.
+	def __init__(self, width, height, seed, block_size=64):
+		self.width = width
+		self.height = height
+		self.rng = random.Random(seed)
+		self.block_size = block_size
+		self.positions = np.empty((0, 2))
+		self.num_taken = 0
+
+	def precompute(self, num):
+		# the first num positions of the sequence, as a (num, 2) array
+		if num > len(self.positions):
+			num_new = max(num - len(self.positions), self.block_size)
+			# x before y, as Board.get_random_position drew them
+			new_positions = [(self.rng.random() * self.width, self.rng.random() * self.height) for _ in range(num_new)]
+			self.positions = np.concatenate([self.positions, np.array(new_positions, dtype=float).reshape(-1, 2)])
+		return self.positions[:num]
+
+	def take(self, num):
+		# the next num positions of the sequence
+		positions = self.precompute(self.num_taken + num)[self.num_taken:]
+		self.num_taken += num
+		return positions
@@ -0,0 +1,121 @@
+import os
+import sys
+import json
+import numpy as np
+
+from brain_config import DEFAULT_BRAIN_CONFIG
+
+
+def record_dtype(brain_config):
+	sizes = brain_config.gene_sizes
+	return np.dtype([
+		("generation", np.int64),
+		("fitness", np.float64),
+		("eye_angles", np.float64, (sizes["eye_angles"],)),
+		("w1", np.float64, (sizes["w1"],)),
+		("w2", np.float64, (sizes["w2"],))
+	])
+
+
+class GenomeStore:
+	# An append-only .npy file of genome records (generation, fitness, eye_angles, w1,
+	# w2). Each append writes the new records to the end of the file and rewrites the
+	# shape in the header, which numpy pads so it can grow in place; the file stays a
+	# plain .npy that np.load can read or memory-map. Records are read through a
+	# memory map, so picking the top genomes does not load every genome. The sizes of the
+	# genes come from brain_config, and a store only opens with the config it was made with.
+	def __init__(self, path, top=None, brain_config=DEFAULT_BRAIN_CONFIG):
+		self.path = path
+		self.top_per_generation = top # how many of each generation's best genomes to keep; None keeps all
+		self.brain_config = brain_config
+		self.dtype = record_dtype(brain_config)
+		if not os.path.exists(path):
+			np.save(path, np.empty(0, dtype=self.dtype))
+		with open(path, 'rb') as f:
+			np.lib.format.read_magic(f)
+			shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+			self.header_size = f.tell()
+		if dtype != self.dtype or fortran_order or len(shape) != 1:
+			raise ValueError("{} does not hold genome records".format(path))
+		self.length = shape[0]
+
+	def __len__(self):
+		return self.length
+
+	def append(self, generation_num, fitness_results):
+		# fitness_results are (fitness, genome) pairs, as the evaluator returns them
+		results = sorted(fitness_results, key=lambda x: x[0], reverse=True)[:self.top_per_generation]
+		records = np.zeros(len(results), dtype=self.dtype)
+		for record, (fitness, genome) in zip(records, results):
+			record["generation"] = generation_num
+			record["fitness"] = fitness
+			record["eye_angles"], record["w1"], record["w2"] = genome["eye_angles"], genome["w1"], genome["w2"]
+
+		with open(self.path, 'r+b') as f:
+			f.seek(self.header_size + self.length * self.dtype.itemsize)
+			f.write(records.tobytes())
+			self.length += len(records)
+			f.seek(0)
+			self.write_header(f)
+
+	def write_header(self, f):
+		header = {"descr": np.lib.format.dtype_to_descr(self.dtype), "fortran_order": False, "shape": (self.length,)}
+		np.lib.format.write_array_header_1_0(f, header)
+		if f.tell() != self.header_size:
+			raise ValueError("the header of {} can not grow to {} records".format(self.path, self.length))
+
+	def load(self):
+		if self.length == 0:
+			return np.empty(0, dtype=self.dtype)
+		return np.load(self.path, mmap_mode='r')
+
+	def top(self, k, generation_num=None):
+		# the k fittest records, fittest first, optionally from one generation only
+		records = self.load()
+		indices = np.arange(len(records))
+		if generation_num is not None:
+			indices = np.flatnonzero(records["generation"] == generation_num)
+		fitness = np.nan_to_num(records["fitness"][indices], nan=-np.inf)
+		k = min(k, len(indices))
+		best = np.argpartition(-fitness, k - 1)[:k] if k else indices[:0]
+		best = best[np.argsort(-fitness[best], kind='stable')]
+		return np.array(records[indices[best]])
+
+	def top_genomes(self, k, generation_num=None):
+		return [record_to_genome(record) for record in self.top(k, generation_num)]
+
+	def import_results_json(self, path, generation_num=0):
+		# holland's genome files, e.g. samples/*.json and results/genomes.json
+		with open(path, 'r') as f:
+			results = json.loads(f.readline())["results"]
+		self.append(generation_num, results)
+
+	def import_brains_out(self, path, generation_num=0):
+		# evolver.py's old output: one flat gene list per line, fittest first, no scores
+		with open(path, 'r') as f:
+			genes = [json.loads(line) for line in f if line.strip()]
+		self.append(generation_num, [(np.nan, genes_to_genome(g, self.brain_config)) for g in genes])
+
+
+def genes_to_genome(genes, brain_config=DEFAULT_BRAIN_CONFIG):
+	# a flat gene list laid out eye_angles, w1, w2
+	eye_angles_size, w1_size = brain_config.gene_sizes["eye_angles"], brain_config.gene_sizes["w1"]
+	return {
+		"eye_angles": genes[:eye_angles_size],
+		"w1": genes[eye_angles_size:eye_angles_size + w1_size],
+		"w2": genes[eye_angles_size + w1_size:]
+	}
+
+def record_to_genome(record):
+	return {"eye_angles": record["eye_angles"].tolist(), "w1": record["w1"].tolist(), "w2": record["w2"].tolist()}
+
+
+if __name__ == '__main__':
+	# python genome_store.py <store.npy> <results.json or brains.out>...
+	store = GenomeStore(sys.argv[1])
+	for path in sys.argv[2:]:
+		if path.endswith('.json'):
+			store.import_results_json(path)
+		else:
+			store.import_brains_out(path)
+	print('{} holds {} genomes'.format(store.path, len(store)))
@@ -0,0 +1,35 @@
+import json
+
+from brain_config import DEFAULT_BRAIN_CONFIG
+
+SAMPLE_PATHS = ['samples/sample1.json', 'samples/sample2.json']
+
+
+def load_samples(paths=SAMPLE_PATHS):
+	# the genomes in Holland results files, like the samples
+	genomes = []
+	for path in paths:
+		with open(path, 'r') as f:
+			genomes += [genome for score, genome in json.loads(f.readline())["results"]]
+	return genomes
+
+def generate_random_genome(rng, max_eye_angle=3, brain_config=DEFAULT_BRAIN_CONFIG):
+	# weights drawn like evolution.py's initial distribution, from a random.Random;
+	# eye angles above pi make snakes that die at once
+	sizes = brain_config.gene_sizes
+	return {
+		"eye_angles": [rng.random() * max_eye_angle for _ in range(sizes["eye_angles"])],
+		"w1": [rng.random() * 200 - 100 for _ in range(sizes["w1"])],
+		"w2": [rng.random() * 200 - 100 for _ in range(sizes["w2"])]
+	}
+
+def mutate(genome, rng, sigma=0.5):
+	# every gene scaled by its own 1 + gauss(0, sigma)
+	return {key: [gene * (1 + rng.gauss(0, sigma)) for gene in genes] for key, genes in genome.items()}
+
+def generate_population(samples, size, rng):
+	# the samples plus mutants of them, so the population has some good snakes and many bad ones
+	population = list(samples)
+	while len(population) < size:
+		population.append(mutate(rng.choice(samples), rng))
+	return population
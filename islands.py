@@ -0,0 +1,187 @@
+import os
+import math
+import queue
+import random
+import logging
+import multiprocessing
+import numpy as np
+
+from evaluation import PopulationEvolver
+
+
+def get_neighbors(topology, num_islands):
+	# the islands each island sends its migrants to: "ring" sends to the next island,
+	# "full" to every other one; a list (or dict) of destinations per island is used as is
+	if topology == "ring":
+		return [[(i + 1) % num_islands] for i in range(num_islands)] if num_islands > 1 else [[]]
+	if topology == "full":
+		return [[j for j in range(num_islands) if j != i] for i in range(num_islands)]
+	if isinstance(topology, dict):
+		return [list(topology.get(i, [])) for i in range(num_islands)]
+	if isinstance(topology, (list, tuple)) and len(topology) == num_islands:
+		return [list(destinations) for destinations in topology]
+	raise ValueError("topology must be 'ring', 'full' or the destinations of each of the {} islands".format(num_islands))
+
+def island_storage_options(storage_options, island_num):
+	# each island stores what a single population would, under <path>/island_<n>/
+	island_options = {}
+	for kind, options in storage_options.items():
+		options = dict(options)
+		if kind in ("genome_store", "checkpoint"):
+			directory, file_name = os.path.split(options["path"])
+			options["path"] = os.path.join(directory, "island_{}".format(island_num), file_name)
+			os.makedirs(os.path.dirname(options["path"]), exist_ok=True)
+		elif "path" in options:
+			options["path"] = os.path.join(options["path"], "island_{}".format(island_num), "")
+			os.makedirs(options["path"], exist_ok=True)
+		island_options[kind] = options
+	return island_options
+
+
+class Migration:
+	# The migrate hook of one island's PopulationEvolver. Every interval generations it
+	# sends the island's num_migrants best results to the islands it points to, and
+	# waits for the migrants of the islands that point to it, which replace the island's
+	# worst results with the scores they were given at home. An island that has stopped
+	# evolving sends None and is no longer waited for, nor is one that has gone past the
+	# generation (islands resumed from checkpoints of different generations).
+	def __init__(self, island_num, inboxes, destinations, sources, interval=10, num_migrants=5, ascending=True):
+		self.island_num = island_num
+		self.inboxes = inboxes
+		self.destinations = destinations
+		self.sources = sources
+		self.interval = interval
+		self.num_migrants = num_migrants
+		self.ascending = ascending
+		self.stopped = set()
+		self.pending = {}
+		self.newest = {}
+
+	def __call__(self, generation_num, fitness_results):
+		if (generation_num + 1) % self.interval != 0:
+			return fitness_results
+		# results are sorted best last
+		migrants = fitness_results[-self.num_migrants:] if self.num_migrants else []
+		for destination in self.destinations:
+			self.inboxes[destination].put((generation_num, self.island_num, migrants))
+		received = self.receive(generation_num)[:len(fitness_results)]
+		results = received + list(fitness_results[len(received):])
+		return sorted(results, key=lambda x: x[0], reverse=(not self.ascending))
+
+	def receive(self, generation_num):
+		# the migrants sent for generation_num, in the order of their islands; migrants
+		# that arrive early for a later generation are kept until then
+		waiting = set(self.sources)
+		received = {}
+		while True:
+			for source in list(waiting):
+				if (generation_num, source) in self.pending:
+					received[source] = self.pending.pop((generation_num, source))
+					waiting.remove(source)
+				elif source in self.stopped or self.newest.get(source, -1) > generation_num:
+					waiting.remove(source)
+			if not waiting:
+				break
+			sent_generation, source, migrants = self.inboxes[self.island_num].get()
+			if migrants is None:
+				self.stopped.add(source)
+			elif sent_generation >= generation_num:
+				self.pending[(sent_generation, source)] = migrants
+				self.newest[source] = max(sent_generation, self.newest.get(source, -1))
+		return [migrant for source in sorted(received) for migrant in received[source]]
+
+	def close(self):
+		for destination in self.destinations:
+			self.inboxes[destination].put((None, self.island_num, None))
+
+
+def run_island(island_num, seed, evolver, migration, results, evolve_kwargs):
+	# the target of each island's process; the forked island reseeds the generators
+	# holland breeds from, or every island would breed the same children
+	random.seed(seed + island_num)
+	np.random.seed((seed + island_num) % 2**32)
+	try:
+		fitness_results = evolver.evolve(migrate=migration, **evolve_kwargs)
+	finally:
+		migration.close()
+	results.put((island_num, fitness_results))
+
+
+class IslandEvolver:
+	# Evolves num_islands populations side by side, one process each, with
+	# PopulationEvolver and the same genome_params and selection_strategy. Every
+	# migration_interval generations each island sends its num_migrants best genomes
+	# along the topology (see get_neighbors). Each island has a population of
+	# generation_params' population_size, and is stored as storage_options says under
+	# its own island_<n>/ directory, checkpoints included; with resume=True each island
+	# carries on from its own last checkpoint. evolve returns the final results of all islands
+	# together, sorted like a single population's.
+	def __init__(self, fitness_function, genome_params, selection_strategy, should_maximize_fitness=True, num_islands=None, migration_interval=10, num_migrants=5, topology="ring", seed=None):
+		self.fitness_function = fitness_function
+		self.genome_params = genome_params
+		self.selection_strategy = selection_strategy
+		self.should_maximize_fitness = should_maximize_fitness
+		self.num_islands = num_islands or os.cpu_count()
+		self.migration_interval = migration_interval
+		self.num_migrants = num_migrants
+		self.neighbors = get_neighbors(topology, self.num_islands)
+		self.seed = seed if seed is not None else random.randrange(2**32)
+
+		if migration_interval < 1:
+			raise ValueError("Migration interval must be at least 1")
+		if num_migrants < 0:
+			raise ValueError("Number of migrants cannot be negative")
+
+	def evolve(
+		self,
+		generation_params={},
+		initial_population=None,
+		stop_conditions={"n_generations": 100, "target_fitness": math.inf},
+		storage_options={},
+		logging_options={"level": logging.INFO, "format": "%(message)s"},
+		resume=False,
+	):
+		# genome_params are full of lambdas, which only forked processes can share
+		context = multiprocessing.get_context("fork")
+		inboxes = [context.Queue() for _ in range(self.num_islands)]
+		results = context.Queue()
+		sources = [[i for i in range(self.num_islands) if island_num in self.neighbors[i]] for island_num in range(self.num_islands)]
+
+		processes = []
+		for island_num in range(self.num_islands):
+			evolver = PopulationEvolver(self.fitness_function, self.genome_params, self.selection_strategy, self.should_maximize_fitness)
+			migration = Migration(island_num, inboxes, self.neighbors[island_num], sources[island_num], self.migration_interval, self.num_migrants, ascending=self.should_maximize_fitness)
+			evolve_kwargs = {
+				"generation_params": generation_params,
+				# the initial population is dealt out to the islands like cards
+				"initial_population": initial_population[island_num::self.num_islands] if initial_population is not None else None,
+				"stop_conditions": stop_conditions,
+				"storage_options": island_storage_options(storage_options, island_num),
+				"logging_options": dict(logging_options, format="Island {}: {}".format(island_num, logging_options.get("format", "%(message)s"))),
+				"resume": resume,
+			}
+			process = context.Process(target=run_island, args=(island_num, self.seed, evolver, migration, results, evolve_kwargs))
+			process.start()
+			processes.append(process)
+
+		island_results = {}
+		try:
+			while len(island_results) < self.num_islands:
+				try:
+					island_num, fitness_results = results.get(timeout=1)
+					island_results[island_num] = fitness_results
+				except queue.Empty:
+					failed = [i for i, process in enumerate(processes) if i not in island_results and process.exitcode not in (None, 0)]
+					if failed:
+						raise RuntimeError("island {} stopped without finishing its evolution".format(failed[0]))
+		finally:
+			for process in processes:
+				if len(island_results) < self.num_islands:
+					process.terminate()
+				process.join()
+
+		# with recorded fitness in memory, each island returns its results and its history
+		if isinstance(island_results[0], tuple):
+			return [island_results[i] for i in range(self.num_islands)]
+		combined = [result for i in range(self.num_islands) for result in island_results[i]]
+		return sorted(combined, key=lambda x: x[0], reverse=(not self.should_maximize_fitness))
@@ -1,7 +1,7 @@
-import pygame
-
-
 class DrawableMixin:
+	__slots__ = ()
+
 	def draw(self, surface):
+		import pygame # imported here so the simulation can run without it
 		rounded_position = [int(round(x)) for x in self.position]
 		pygame.draw.circle(surface, self.color, rounded_position, self.size)
\ No newline at end of file
@@ -0,0 +1,64 @@
+import math
+import logging
+import numpy as np
+
+
+class SuccessiveHalvingFitness:
+	# Scores a population at rising fidelity, successive-halving style. rungs are dicts,
+	# cheapest first, holding the seeds to run and keyword arguments for the seeded
+	# fitness function (e.g. {"seeds": [98], "max_time": 200}). Every genome runs the
+	# first rung; the best 1/eta of the genomes that ran a rung, but at least
+	# min_promoted, run the next. A genome's score at a rung is its mean over the rung's
+	# seeds.
+	#
+	# A genome's fitness is its score at the last rung it ran, capped at the lowest
+	# fitness of the genomes promoted past it. The genomes that made the last rung carry
+	# full fidelity scores, and those dropped on the way rank below them with a score
+	# from the same function, so holland sees one scale.
+	def __init__(self, seeded_fitness_function, rungs, eta=4, min_promoted=1):
+		self.seeded_fitness_function = seeded_fitness_function
+		self.rungs = rungs
+		self.eta = eta
+		self.min_promoted = min_promoted
+		self.history = []
+		self.logger = logging.getLogger(__name__)
+
+		if not rungs:
+			raise ValueError("Successive halving needs at least one rung")
+		if eta <= 1:
+			raise ValueError("eta must be above 1")
+
+	def __call__(self, genomes):
+		fitness = np.full(len(genomes), np.nan)
+		last_rungs = np.zeros(len(genomes), dtype=int)
+		active = np.arange(len(genomes))
+		rung_sizes = []
+
+		for rung_num, rung in enumerate(self.rungs):
+			if not len(active):
+				break
+			rung_sizes.append(len(active))
+			fitness[active] = self.score_rung([genomes[i] for i in active], rung)
+			last_rungs[active] = rung_num
+			if rung_num == len(self.rungs) - 1:
+				break
+			num_promoted = min(len(active), max(math.ceil(len(active) / self.eta), self.min_promoted))
+			best = np.argsort(-fitness[active], kind='stable')[:num_promoted]
+			active = active[np.sort(best)]
+
+		for rung_num in reversed(range(len(self.rungs) - 1)):
+			promoted = last_rungs > rung_num
+			dropped = last_rungs == rung_num
+			if promoted.any():
+				fitness[dropped] = np.minimum(fitness[dropped], fitness[promoted].min())
+
+		stats = {"rung_sizes": rung_sizes, "episodes": sum(size * len(rung.get("seeds", [None])) for size, rung in zip(rung_sizes, self.rungs))}
+		self.history.append(stats)
+		self.logger.info("Successive halving: {} genomes per rung, {} episodes".format(rung_sizes, stats["episodes"]))
+		return fitness.tolist()
+
+	def score_rung(self, genomes, rung):
+		kwargs = {key: value for key, value in rung.items() if key != "seeds"}
+		if "seeds" not in rung:
+			return np.array(self.seeded_fitness_function(genomes, **kwargs), dtype=float)
+		return np.mean([self.seeded_fitness_function(genomes, seed=seed, **kwargs) for seed in rung["seeds"]], axis=0)
@@ -0,0 +1,83 @@
+import logging
+import numpy as np
+
+
+class MultiSeedFitness:
+	# Scores every genome on the same seeds (common random numbers, so differences
+	# come from the genomes and not from luck with the food) and aggregates the
+	# per-seed scores with mean, min or a quantile.
+	#
+	# Seeds are run one round at a time over the genomes still in the race. After
+	# min_seeds rounds each genome's remaining seeds are bounded by a prediction
+	# interval, its mean +/- confidence pooled standard deviations (clipped to the
+	# range of scores seen so far). A genome is dropped once its best case cannot
+	# reach the pool_size-th best worst case. A dropped genome gets the aggregate
+	# of the seeds it did run, which is never above its best case, so it still
+	# ranks below the genomes that could make the selection pool.
+	# confidence=np.inf only drops genomes that cannot make the pool whatever
+	# their remaining scores are within the observed range.
+	def __init__(self, seeded_fitness_function, seeds, aggregate="mean", quantile=0.25, pool_size=None, min_seeds=2, confidence=3):
+		self.seeded_fitness_function = seeded_fitness_function
+		self.seeds = list(seeds)
+		self.aggregate = aggregate
+		self.quantile = quantile
+		self.pool_size = pool_size
+		self.min_seeds = min_seeds
+		self.confidence = confidence
+		self.history = []
+		self.logger = logging.getLogger(__name__)
+
+		if aggregate not in ["mean", "min", "quantile"]:
+			raise ValueError("aggregate must be one of 'mean', 'min' or 'quantile'")
+
+	def __call__(self, genomes):
+		num_seeds = len(self.seeds)
+		scores = np.full((len(genomes), num_seeds), np.nan)
+		active = np.arange(len(genomes))
+
+		for round_num, seed in enumerate(self.seeds):
+			round_scores = self.seeded_fitness_function([genomes[i] for i in active], seed=seed)
+			scores[active, round_num] = round_scores
+			num_run = round_num + 1
+			if num_run < self.min_seeds or num_run == num_seeds:
+				continue
+			active = active[self.can_make_pool(scores[active, :num_run], scores[:, :num_run])]
+
+		num_evaluated = np.sum(~np.isnan(scores), axis=1)
+		fitness = [self.aggregate_scores(genome_scores[:n]) for genome_scores, n in zip(scores, num_evaluated)]
+
+		stats = {"episodes": int(num_evaluated.sum()), "max_episodes": len(genomes) * num_seeds, "completed": len(active)}
+		self.history.append(stats)
+		self.logger.info("Multi-seed fitness: {episodes}/{max_episodes} episodes, {completed} genomes completed every seed".format(**stats))
+		return fitness
+
+	def can_make_pool(self, active_scores, all_scores):
+		if self.pool_size is None or len(active_scores) <= self.pool_size:
+			return np.ones(len(active_scores), dtype=bool)
+
+		low, high = np.nanmin(all_scores), np.nanmax(all_scores)
+		num_run = active_scores.shape[1]
+		means = active_scores.mean(axis=1)
+		spread = np.inf
+		if num_run > 1 and np.isfinite(self.confidence):
+			pooled_std = np.sqrt(np.mean(np.var(active_scores, axis=1, ddof=1)))
+			spread = self.confidence * pooled_std * np.sqrt(1 + 1 / num_run)
+		best_cases = self.bound(active_scores, np.minimum(high, means + spread))
+		worst_cases = self.bound(active_scores, np.maximum(low, means - spread))
+		threshold = np.sort(worst_cases)[-self.pool_size]
+		return best_cases >= threshold
+
+	def bound(self, scores, remaining_scores):
+		# the aggregate if every remaining seed scored remaining_scores (one per genome)
+		num_remaining = len(self.seeds) - scores.shape[1]
+		filled = np.concatenate([scores, np.repeat(remaining_scores[:, None], num_remaining, axis=1)], axis=1)
+		return self.aggregate_scores(filled, axis=1)
+
+	def aggregate_scores(self, scores, axis=None):
+		if self.aggregate == "mean":
+			aggregated = np.mean(scores, axis=axis)
+		elif self.aggregate == "min":
+			aggregated = np.min(scores, axis=axis)
+		else:
+			aggregated = np.quantile(scores, self.quantile, axis=axis)
+		return aggregated if axis is not None else float(aggregated)
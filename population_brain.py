@@ -0,0 +1,31 @@
+import numpy as np
+
+
+class PopulationBrain:
+	# The brains of a whole population stacked into (N, out, in) weight tensors so a
+	# tick's decisions for every snake come out of one batched matmul per layer.
+	# In float64 the outputs are bit-identical to Snake.Brain.forward.
+	def __init__(self, brains, dtype=np.float64):
+		self.dtype = np.dtype(dtype)
+		num_layers = len(brains[0].layers) if brains else 0
+		self.layers = [np.array([brain.layers[i] for brain in brains], dtype=self.dtype) for i in range(num_layers)]
+
+	def __len__(self):
+		return len(self.layers[0]) if self.layers else 0
+
+	def sigmoid(self, x):
+		return 1 / (1 + np.exp(-x))
+
+	def forward(self, vectors, rows=None):
+		# vectors is (n, inputs); rows selects which brains the n vectors belong to
+		vector = np.asarray(vectors, dtype=self.dtype)[..., None]
+		for layer in self.layers:
+			if rows is not None:
+				layer = layer[rows]
+			# matmul against a column dispatches to the same gemv as the per-snake path,
+			# which is what keeps float64 results identical
+			vector = self.sigmoid(np.matmul(layer, vector))
+		return vector[..., 0]
+
+	def decide(self, information, rows=None):
+		return self.forward(information, rows=rows).argmax(axis=1)
@@ -0,0 +1,65 @@
+import time
+import logging
+from holland.storage.utils import record
+
+PHASES = ["look", "decide", "act", "move", "check_tail", "eat", "respawn", "render"]
+COUNTERS = ["evaluations", "ticks", "objects_seen", "food_eaten", "cycle_exits", "no_progress_exits", "threshold_exits"]
+
+
+class Profile:
+	# Time spent in each phase of a tick, and counters. Boards and snakes only touch a
+	# profile when they are given one, so profiling costs one check per tick when off.
+	# ticks counts snake ticks, so a BatchBoard tick of n snakes counts n.
+	def __init__(self):
+		self.times = dict.fromkeys(PHASES, 0.0)
+		self.counts = dict.fromkeys(COUNTERS, 0)
+		self.last = time.perf_counter()
+
+	def start(self):
+		self.last = time.perf_counter()
+
+	def lap(self, phase):
+		# adds the time since the last start or lap to phase
+		now = time.perf_counter()
+		self.times[phase] += now - self.last
+		self.last = now
+
+	def count(self, counter, num=1):
+		self.counts[counter] += num
+
+	def merge(self, other):
+		for phase, seconds in other.times.items():
+			self.times[phase] += seconds
+		for counter, num in other.counts.items():
+			self.counts[counter] += num
+
+	def clear(self):
+		self.times = dict.fromkeys(PHASES, 0.0)
+		self.counts = dict.fromkeys(COUNTERS, 0)
+
+	def as_row(self, generation_num):
+		row = {"generation": generation_num}
+		row.update({phase + "_seconds": float(seconds) for phase, seconds in self.times.items()})
+		row.update({counter: int(num) for counter, num in self.counts.items()})
+		row["objects_per_tick"] = self.counts["objects_seen"] / max(self.counts["ticks"], 1)
+		return row
+
+
+# what the boards of this process were profiled into since it was last drained
+collected = Profile()
+
+def drain():
+	profile = Profile()
+	profile.merge(collected)
+	collected.clear()
+	return profile
+
+def record_profile(generation_num, **storage_options):
+	# writes everything collected during a generation as one row, like holland's fitness.csv
+	profile = drain()
+	record(profile.as_row(generation_num), **storage_options)
+
+	total = sum(profile.times.values()) or 1
+	shares = ", ".join("{} {:.0%}".format(phase, seconds / total) for phase, seconds in profile.times.items() if seconds)
+	logging.getLogger(__name__).info("Profile: {} snake ticks; {}".format(profile.counts["ticks"], shares))
+	return profile
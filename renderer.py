@@ -0,0 +1,55 @@
+import sys
+import pygame
+from pygame.locals import *
+
+
+class Renderer:
+	def __init__(self, width, height, color=(34, 139, 34), fps=60, offscreen=False):
+		self.color = color
+		self.fps = fps
+		self.offscreen = offscreen
+		if self.offscreen:
+			# frames are drawn on a plain surface, no window or display needed
+			self.surface = pygame.Surface((width, height))
+			return
+		pygame.init()
+		self.fps_clock = pygame.time.Clock()
+		self.surface = pygame.display.set_mode((width, height))
+		pygame.display.set_caption('Snake')
+
+	def update(self, board):
+		self.draw(board)
+		self.check_quit()
+		self.fps_clock.tick(self.fps)
+
+	def draw(self, board):
+		self.draw_scene(board.snake.body, board.foods)
+
+	def draw_scene(self, body_pieces, foods):
+		self.surface.fill(self.color)
+
+		for body_piece in body_pieces:
+			body_piece.draw(self.surface)
+		for food in foods:
+			food.draw(self.surface)
+
+		if not self.offscreen:
+			pygame.display.update()
+
+	def save(self, path):
+		pygame.image.save(self.surface, path)
+
+	def to_bytes(self):
+		return pygame.image.tobytes(self.surface, 'RGB')
+
+	def check_quit(self):
+		for event in pygame.event.get(QUIT):
+			self.terminate()
+		for event in pygame.event.get(KEYUP):
+			if event.key == K_ESCAPE:
+				self.terminate()
+			pygame.event.post(event)
+
+	def terminate(self):
+		pygame.quit()
+		sys.exit()
@@ -0,0 +1,196 @@
+import os
+import sys
+import json
+import multiprocessing
+import numpy as np
+
+from snake import Snake
+from food import Food
+
+
+class ReplayRecorder:
+	# Records an episode as Board.run plays it: the head position, direction and length
+	# after every tick, and when food spawns and which food is eaten. That is enough to
+	# rebuild every frame without the brain, see Replay. Give it to Board(recorder=...).
+	def start(self, board):
+		self.meta = {"width": board.width, "height": board.height, "color": list(board.color), "num_food": board.num_food}
+		self.heads = [board.snake.body[0].position]
+		self.directions = [board.snake.direction]
+		self.lengths = [len(board.snake.body)]
+		self.foods = list(board.foods)
+		self.food_spawns = [(0, food.position) for food in self.foods]
+		self.food_eats = []
+		self.is_alive = board.snake.is_alive
+
+	def record_tick(self, board):
+		tick = len(self.heads)
+		self.heads.append(board.snake.body[0].position)
+		self.directions.append(board.snake.direction)
+		self.lengths.append(len(board.snake.body))
+		self.is_alive = board.snake.is_alive
+
+		# the board keeps uneaten food in order and appends new food; self.foods keeps
+		# the previous foods alive, so new foods can not reuse their ids
+		current_ids = {id(food) for food in board.foods}
+		previous_ids = {id(food) for food in self.foods}
+		self.food_eats += [(tick, i) for i, food in enumerate(self.foods) if id(food) not in current_ids]
+		self.food_spawns += [(tick, food.position) for food in board.foods if id(food) not in previous_ids]
+		self.foods = list(board.foods)
+
+	def save(self, path):
+		np.savez_compressed(
+			path,
+			meta=np.array(json.dumps(dict(self.meta, is_alive=self.is_alive))),
+			heads=np.array(self.heads, dtype=float),
+			directions=np.array(self.directions, dtype=float),
+			lengths=np.array(self.lengths, dtype=np.uint32),
+			food_spawn_ticks=np.array([tick for tick, position in self.food_spawns], dtype=np.uint32),
+			food_spawn_positions=np.array([position for tick, position in self.food_spawns], dtype=float).reshape(-1, 2),
+			food_eat_ticks=np.array([tick for tick, i in self.food_eats], dtype=np.uint32),
+			food_eat_indices=np.array([i for tick, i in self.food_eats], dtype=np.uint32)
+		)
+
+
+class Replay:
+	# Plays a recorded episode back: after seek(tick), body holds the snake's body and
+	# foods the food as they were after that tick, rebuilt exactly from the log. Every
+	# keyframe_interval ticks that have been played, a copy of the state is kept as a
+	# keyframe, so seeking goes on from the nearest keyframe at or before the tick
+	# rather than from the start.
+	def __init__(self, data, keyframe_interval=100):
+		self.meta = json.loads(str(data["meta"]))
+		self.width, self.height = self.meta["width"], self.meta["height"]
+		self.heads = data["heads"]
+		self.directions = data["directions"]
+		self.lengths = data["lengths"]
+		self.food_spawns = self.group_by_tick(data["food_spawn_ticks"], data["food_spawn_positions"].tolist())
+		self.food_eats = self.group_by_tick(data["food_eat_ticks"], data["food_eat_indices"].tolist())
+		self.keyframe_interval = keyframe_interval
+		self.keyframes = {} # tick -> (body, foods)
+		self.reset()
+
+	@classmethod
+	def load(cls, path, **options):
+		with np.load(path) as data:
+			return cls(dict(data), **options)
+
+	def group_by_tick(self, ticks, values):
+		grouped = {}
+		for tick, value in zip(ticks.tolist(), values):
+			grouped.setdefault(tick, []).append(value)
+		return grouped
+
+	def __len__(self):
+		# the number of ticks played
+		return len(self.heads) - 1
+
+	def reset(self):
+		self.tick = 0
+		self.body = Snake.Body(self.heads[0].tolist())
+		self.foods = [Food(tuple(position)) for position in self.food_spawns.get(0, [])]
+
+	def step(self):
+		# moves the snake as Snake.move does, then grows it and updates the food as Board.update does
+		self.tick += 1
+		self.body[0].move_to(self.heads[self.tick].tolist())
+		self.body.follow_head()
+		for _ in range(self.lengths[self.tick] - self.lengths[self.tick - 1]):
+			self.body.append(Snake.BodyPiece(self.body[-1].history[0]))
+
+		eaten = set(self.food_eats.get(self.tick, []))
+		self.foods = [food for i, food in enumerate(self.foods) if i not in eaten]
+		self.foods += [Food(tuple(position)) for position in self.food_spawns.get(self.tick, [])]
+		if self.tick % self.keyframe_interval == 0 and self.tick not in self.keyframes:
+			self.keyframes[self.tick] = self.body.copy(), list(self.foods)
+
+	def seek(self, tick):
+		tick = max(0, min(tick, len(self)))
+		keyframe = max((k for k in self.keyframes if k <= tick and (k > self.tick or tick < self.tick)), default=None)
+		if keyframe is not None:
+			self.restore(keyframe)
+		elif tick < self.tick:
+			self.reset()
+		while self.tick < tick:
+			self.step()
+
+	def restore(self, keyframe):
+		body, foods = self.keyframes[keyframe]
+		self.tick = keyframe
+		self.body = body.copy() # stepping changes the body in place
+		self.foods = list(foods)
+
+	def frames(self, every=1):
+		# seeks to every every-th tick in turn, yielding the replay at each
+		for tick in range(0, len(self) + 1, every):
+			self.seek(tick)
+			yield self
+
+
+def play(replay, fps=60):
+	# shows the replay in a window; space pauses, left and right step through it while paused
+	import pygame
+	from renderer import Renderer
+	renderer = Renderer(replay.width, replay.height, tuple(replay.meta["color"]), fps=fps)
+	replay.reset()
+	is_paused = False
+	while True:
+		for event in pygame.event.get(pygame.KEYDOWN):
+			if event.key == pygame.K_SPACE:
+				is_paused = not is_paused
+			elif event.key == pygame.K_LEFT:
+				replay.seek(replay.tick - 1)
+			elif event.key == pygame.K_RIGHT:
+				replay.seek(replay.tick + 1)
+		if not is_paused and replay.tick < len(replay):
+			replay.step()
+		renderer.draw_scene(replay.body, replay.foods)
+		renderer.check_quit()
+		renderer.fps_clock.tick(fps)
+
+def render_frames(replay, directory, every=1):
+	# writes every every-th frame to directory as numbered PNGs
+	from renderer import Renderer
+	renderer = Renderer(replay.width, replay.height, tuple(replay.meta["color"]), offscreen=True)
+	os.makedirs(directory, exist_ok=True)
+	paths = []
+	for frame in replay.frames(every):
+		renderer.draw_scene(frame.body, frame.foods)
+		paths.append(os.path.join(directory, 'frame_{:06d}.png'.format(frame.tick)))
+		renderer.save(paths[-1])
+	return paths
+
+def render_gif(replay, path, fps=30, every=2):
+	# writing GIFs needs Pillow, which the simulation itself does not
+	try:
+		from PIL import Image
+	except ImportError:
+		raise ImportError("rendering a GIF needs Pillow (pip install Pillow); render PNG frames to a directory instead") from None
+	from renderer import Renderer
+	renderer = Renderer(replay.width, replay.height, tuple(replay.meta["color"]), offscreen=True)
+	images = []
+	for frame in replay.frames(every):
+		renderer.draw_scene(frame.body, frame.foods)
+		images.append(Image.frombytes('RGB', (replay.width, replay.height), renderer.to_bytes()))
+	images[0].save(path, save_all=True, append_images=images[1:], duration=int(1000 * every / fps), loop=0)
+	return path
+
+def render_file(replay_path, output_path, **render_options):
+	replay = Replay.load(replay_path)
+	if output_path.endswith('.gif'):
+		return render_gif(replay, output_path, **render_options)
+	return render_frames(replay, output_path, **render_options)
+
+def render_in_background(replay_path, output_path, **render_options):
+	# renders in its own process, so showcase renders do not take CPU from the caller;
+	# returns the started process
+	process = multiprocessing.Process(target=render_file, args=(replay_path, output_path), kwargs=render_options)
+	process.start()
+	return process
+
+
+if __name__ == '__main__':
+	# python replay.py <replay.npz> plays a replay; add a .gif path or a directory to render it instead
+	if len(sys.argv) > 2:
+		render_file(sys.argv[1], sys.argv[2])
+	else:
+		play(Replay.load(sys.argv[1]))
@@ -1,16 +1,18 @@
 import random
 import numpy as np
-import json
 
 from board import Board
+from genome_store import GenomeStore
+from replay import ReplayRecorder, Replay, play
 
 if __name__ == '__main__':
-	with open('results/genomes.json', 'r') as f:
-		all_results = json.loads(f.readline()).get("results")
-		best_result = all_results[-1]
-		snake_genome = best_result[1]
+	snake_genome = GenomeStore('results/genomes.npy').top_genomes(1)[0]
 
 	seed = random.randint(0,1000)
 	print(seed)
-	board = Board(400, 300, num_food=5, snake_genome=snake_genome, seed=seed)
-	board.run()
\ No newline at end of file
+	# simulate without rendering, then play the recording back
+	recorder = ReplayRecorder()
+	board = Board(400, 300, num_food=5, snake_genome=snake_genome, seed=seed, animation_on=False, recorder=recorder)
+	board.run(max_time=60 * 60 * 5) # up to five minutes at 60 fps
+	recorder.save('results/replay.npz')
+	play(Replay.load('results/replay.npz'))
@@ -0,0 +1,128 @@
+import sys
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+
+import profiling
+
+# A population in shared memory is one (capacity, width + 1 + PROFILE_SIZE) float64
+# array: each row holds a genome's genes laid out end to end (302 for the default snakes),
+# then the score a worker writes for it, then room for a profile. A worker scoring the
+# rows start to stop writes what its boards profiled into row start, so a task is only
+# a range of rows and nothing but the range goes to or comes back from the worker.
+PROFILE_SIZE = len(profiling.PHASES) + len(profiling.COUNTERS)
+
+
+def genomes_to_rows(genomes):
+	# the layout, as (gene, size) pairs, and the genomes as rows; gene is None for flat
+	# gene lists. (None, None) if the genomes are not all laid out alike
+	try:
+		if isinstance(genomes[0], dict):
+			layout = [(gene, len(genes)) for gene, genes in genomes[0].items()]
+			rows = np.hstack([np.array([genome[gene] for genome in genomes], dtype=float).reshape(len(genomes), size) for gene, size in layout])
+		else:
+			layout = [(None, len(genomes[0]))]
+			rows = np.array(genomes, dtype=float).reshape(len(genomes), layout[0][1])
+	except (ValueError, TypeError, KeyError):
+		return None, None
+	return layout, rows
+
+def row_to_genome(row, layout):
+	# the genome a row holds, its genes as views of the row
+	if layout[0][0] is None:
+		return row
+	genome = {}
+	offset = 0
+	for gene, size in layout:
+		genome[gene] = row[offset:offset + size]
+		offset += size
+	return genome
+
+def views(buffer, capacity, width):
+	# the genomes, scores and profiles in a population's memory
+	array = np.ndarray((capacity, width + 1 + PROFILE_SIZE), dtype=np.float64, buffer=buffer)
+	return array[:, :width], array[:, width], array[:, width + 1:]
+
+def profile_to_array(profile):
+	return np.array(list(profile.times.values()) + list(profile.counts.values()), dtype=float)
+
+def array_to_profile(array):
+	profile = profiling.Profile()
+	profile.times.update(zip(profiling.PHASES, array[:len(profiling.PHASES)].tolist()))
+	profile.counts.update(zip(profiling.COUNTERS, array[len(profiling.PHASES):].astype(int).tolist()))
+	return profile
+
+
+class SharedPopulation:
+	# The process that evaluates a population writes it here and reads the scores back;
+	# workers attach to it by name. The memory is made anew when a population does not fit.
+	def __init__(self):
+		self.memory = None
+		self.capacity = 0
+		self.width = 0
+		self.layout = None
+
+	@property
+	def name(self):
+		return self.memory.name
+
+	def write(self, genomes):
+		# False, and nothing written, if the genomes can not be laid out as rows
+		layout, rows = genomes_to_rows(genomes)
+		if layout is None:
+			return False
+		width = rows.shape[1]
+		if self.memory is None or len(genomes) > self.capacity or width != self.width:
+			self.close()
+			self.capacity, self.width = len(genomes), width
+			self.memory = shared_memory.SharedMemory(create=True, size=max(1, self.capacity * (width + 1 + PROFILE_SIZE) * 8))
+			self.genomes, self.scores, self.profiles = views(self.memory.buf, self.capacity, self.width)
+		self.layout = layout
+		self.genomes[:len(genomes)] = rows
+		self.profiles[:len(genomes)] = 0
+		return True
+
+	def merge_profiles(self, starts):
+		# what the workers scoring the rows from each of starts profiled, into profiling.collected
+		profiling.collected.merge(array_to_profile(self.profiles[starts].sum(axis=0)))
+
+	def close(self):
+		if self.memory is not None:
+			del self.genomes, self.scores, self.profiles
+			self.memory.close()
+			self.memory.unlink()
+			self.memory = None
+
+
+# the population this worker process is attached to, as (name, memory, views)
+attached = None
+
+def attach(name, capacity, width):
+	global attached
+	if attached is None or attached[0] != name:
+		detach()
+		if sys.version_info >= (3, 13):
+			memory = shared_memory.SharedMemory(name=name, track=False)
+		else:
+			# before 3.13 attaching registers the memory with this process's resource
+			# tracker, which unlinks it when the worker's tracker exits
+			register = resource_tracker.register
+			resource_tracker.register = lambda *args: None
+			try:
+				memory = shared_memory.SharedMemory(name=name)
+			finally:
+				resource_tracker.register = register
+		attached = (name, memory, views(memory.buf, capacity, width))
+	return attached[2]
+
+def detach():
+	global attached
+	if attached is not None:
+		memory = attached[1]
+		attached = None
+		memory.close()
+
+def score_rows(population_fitness_function, name, capacity, layout, start, stop):
+	# runs in a worker; reads the genomes from rows start to stop and writes back their scores
+	genomes, scores, profiles = attach(name, capacity, sum(size for gene, size in layout))
+	scores[start:stop] = population_fitness_function([row_to_genome(row, layout) for row in genomes[start:stop]])
+	profiles[start] = profile_to_array(profiling.drain())
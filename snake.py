@@ -1,69 +1,205 @@
 import math
 import numpy as np
-import pygame
-from functools import reduce
 
 from mixins import DrawableMixin
+from brain_config import DEFAULT_BRAIN_CONFIG
 import utils
 
 SNAKE_SPEED = 1.5
+BODY_PIECE_SIZE = 5
 
 
 class Snake:
-	def __init__(self, init_position, init_direction, genome={"eye_angles": [0,0]}):
-		self.body = [self.BodyPiece(init_position)]
+	def __init__(self, init_position, init_direction, genome={"eye_angles": [0,0]}, spatial_index=None, vision_prefilter=None, profile=None, rng=None, fast_math=None, brain_config=DEFAULT_BRAIN_CONFIG):
+		self.body = self.Body(init_position)
 		self.direction = init_direction
 		self.speed = SNAKE_SPEED
-		self.turn_angle1, self.turn_angle2 = genome["eye_angles"]
-		self.eye_angles = [0, self.turn_angle1, -self.turn_angle1, self.turn_angle2, -self.turn_angle2]
+		self.brain_config = brain_config
+		self.eye_angles = brain_config.eye_angles(genome["eye_angles"])
+		self.turns = brain_config.turn_angles(genome["eye_angles"]) # indexed by decision
 		brain_layers = [genome.get("w1", []), genome.get("w2", [])]
-		self.brain = self.Brain(brain_layers)
+		self.brain = self.Brain(brain_layers, rng, brain_config.dimensions)
 		self.is_alive = True
 
-		if self.turn_angle1 > np.pi or self.turn_angle2 > np.pi: self.is_alive = False
+		if any(angle > np.pi for angle in genome["eye_angles"]): self.is_alive = False
+
+		self.vision_prefilter = vision_prefilter
+		self.fast_math = fast_math # a FastMath, to look and decide approximately
+		self.profile = profile
+		self.spatial_index = spatial_index
+		if self.spatial_index is not None:
+			self.spatial_index.insert(self.body[0])
+			# where each piece was last registered in the index, see update_index
+			self.index_anchors = np.array([self.body[0].position], dtype=float)
 
 	def update(self, other_objects):
+		if self.profile is not None:
+			return self.update_with_profile(other_objects)
+		vision = self.look(other_objects)
+		decision = self.decide(vision)
+		self.act(decision)
+		self.move()
+		self.check_if_touching_tail()
+
+	def update_with_profile(self, other_objects):
+		profile = self.profile
+		profile.start()
 		vision = self.look(other_objects)
+		profile.lap("look")
 		decision = self.decide(vision)
+		profile.lap("decide")
 		self.act(decision)
+		profile.lap("act")
 		self.move()
+		profile.lap("move")
 		self.check_if_touching_tail()
+		profile.lap("check_tail")
+		profile.count("ticks")
 
 	def look(self, other_objects):
-		visuals = [None for eye in self.eye_angles]
-		head = self.body[0]
+		if self.spatial_index is not None and self.fast_math is None:
+			return self.look_with_index(other_objects)
+
+		head_position = self.body[0].position
+		if self.vision_prefilter is not None and isinstance(self.body, self.Body) and len(other_objects) + len(self.body) - 2 >= self.vision_prefilter.min_objects:
+			objects, positions = self.find_visible_candidates(head_position, other_objects)
+		else:
+			objects = other_objects + self.body[2:]
+			positions = [o.position for o in other_objects] + self.body.positions[2:len(self.body)].tolist() if isinstance(self.body, self.Body) else [o.position for o in objects]
+		if self.profile is not None:
+			self.profile.count("objects_seen", len(objects))
+		if self.fast_math is not None:
+			return self.fast_math.look(head_position, self.direction, self.eye_angles, objects, positions, self.brain_config)
+		if len(objects) < utils.MIN_ARRAY_POINTS:
+			return self.look_at_each(head_position, objects, positions)
+
+		# every eye against every object at once; of the objects an eye can see it sees the
+		# closest, and the last of several equally close ones. As in the original look, the
+		# difference between the view angle and an object's angle is not wrapped, so an eye
+		# looking just above angle 0 misses an object just below 2pi (and the other way
+		# round); BatchBoard and tick_kernel do the same, so every engine plays the same
+		# episodes as the original snakes did.
+		positions = np.array(positions, dtype=float)
+		sizes = np.array([o.size for o in objects], dtype=float)
+		distances = utils.calc_distances(head_position, positions)
+		angles = utils.calc_angles(head_position, positions)
+		with np.errstate(divide='ignore', invalid='ignore'):
+			view_angle_freedoms = np.where(distances >= sizes, np.arcsin(sizes / distances), 2*np.pi)
+		view_angles = np.array([(eye_angle + self.direction) % (2*np.pi) for eye_angle in self.eye_angles])
+		can_see = np.abs(view_angles[:, None] - angles) <= view_angle_freedoms
+		seen_distances = np.where(can_see, distances, np.inf)
+		closest = len(objects) - 1 - np.argmin(seen_distances[:, ::-1], axis=1)
+
+		encode, unseen = self.brain_config.encode, self.brain_config.unseen
+		visuals = []
+		for i, k in enumerate(closest.tolist()):
+			visuals += encode(objects[k].visual_encoding) + [float(distances[k])] if can_see[i, k] else unseen
+		return visuals
 
-		for other_object in other_objects + self.body[2:]:
-			distance = utils.calc_distance(head.position, other_object.position)
-			angle = utils.calc_angle(head.position, other_object.position)
+	def look_at_each(self, head_position, objects, positions):
+		# look's result, one object at a time; visuals holds each eye's (distance, object)
+		visuals = [None for eye in self.eye_angles]
+		for other_object, position in zip(objects, positions):
+			distance = utils.calc_distance(head_position, position)
+			angle = utils.calc_angle(head_position, position)
 			view_angle_freedom = math.asin(other_object.size / distance) if distance >= other_object.size else 2*np.pi
 
 			for i, eye_angle in enumerate(self.eye_angles):
-				if visuals[i] and distance > visuals[i][2]: continue
+				if visuals[i] and distance > visuals[i][0]: continue
 
 				view_angle = (eye_angle + self.direction) % (2*np.pi)
 				if abs(view_angle - angle) <= view_angle_freedom:
-					visuals[i] = other_object.visual_encoding + [distance]
+					visuals[i] = (distance, other_object)
+
+		encode, unseen = self.brain_config.encode, self.brain_config.unseen
+		return [value for visual in visuals for value in (encode(visual[1].visual_encoding) + [visual[0]] if visual else unseen)]
+
+	def find_visible_candidates(self, head_position, other_objects):
+		# the objects (and their positions) that look has to check, in look's order
+		view_angles = [(eye_angle + self.direction) % (2*np.pi) for eye_angle in self.eye_angles]
+		body_positions = self.body.positions[2:len(self.body)]
+		candidates = self.vision_prefilter.find_candidates(head_position, other_objects, body_positions, BODY_PIECE_SIZE, view_angles).tolist()
+		num_other = len(other_objects)
+		objects = [other_objects[i] if i < num_other else self.body[i - num_other + 2] for i in candidates]
+		body_candidates = [i - num_other + 2 for i in candidates if i >= num_other]
+		positions = [other_objects[i].position for i in candidates if i < num_other] + self.body.positions[body_candidates].tolist()
+		return objects, positions
+
+	def look_with_index(self, other_objects):
+		# Same result as look, but each eye only checks objects in the grid cells its
+		# ray crosses, nearest cells first. other_objects must be what the index holds.
+		# An object is measured once per look, however many cells and eyes it turns up in.
+		visuals = []
+		head_position = self.body[0].position
+		max_size = self.spatial_index.max_size + self.spatial_index.margin
+		# id -> [distance, angle, view angle freedom, the last eye that checked it];
+		# the head and the piece behind it are never seen
+		measurements = {id(piece): None for piece in self.body[:2]}
+		order = None # id -> position in look's object order
+
+		for eye_num, eye_angle in enumerate(self.eye_angles):
+			view_angle = (eye_angle + self.direction) % (2*np.pi)
+			seen_object, seen_distance = None, np.inf
+
+			for entry_distance, cell_objects in self.spatial_index.cast_ray(head_position, view_angle):
+				if entry_distance - max_size > seen_distance: break
+				for other_object in cell_objects:
+					key = id(other_object)
+					if key not in measurements:
+						if self.profile is not None:
+							self.profile.count("objects_seen")
+						position = other_object.position
+						distance = utils.calc_distance(head_position, position)
+						angle = utils.calc_angle(head_position, position)
+						view_angle_freedom = math.asin(other_object.size / distance) if distance >= other_object.size else 2*np.pi
+						measurements[key] = [distance, angle, view_angle_freedom, eye_num]
+					else:
+						measurement = measurements[key]
+						if measurement is None or measurement[3] == eye_num: continue
+						measurement[3] = eye_num
+						distance, angle, view_angle_freedom = measurement[:3]
 
-		return reduce(lambda a,x: a + x if x is not None else a + [0,0,0], visuals, [])
+					if distance > seen_distance: continue
+					if abs(view_angle - angle) <= view_angle_freedom:
+						if distance == seen_distance:
+							# look keeps the later of two equally close objects; their order
+							# is looked up once per look, and only if there is a tie
+							if order is None:
+								order = {id(o): i for i, o in enumerate(other_objects + self.body[2:])}
+							if order[key] < order[id(seen_object)]: continue
+						seen_object, seen_distance = other_object, distance
+
+			visuals += self.brain_config.encode(seen_object.visual_encoding) + [seen_distance] if seen_object else self.brain_config.unseen
+
+		return visuals
 
 	def decide(self, information):
+		if self.fast_math is not None:
+			return self.fast_math.decide(self.brain.layers, information)
 		decision_vector = self.brain.forward(np.array(information))
 		return decision_vector.argmax()
 
+	# the original snake's turns: decisions 0 and 1 turn by minus these, and with the
+	# default decision table 2 and 3 by plus them
+	@property
+	def turn_angle1(self):
+		return -self.turns[0]
+
+	@property
+	def turn_angle2(self):
+		return -self.turns[1]
+
 	def act(self, decision):
-		if decision == 0:
-			self.turn(-self.turn_angle1)
-		elif decision == 1:
-			self.turn(-self.turn_angle2)
-		elif decision == 2:
-			self.turn(self.turn_angle1)
-		elif decision == 3:
-			self.turn(self.turn_angle2)
+		angle = self.turns[decision]
+		if angle:
+			self.turn(angle)
 
 	def grow(self):
 		position = self.body[-1].history[0]
 		self.body.append(self.BodyPiece(position))
+		if self.spatial_index is not None:
+			self.spatial_index.insert(self.body[-1])
+			self.index_anchors = np.concatenate([self.index_anchors, [position]])
 
 	def turn(self, angle):
 		self.direction = (self.direction + angle) % (2*np.pi)
@@ -73,8 +209,28 @@ class Snake:
 		head_piece = self.body[0]
 		head_piece.move_to(next_position)
 
-		for i in range(1, len(self.body)):
-			self.body[i].move_to(self.body[i-1].history[0])
+		if isinstance(self.body, self.Body):
+			self.body.follow_head()
+		else:
+			for i in range(1, len(self.body)):
+				self.body[i].move_to(self.body[i-1].history[0])
+
+		if self.spatial_index is not None:
+			self.update_index()
+
+	def update_index(self):
+		# The index only re-registers pieces that drifted further than its slack from where
+		# they were registered; those are found with one array comparison, so the other
+		# pieces cost nothing. The anchors follow the index's own rule, so they stay in step.
+		if not isinstance(self.body, self.Body):
+			for body_piece in self.body:
+				self.spatial_index.move(body_piece)
+			return
+		positions = self.body.positions[:len(self.body)]
+		drifted = np.flatnonzero((np.abs(positions - self.index_anchors) > self.spatial_index.slack).any(axis=1))
+		for i in drifted.tolist():
+			self.spatial_index.move(self.body[i])
+		self.index_anchors[drifted] = positions[drifted]
 
 	def calc_next_position(self):
 		head_piece = self.body[0]
@@ -84,7 +240,19 @@ class Snake:
 
 	def check_if_touching_tail(self):
 		head = self.body[0]
-		for body_piece in self.body[2:]: #skipping first piece because they _should_ be touching
+		if self.spatial_index is not None:
+			ignored = {id(piece) for piece in self.body[:2]}
+			nearby = self.spatial_index.query_radius(head.position, head.size)
+			tail = [o for o in nearby if isinstance(o, self.BodyPiece) and id(o) not in ignored]
+		elif isinstance(self.body, self.Body) and len(self.body) - 2 >= utils.MIN_ARRAY_POINTS:
+			#skipping first piece because they _should_ be touching
+			tail_positions = self.body.positions[2:len(self.body)]
+			if utils.find_touching(head.position, head.size, tail_positions, BODY_PIECE_SIZE).any():
+				self.is_alive = False
+			return
+		else:
+			tail = self.body[2:]
+		for body_piece in tail:
 			if utils.are_touching(head, body_piece):
 				self.is_alive = False
 				return
@@ -94,9 +262,11 @@ class Snake:
 			body_piece.draw(surface)
 
 	class BodyPiece(DrawableMixin):
+		__slots__ = ('position', 'size', 'color', 'visual_encoding', 'history', 'max_history')
+
 		def __init__(self, position):
 			self.position = position[:]
-			self.size = 5
+			self.size = BODY_PIECE_SIZE
 			self.color = (0, 0, 0)
 			self.visual_encoding = [1,0]
 			self.history = [position[:]]
@@ -111,10 +281,119 @@ class Snake:
 			if len(self.history) > self.max_history:
 				self.history = self.history[-self.max_history:]
 
+	class Body:
+		# All piece positions live in one (capacity, 2) array and every piece's
+		# history in a fixed-size ring buffer, so the whole body follows the head
+		# with a few array operations. Indexing gives BodyPiece views onto the arrays.
+		def __init__(self, init_position, capacity=16):
+			self.max_history = int(BODY_PIECE_SIZE * 2 / SNAKE_SPEED)
+			self.length = 0
+			self.allocate(capacity)
+			self.pieces = []
+			self.append(Snake.BodyPiece(init_position))
+
+		def allocate(self, capacity):
+			positions = np.zeros((capacity, 2))
+			history = np.zeros((capacity * self.max_history, 2)) # piece i's ring is rows i*max_history onwards
+			history_start = np.zeros(capacity, dtype=int)
+			history_count = np.zeros(capacity, dtype=int)
+			if self.length:
+				positions[:self.length] = self.positions[:self.length]
+				history[:len(self.history)] = self.history
+				history_start[:self.length] = self.history_start[:self.length]
+				history_count[:self.length] = self.history_count[:self.length]
+			self.positions, self.history, self.history_start, self.history_count = positions, history, history_start, history_count
+			self.ring_offsets = np.arange(capacity) * self.max_history
+
+		def __len__(self):
+			return self.length
+
+		def __getitem__(self, index):
+			return self.pieces[index]
+
+		def __iter__(self):
+			return iter(self.pieces)
+
+		def append(self, body_piece):
+			if self.length == len(self.positions):
+				self.allocate(2 * len(self.positions))
+			piece = Snake.BodyView(self, self.length)
+			self.length += 1
+			piece.position = body_piece.position
+			piece.history = body_piece.history
+			self.pieces.append(piece)
+
+		def copy(self):
+			# a body with the same pieces and histories that moves independently of this one
+			body = object.__new__(Snake.Body)
+			body.max_history, body.length, body.ring_offsets = self.max_history, self.length, self.ring_offsets
+			body.positions, body.history = self.positions.copy(), self.history.copy()
+			body.history_start, body.history_count = self.history_start.copy(), self.history_count.copy()
+			body.pieces = [Snake.BodyView(body, i) for i in range(self.length)]
+			return body
+
+		def follow_head(self):
+			# Each piece moves to the oldest entry in the preceding piece's history as it
+			# stands after that piece has moved. The head has already moved; for the rest
+			# that entry is the current oldest, or the next one once the history is full.
+			if self.length < 2:
+				return
+			start, count = self.history_start[1:self.length - 1], self.history_count[1:self.length - 1]
+			oldest = np.where(count < self.max_history, start, (start + 1) % self.max_history)
+			self.positions[1] = self.history[self.history_start[0]]
+			self.positions[2:self.length] = self.history[self.ring_offsets[1:self.length - 1] + oldest]
+			self.push_history(1, self.length)
+
+		def push_history(self, first, stop):
+			start, count = self.history_start[first:stop], self.history_count[first:stop]
+			# a full ring overwrites its oldest entry, which sits at start
+			self.history[self.ring_offsets[first:stop] + (start + count) % self.max_history] = self.positions[first:stop]
+			start += count == self.max_history
+			start %= self.max_history
+			np.minimum(count + 1, self.max_history, out=count)
+
+	class BodyView(BodyPiece):
+		__slots__ = ('body', 'index')
+
+		def __init__(self, body, index):
+			self.body = body
+			self.index = index
+			self.size = BODY_PIECE_SIZE
+			self.color = (0, 0, 0)
+			self.visual_encoding = [1,0]
+			self.max_history = body.max_history
+
+		@property
+		def position(self):
+			return self.body.positions[self.index].tolist()
+
+		@position.setter
+		def position(self, position):
+			self.body.positions[self.index] = position
+
+		@property
+		def history(self):
+			start, count = self.body.history_start[self.index], self.body.history_count[self.index]
+			offset = self.body.ring_offsets[self.index]
+			return [self.body.history[offset + (start + k) % self.max_history].tolist() for k in range(count)]
+
+		@history.setter
+		def history(self, history):
+			history = history[-self.max_history:]
+			offset = self.body.ring_offsets[self.index]
+			self.body.history[offset:offset + len(history)] = history
+			self.body.history_start[self.index] = 0
+			self.body.history_count[self.index] = len(history)
+
+		def update_history(self, position):
+			self.body.positions[self.index] = position
+			self.body.push_history(self.index, self.index + 1)
+
 	class Brain:
-		def __init__(self, genes):
-			self.dimensions = [15, 15, 5] #15 comes from len(snake.eye_angles) * len(visual_encoding)
-			if not (genes[0] and genes[1]):
+		def __init__(self, genes, rng=None, dimensions=DEFAULT_BRAIN_CONFIG.dimensions):
+			self.rng = rng # a numpy Generator for random layers; the global np.random without one
+			self.dimensions = dimensions # inputs, hidden width, outputs; see BrainConfig
+			if not (len(genes[0]) and len(genes[1])):
 				self.layers = self.generate_random_layers()
 			else:
 				w1 = np.array(genes[0]).reshape(self.dimensions[1], self.dimensions[0])
@@ -122,8 +401,9 @@ class Snake:
 				self.layers = w1,w2
 
 		def generate_random_layers(self):
-			w1 = np.random.rand(self.dimensions[1], self.dimensions[0])
-			w2 = np.random.rand(self.dimensions[2], self.dimensions[1])
+			rng = self.rng if self.rng is not None else np.random
+			w1 = rng.random((self.dimensions[1], self.dimensions[0]))
+			w2 = rng.random((self.dimensions[2], self.dimensions[1]))
 			return w1,w2
 
 		def sigmoid(self, x):
@@ -0,0 +1,143 @@
+import math
+
+
+class SpatialGrid:
+	# Uniform grid over the plane, stored sparsely. Every object is registered in
+	# each cell its bounding box overlaps, so an object whose disc a ray passes
+	# through is always found in one of the cells the ray itself crosses.
+	# Boxes are padded by slack, and a moving object is only re-registered once it
+	# has drifted further than that from where it was registered.
+	#
+	# Keeping every body piece registered costs more than the array scan Snake.look and
+	# the tail check fall back on saves, except with many foods and a short body, so a
+	# Board only keeps an index while it has at least min_foods foods and at least
+	# foods_per_piece of them per body piece (the break-even points measured with
+	# benchmarks/bench_spatial_index.py); 0 for both keeps it for good.
+	def __init__(self, cell_size=16, slack=3, margin=1e-6, min_foods=100, foods_per_piece=4):
+		self.cell_size = cell_size
+		self.slack = slack
+		self.margin = margin # widens registrations so rounding never drops a candidate
+		self.min_foods = min_foods
+		self.foods_per_piece = foods_per_piece
+		self.cells = {}
+		self.registrations = {}
+		self.max_size = 0
+		self.bounds = None # cell range ever occupied: [min_i, min_j, max_i, max_j]
+
+	def __len__(self):
+		return len(self.registrations)
+
+	def __contains__(self, obj):
+		return id(obj) in self.registrations
+
+	def pays_off(self, num_food, length):
+		return num_food >= self.min_foods and length * self.foods_per_piece <= num_food
+
+	def calc_cell_range(self, position, radius):
+		x, y = position
+		r = radius + self.margin
+		return (
+			math.floor((x - r) / self.cell_size),
+			math.floor((y - r) / self.cell_size),
+			math.floor((x + r) / self.cell_size),
+			math.floor((y + r) / self.cell_size)
+		)
+
+	def iter_cells(self, cell_range):
+		min_i, min_j, max_i, max_j = cell_range
+		for i in range(min_i, max_i + 1):
+			for j in range(min_j, max_j + 1):
+				yield i,j
+
+	def insert(self, obj):
+		x, y = obj.position
+		cell_range = self.calc_cell_range(obj.position, obj.size + self.slack)
+		self.registrations[id(obj)] = x, y, cell_range
+		self.add_to_cells(obj, cell_range)
+		self.max_size = max(self.max_size, obj.size)
+
+	def remove(self, obj):
+		x, y, cell_range = self.registrations.pop(id(obj))
+		self.remove_from_cells(obj, cell_range)
+
+	def move(self, obj):
+		anchor_x, anchor_y, previous_range = self.registrations[id(obj)]
+		x, y = obj.position
+		if abs(x - anchor_x) <= self.slack and abs(y - anchor_y) <= self.slack:
+			return
+		cell_range = self.calc_cell_range(obj.position, obj.size + self.slack)
+		self.registrations[id(obj)] = x, y, cell_range
+		if cell_range != previous_range:
+			self.remove_from_cells(obj, previous_range)
+			self.add_to_cells(obj, cell_range)
+
+	def add_to_cells(self, obj, cell_range):
+		for cell in self.iter_cells(cell_range):
+			self.cells.setdefault(cell, {})[id(obj)] = obj
+		self.update_bounds(cell_range)
+
+	def remove_from_cells(self, obj, cell_range):
+		for cell in self.iter_cells(cell_range):
+			cell_objects = self.cells[cell]
+			del cell_objects[id(obj)]
+			if not cell_objects:
+				del self.cells[cell]
+
+	def update_bounds(self, cell_range):
+		if self.bounds is None:
+			self.bounds = list(cell_range)
+			return
+		self.bounds[0] = min(self.bounds[0], cell_range[0])
+		self.bounds[1] = min(self.bounds[1], cell_range[1])
+		self.bounds[2] = max(self.bounds[2], cell_range[2])
+		self.bounds[3] = max(self.bounds[3], cell_range[3])
+
+	def query_radius(self, position, radius):
+		# every object whose disc comes within radius of position (plus possibly a few more)
+		found = {}
+		for cell in self.iter_cells(self.calc_cell_range(position, radius)):
+			found.update(self.cells.get(cell, {}))
+		return list(found.values())
+
+	def cast_ray(self, origin, angle):
+		# Walks the cells crossed by the ray from origin in order (Amanatides & Woo),
+		# yielding the ray distance at which each cell is entered and its objects.
+		if self.bounds is None:
+			return
+		min_i, min_j, max_i, max_j = self.bounds
+		cs = self.cell_size
+		x, y = origin
+		dx, dy = math.cos(angle), math.sin(angle)
+		i, j = math.floor(x / cs), math.floor(y / cs)
+
+		step_i = 1 if dx > 0 else -1
+		step_j = 1 if dy > 0 else -1
+		t_delta_i = cs / abs(dx) if dx else math.inf
+		t_delta_j = cs / abs(dy) if dy else math.inf
+		t_max_i = ((i + (dx > 0)) * cs - x) / dx if dx else math.inf
+		t_max_j = ((j + (dy > 0)) * cs - y) / dy if dy else math.inf
+
+		t = 0
+		while True:
+			if min_i <= i <= max_i and min_j <= j <= max_j:
+				cell_objects = self.cells.get((i,j))
+				if cell_objects:
+					yield t, list(cell_objects.values())
+			elif not self.is_heading_into_bounds(i, j, step_i, step_j):
+				return
+
+			if t_max_i < t_max_j:
+				t = t_max_i
+				t_max_i += t_delta_i
+				i += step_i
+			else:
+				t = t_max_j
+				t_max_j += t_delta_j
+				j += step_j
+
+	def is_heading_into_bounds(self, i, j, step_i, step_j):
+		# outside the occupied range, keep walking only while still approaching it
+		min_i, min_j, max_i, max_j = self.bounds
+		approaching_i = min_i <= i <= max_i or (i < min_i and step_i > 0) or (i > max_i and step_i < 0)
+		approaching_j = min_j <= j <= max_j or (j < min_j and step_j > 0) or (j > max_j and step_j < 0)
+		return approaching_i and approaching_j
@@ -0,0 +1,72 @@
+import unittest
+import random
+import numpy as np
+
+from board import Board
+from batch_board import BatchBoard
+from genomes import load_samples, generate_random_genome
+
+
+class BatchBoardRunTest(unittest.TestCase):
+	def setUp(self):
+		rng = random.Random(5)
+		self.genomes = load_samples() + [generate_random_genome(rng, max_eye_angle=np.pi * 2) for _ in range(30)]
+
+	def run_serially(self, board_params, run_params, seeds):
+		return [Board(snake_genome=genome, animation_on=False, seed=seed, **board_params).run(**run_params) for genome, seed in zip(self.genomes, seeds)]
+
+	def test_matches_board_run_with_a_single_food(self):
+		'''BatchBoard.run returns the same (length, time_passed, is_alive) tuples as Board.run for every genome'''
+		board_params = {"width": 200, "height": 150, "num_food": 1}
+		run_params = {"time_limit": 200, "time_bonus": 100, "max_time": 1000}
+
+		expected_results = self.run_serially(board_params, run_params, [98] * len(self.genomes))
+		results = BatchBoard(snake_genomes=self.genomes, seed=98, **board_params).run(**run_params)
+
+		self.assertListEqual(results, expected_results)
+
+	def test_matches_board_run_with_many_foods_and_per_board_seeds(self):
+		'''BatchBoard.run matches Board.run when every board has its own seed and there is more than one food'''
+		board_params = {"width": 400, "height": 300, "num_food": 25}
+		run_params = {"time_limit": 200, "time_bonus": 100, "max_time": 600}
+		seeds = list(range(len(self.genomes)))
+
+		expected_results = self.run_serially(board_params, run_params, seeds)
+		results = BatchBoard(snake_genomes=self.genomes, seed=seeds, **board_params).run(**run_params)
+
+		self.assertListEqual(results, expected_results)
+
+	def test_accepts_per_board_time_limits(self):
+		'''BatchBoard.run stops each board at its own time limit'''
+		genomes = [self.genomes[0]] * 3
+		time_limits = [1, 5, 10]
+
+		results = BatchBoard(200, 150, genomes, seed=1).run(time_limit=time_limits)
+
+		times = [time for length, time, is_alive in results]
+		self.assertListEqual(times, time_limits)
+
+	def test_gives_weightless_genomes_the_brains_board_gives_them(self):
+		'''genomes without w1 and w2 get the same random brain as on a Board with the same seed'''
+		genomes = [{"eye_angles": [0.4, 1.1]}, {"eye_angles": [1.5, 0.2]}]
+		board_params = {"width": 200, "height": 150, "num_food": 3}
+		seeds = [1, 2]
+
+		boards = [Board(snake_genome=genome, animation_on=False, seed=seed, **board_params) for genome, seed in zip(genomes, seeds)]
+		batch_board = BatchBoard(snake_genomes=genomes, seed=seeds, **board_params)
+
+		expected_results = [board.run(time_limit=300) for board in boards]
+		np.testing.assert_array_equal(batch_board.brain.layers[0][0], boards[0].snake.brain.layers[0])
+		self.assertListEqual(batch_board.run(time_limit=300), expected_results)
+
+	def test_snakes_with_invalid_eye_angles_are_never_run(self):
+		'''a snake with a turn angle greater than pi starts dead and is returned with length 1 and no time passed'''
+		genome = dict(self.genomes[0], eye_angles=[4, 0.1])
+
+		results = BatchBoard(200, 150, [genome]).run(time_limit=100)
+
+		self.assertListEqual(results, [(1, 0, False)])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import os
+import random
+import tempfile
+import numpy as np
+
+import tick_kernel
+from board import Board
+from batch_board import BatchBoard
+from snake import Snake
+from brain_config import BrainConfig, DEFAULT_BRAIN_CONFIG
+from genome_store import GenomeStore, genes_to_genome
+from genomes import load_samples, generate_random_genome
+
+
+class BrainConfigTest(unittest.TestCase):
+	def test_defaults_are_the_original_snakes(self):
+		'''the default config has 5 eyes, a 15-15-5 brain and the original 302 gene layout'''
+		config = BrainConfig()
+
+		self.assertListEqual(config.dimensions, [15, 15, 5])
+		self.assertDictEqual(config.gene_sizes, {"eye_angles": 2, "w1": 15 * 15, "w2": 5 * 15})
+		self.assertEqual(config.genome_size, 302)
+		self.assertListEqual(config.eye_angles([0.3, 1.2]), [0, 0.3, -0.3, 1.2, -1.2])
+		self.assertListEqual(config.turn_angles([0.3, 1.2]), [-0.3, -1.2, 0.3, 1.2, 0])
+		self.assertListEqual(config.encode([1,0]) + config.encode([0,1]), [1, 0, 0, 1])
+
+	def test_sizes_follow_the_config(self):
+		'''eye count, encoding width and hidden width set the brain's dimensions and genome sizes'''
+		config = BrainConfig(num_eye_angles=1, hidden_width=4, encoding="signed")
+
+		self.assertEqual(config.num_eyes, 3)
+		self.assertEqual(config.encoding_width, 2)
+		self.assertListEqual(config.dimensions, [6, 4, 3])
+		self.assertDictEqual(config.gene_sizes, {"eye_angles": 1, "w1": 24, "w2": 12})
+		self.assertListEqual(config.encode([1,0]), [-1])
+		self.assertListEqual(config.encode([0,1]), [1])
+		self.assertListEqual(BrainConfig(encoding="distance").unseen, [0])
+
+	def test_turns_by_the_decision_table(self):
+		'''decision i turns a snake by turns[i] . eye_angles'''
+		config = BrainConfig(turns=[[1, 1], [0, -1], [0, 0]])
+		snake = Snake([100, 100], 0, genome={"eye_angles": [0.25, 0.5]}, brain_config=config)
+
+		self.assertListEqual(snake.turns, [0.75, -0.5, 0])
+		self.assertListEqual(config.dimensions, [15, 15, 3])
+		snake.act(0)
+		self.assertEqual(snake.direction, 0.75)
+		snake.act(2)
+		self.assertEqual(snake.direction, 0.75)
+
+	def test_needs_a_known_encoding(self):
+		'''BrainConfig refuses an encoding it does not know'''
+		with self.assertRaises(ValueError):
+			BrainConfig(encoding="rgb")
+
+
+class SmallBrainTest(unittest.TestCase):
+	def setUp(self):
+		self.config = BrainConfig(num_eye_angles=1, hidden_width=6, encoding="signed")
+		rng = random.Random(3)
+		self.genomes = [generate_random_genome(rng, brain_config=self.config) for _ in range(30)]
+		self.board_params = {"width": 200, "height": 150, "num_food": 3, "seed": 5}
+		self.run_params = {"time_limit": 200, "time_bonus": 100, "max_time": 1000}
+
+	def test_every_engine_plays_the_same_episodes(self):
+		'''Board, BatchBoard and tick_kernel agree on snakes with a smaller brain'''
+		expected = [Board(snake_genome=genome, animation_on=False, brain_config=self.config, **self.board_params).run(**self.run_params) for genome in self.genomes]
+
+		with np.errstate(over='ignore'):
+			batch = BatchBoard(snake_genomes=self.genomes, brain_config=self.config, **self.board_params).run(**self.run_params)
+		kernel = [tick_kernel.run(snake_genome=genome, brain_config=self.config, **self.board_params, **self.run_params) for genome in self.genomes]
+
+		self.assertListEqual(batch, expected)
+		self.assertListEqual(kernel, expected)
+		self.assertGreater(max(time_passed for length, time_passed, is_alive in expected), 100)
+
+	def test_sees_through_its_own_eyes(self):
+		'''a snake shows its brain one encoding and distance per eye'''
+		board = Board(snake_genome=self.genomes[0], animation_on=False, brain_config=self.config, **self.board_params)
+
+		self.assertEqual(len(board.snake.look(board.foods)), 6)
+		self.assertEqual(len(board.snake.eye_angles), 3)
+
+
+class GenomeLayoutTest(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.path = os.path.join(self.directory.name, 'genomes.npy')
+
+	def tearDown(self):
+		self.directory.cleanup()
+
+	def test_default_layout_reads_existing_genomes(self):
+		'''genes_to_genome splits the sample genomes' packed genes back into the same genome'''
+		for genome in load_samples():
+			genes = genome["eye_angles"] + genome["w1"] + genome["w2"]
+
+			self.assertEqual(genes_to_genome(genes), genome)
+			self.assertEqual(genes_to_genome(genes, DEFAULT_BRAIN_CONFIG), genome)
+
+	def test_stores_genomes_of_its_config(self):
+		'''a GenomeStore holds genomes of its config's sizes and refuses a store of another config'''
+		config = BrainConfig(num_eye_angles=1, hidden_width=4)
+		genome = generate_random_genome(random.Random(1), brain_config=config)
+		store = GenomeStore(self.path, brain_config=config)
+
+		store.append(0, [(1.0, genome)])
+
+		self.assertEqual(store.top_genomes(1), [genome])
+		genes = genome["eye_angles"] + genome["w1"] + genome["w2"]
+		self.assertEqual(genes_to_genome(genes, config), genome)
+		with self.assertRaises(ValueError):
+			GenomeStore(self.path)
@@ -0,0 +1,75 @@
+import os
+import random
+import tempfile
+import unittest
+import numpy as np
+
+from checkpoint import Checkpointer, genomes_to_arrays, arrays_to_genomes, results_to_arrays, arrays_to_results, random_states, set_random_states, write_checkpoint, load_checkpoint
+
+
+class GenomeArraysTest(unittest.TestCase):
+	def test_round_trips_dict_genomes(self):
+		'''genomes_to_arrays and arrays_to_genomes give back the same dict genomes'''
+		genomes = [{"eye_angles": [0.1, 2/3], "w1": [1.5, -2.25, 1e-300]}, {"eye_angles": [3.0, 0.0], "w1": [0.0, 1/7, -5.0]}]
+
+		self.assertListEqual(arrays_to_genomes("population", genomes_to_arrays("population", genomes)), genomes)
+
+	def test_round_trips_gene_lists(self):
+		'''genomes_to_arrays stores flat gene lists as one array'''
+		genomes = [[0.5, 1/3], [2.0, -1.0]]
+
+		np.testing.assert_array_equal(arrays_to_genomes("gene_pool", genomes_to_arrays("gene_pool", genomes)), genomes)
+
+	def test_round_trips_results(self):
+		'''results_to_arrays and arrays_to_results give back the same (fitness, genome) pairs'''
+		results = [(1.0, {"x": [1/3]}), (2.5, {"x": [-4.0]})]
+
+		self.assertListEqual(arrays_to_results("results", results_to_arrays("results", results)), results)
+		self.assertListEqual(arrays_to_results("results", {}), [])
+
+
+class RandomStatesTest(unittest.TestCase):
+	def test_restores_every_generator(self):
+		'''set_random_states puts random, numpy's global generator and a Generator back where random_states found them'''
+		generator = np.random.default_rng(5)
+		random.gauss(0, 1)
+		np.random.standard_normal()
+		with tempfile.TemporaryDirectory() as directory:
+			path = os.path.join(directory, "checkpoint.npz")
+			write_checkpoint(path, random_states(generator))
+			draws = [random.random(), random.gauss(0, 1), np.random.random(), np.random.standard_normal(), generator.random()]
+
+			set_random_states(load_checkpoint(path), generator)
+
+		self.assertListEqual([random.random(), random.gauss(0, 1), np.random.random(), np.random.standard_normal(), generator.random()], draws)
+
+
+class CheckpointerTest(unittest.TestCase):
+	def test_saves_in_the_background(self):
+		'''Checkpointer.save writes the checkpoint whole, on another thread, to the path'''
+		with tempfile.TemporaryDirectory() as directory:
+			checkpointer = Checkpointer(os.path.join(directory, "results", "checkpoint.npz"))
+			checkpointer.save({"generation": np.array(3), "scores": np.arange(4.0)})
+			checkpointer.save({"generation": np.array(4), "scores": np.arange(5.0)})
+			checkpointer.wait()
+
+			checkpoint = checkpointer.load()
+			self.assertEqual(int(checkpoint["generation"]), 4)
+			np.testing.assert_array_equal(checkpoint["scores"], np.arange(5.0))
+			self.assertListEqual(os.listdir(os.path.join(directory, "results")), ["checkpoint.npz"])
+
+	def test_saves_every_interval_generations(self):
+		'''Checkpointer.should_save is true every interval generations'''
+		checkpointer = Checkpointer("checkpoint.npz", interval=3)
+
+		self.assertListEqual([checkpointer.should_save(i) for i in range(1, 7)], [False, False, True, False, False, True])
+
+	def test_raises_what_went_wrong_writing(self):
+		'''Checkpointer.wait raises the error a background write ran into'''
+		with tempfile.TemporaryDirectory() as directory:
+			checkpointer = Checkpointer(os.path.join(directory, "missing", "checkpoint.npz"))
+			os.rmdir(os.path.join(directory, "missing"))
+			checkpointer.save({"generation": np.array(1)})
+
+			with self.assertRaises(FileNotFoundError):
+				checkpointer.wait()
@@ -0,0 +1,146 @@
+import unittest
+import random
+
+from board import Board
+from batch_board import BatchBoard
+from early_exit import EarlyExit, CYCLE, NO_PROGRESS, THRESHOLD, can_reach_length, ticks_to_reach, FOOD_REACH
+from genomes import load_samples, generate_random_genome, generate_population
+from profiling import Profile
+
+BOARD_PARAMS = {"width": 200, "height": 150, "num_food": 1, "seed": 98}
+RUN_PARAMS = {"time_limit": 200, "time_bonus": 100, "max_time": 1000}
+
+
+def random_genomes(num):
+	return [generate_random_genome(random.Random(i)) for i in range(num)]
+
+def run_boards(genomes, early_exit=None, **board_params):
+	boards = [Board(snake_genome=genome, animation_on=False, **{**BOARD_PARAMS, **board_params}) for genome in genomes]
+	results = [board.run(early_exit=early_exit, **RUN_PARAMS) for board in boards]
+	return results, [board.exit_reason for board in boards]
+
+
+class CanReachLengthTest(unittest.TestCase):
+	def test_is_true_once_long_enough(self):
+		'''can_reach_length is true when the snake is already min_length long'''
+		self.assertTrue(can_reach_length(3, 3, (0, 0), [(500, 500)], [], 0, 1, 0, 1))
+
+	def test_needs_the_time_to_get_to_the_food(self):
+		'''can_reach_length is false when the food is further away than the snake can move in the time left'''
+		food = (100 + FOOD_REACH, 0)
+		self.assertEqual(ticks_to_reach(100 + FOOD_REACH), 67)
+
+		self.assertTrue(can_reach_length(2, 1, (0, 0), [food], [], 0, 68, 0, 1000))
+		self.assertFalse(can_reach_length(2, 1, (0, 0), [food], [], 0, 66, 0, 1000))
+		self.assertFalse(can_reach_length(2, 1, (0, 0), [food], [], 0, 68, 0, 60))
+
+	def test_counts_the_time_each_food_earns(self):
+		'''can_reach_length chains the foods that spawn after each other with the time bonus each one earns'''
+		foods = [(20, 0)]
+		upcoming = [(140, 0), (260, 0)]
+
+		self.assertTrue(can_reach_length(4, 1, (0, 0), foods, upcoming, 0, 20, 100, 1000))
+		self.assertFalse(can_reach_length(4, 1, (0, 0), foods, upcoming, 0, 20, 10, 1000))
+
+	def test_with_many_foods(self):
+		'''can_reach_length needs a food in reach for every food still to be eaten'''
+		foods = [(10, 0), (0, 10), (400, 400)]
+
+		self.assertTrue(can_reach_length(3, 1, (0, 0), foods, [], 0, 50, 0, 1000))
+		self.assertFalse(can_reach_length(4, 1, (0, 0), foods, [], 0, 50, 0, 1000))
+
+	def test_never_cuts_a_snake_that_gets_there(self):
+		'''every snake the threshold detector cuts is one that ends shorter than min_length without early exits'''
+		genomes = random_genomes(40) + load_samples()
+		early_exit = EarlyExit(detect_cycles=False, min_length=3, check_interval=1)
+
+		results, exit_reasons = run_boards(genomes, early_exit)
+		full_results, _ = run_boards(genomes)
+
+		self.assertIn(THRESHOLD, exit_reasons)
+		for result, full_result, exit_reason in zip(results, full_results, exit_reasons):
+			if exit_reason == THRESHOLD:
+				self.assertLess(full_result[0], 3)
+			else:
+				self.assertEqual(result, full_result)
+
+
+class BoardEarlyExitTest(unittest.TestCase):
+	def test_cycles_finish_as_the_run_would(self):
+		'''a snake going round in circles is stopped and scored as if it had run until its time was up'''
+		genome = random_genomes(19)[18]
+		early_exit = EarlyExit(position_quantum=0.1, angle_quantum=0.01)
+		profile = Profile()
+		board = Board(snake_genome=genome, animation_on=False, profile=profile, **BOARD_PARAMS)
+
+		result = board.run(early_exit=early_exit, **RUN_PARAMS)
+
+		self.assertEqual(board.exit_reason, CYCLE)
+		self.assertEqual(profile.counts["cycle_exits"], 1)
+		self.assertLess(profile.counts["ticks"], 200)
+		self.assertEqual(result, Board(snake_genome=genome, animation_on=False, **BOARD_PARAMS).run(**RUN_PARAMS))
+
+	def test_no_progress(self):
+		'''a snake that has not eaten for no_progress_time ticks is stopped alive at the end of its time'''
+		genome = random_genomes(1)[0]
+		board = Board(snake_genome=genome, animation_on=False, **BOARD_PARAMS)
+
+		length, time_passed, is_alive = board.run(early_exit=EarlyExit(no_progress_time=50), time_limit=200)
+
+		self.assertEqual(board.exit_reason, NO_PROGRESS)
+		self.assertEqual((time_passed, is_alive), (200, True))
+
+	def test_without_detectors_nothing_changes(self):
+		'''runs with every detector off give the same results as runs without early exits'''
+		genomes = random_genomes(20) + load_samples()
+
+		results, exit_reasons = run_boards(genomes, EarlyExit(detect_cycles=False))
+
+		self.assertListEqual(results, run_boards(genomes)[0])
+		self.assertListEqual(exit_reasons, [None] * len(genomes))
+
+
+class BatchBoardEarlyExitTest(unittest.TestCase):
+	def assert_matches_board(self, genomes, early_exit, **board_params):
+		batch_board = BatchBoard(snake_genomes=genomes, **{**BOARD_PARAMS, **board_params})
+		results = batch_board.run(early_exit=early_exit, **RUN_PARAMS)
+
+		expected_results, expected_exit_reasons = run_boards(genomes, early_exit, **board_params)
+		self.assertListEqual(results, expected_results)
+		self.assertListEqual(batch_board.exit_reasons, expected_exit_reasons)
+		return batch_board.exit_reasons
+
+	def test_matches_board_run(self):
+		'''BatchBoard.run stops the same boards, for the same reasons, with the same results as Board.run'''
+		genomes = random_genomes(130) + load_samples()
+		early_exit = EarlyExit(no_progress_time=150, min_length=2, position_quantum=0.1, angle_quantum=0.01)
+
+		exit_reasons = self.assert_matches_board(genomes, early_exit)
+
+		self.assertTrue({CYCLE, NO_PROGRESS, THRESHOLD} <= set(exit_reasons))
+
+	def test_matches_board_run_with_many_foods(self):
+		'''BatchBoard.run matches Board.run's early exits when there is more than one food'''
+		genomes = random_genomes(30) + load_samples()
+		early_exit = EarlyExit(min_length=4)
+
+		exit_reasons = self.assert_matches_board(genomes, early_exit, num_food=5)
+
+		self.assertIn(THRESHOLD, exit_reasons)
+
+	def test_pool_keeps_the_best_results(self):
+		'''with pool_size, the pool_size best results are the same as without early exits and no cut snake ranks above them'''
+		genomes = generate_population(load_samples(), 64, random.Random(7))
+		batch_board = BatchBoard(snake_genomes=genomes, **BOARD_PARAMS)
+
+		results = batch_board.run(early_exit=EarlyExit(detect_cycles=False, pool_size=5), **RUN_PARAMS)
+		full_results = BatchBoard(snake_genomes=genomes, **BOARD_PARAMS).run(**RUN_PARAMS)
+
+		self.assertIn(THRESHOLD, batch_board.exit_reasons)
+		lengths = [length for length, time_passed, is_alive in full_results]
+		pool = sorted(range(len(genomes)), key=lambda i: lengths[i])[-5:]
+		for i in pool:
+			self.assertEqual(results[i], full_results[i])
+		for i, exit_reason in enumerate(batch_board.exit_reasons):
+			if exit_reason == THRESHOLD:
+				self.assertLess(results[i][0], lengths[pool[0]])
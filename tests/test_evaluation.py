@@ -0,0 +1,120 @@
+import os
+import random
+import tempfile
+import unittest
+from holland import library
+
+from evaluation import PopulationEvaluator, PopulationEvolver, ProcessPoolFitness, for_each_genome
+
+
+def sum_each(genomes):
+	return [sum(genome) for genome in genomes]
+
+def sum_genes_each(genomes):
+	return [sum(sum(genes) for genes in genome.values()) for genome in genomes]
+
+
+class PopulationEvaluatorEvaluateFitnessTest(unittest.TestCase):
+	def test_passes_the_whole_gene_pool_to_the_fitness_function(self):
+		'''PopulationEvaluator.evaluate_fitness calls the fitness function once with every genome'''
+		calls = []
+		def fitness_function(genomes):
+			calls.append(genomes)
+			return sum_each(genomes)
+		gene_pool = [[1,2], [0,0], [5,5]]
+
+		PopulationEvaluator(fitness_function).evaluate_fitness(gene_pool)
+
+		self.assertListEqual(calls, [gene_pool])
+
+	def test_returns_results_sorted_by_fitness(self):
+		'''PopulationEvaluator.evaluate_fitness pairs each score with its genome and sorts them like holland's Evaluator'''
+		gene_pool = [[1,2], [0,0], [5,5]]
+
+		results = PopulationEvaluator(sum_each).evaluate_fitness(gene_pool)
+
+		self.assertListEqual(results, [(0, [0,0]), (3, [1,2]), (10, [5,5])])
+
+
+class ProcessPoolFitnessCallTest(unittest.TestCase):
+	def test_returns_scores_in_the_original_order(self):
+		'''ProcessPoolFitness scores every genome on the pool and returns the scores in the order of the genomes'''
+		genomes = [[i, i % 7] for i in range(101)]
+
+		with ProcessPoolFitness(sum_each, num_workers=2, chunk_size=6) as pool_fitness_function:
+			scores = pool_fitness_function(genomes)
+
+		self.assertListEqual(scores, sum_each(genomes))
+
+	def test_can_be_reused_across_generations(self):
+		'''ProcessPoolFitness keeps its workers between calls'''
+		with ProcessPoolFitness(sum_each, num_workers=2) as pool_fitness_function:
+			first_scores = pool_fitness_function([[1], [2]])
+			second_scores = pool_fitness_function([[3], [4], [5]])
+
+		self.assertListEqual(first_scores, [1, 2])
+		self.assertListEqual(second_scores, [3, 4, 5])
+
+	def test_works_with_per_genome_fitness_functions(self):
+		'''for_each_genome adapts a per-genome fitness function so it can be run on the pool'''
+		genomes = [[1,2], [3], []]
+
+		with ProcessPoolFitness(for_each_genome(sum), num_workers=2, chunk_size=1) as pool_fitness_function:
+			scores = pool_fitness_function(genomes)
+
+		self.assertListEqual(scores, [3, 3, 0])
+
+	def test_scores_dict_genomes_through_shared_memory(self):
+		'''ProcessPoolFitness scores genomes of equally sized genes from its shared population, at any population size'''
+		genomes = [{"a": [i, 1], "b": [i % 3]} for i in range(30)]
+
+		with ProcessPoolFitness(sum_genes_each, num_workers=2, chunk_size=4) as pool_fitness_function:
+			self.assertListEqual(pool_fitness_function(genomes[:10]), sum_genes_each(genomes[:10]))
+			self.assertListEqual(pool_fitness_function(genomes), sum_genes_each(genomes))
+			self.assertEqual(pool_fitness_function.population.capacity, 30)
+
+
+class PopulationEvolverResumeTest(unittest.TestCase):
+	genome_params = {
+		"x": {
+			"type": "[float]",
+			"size": 3,
+			"initial_distribution": lambda: random.random(),
+			"crossover_function": library.get_uniform_crossover_function(),
+			"mutation_function": library.get_gaussian_mutation_function(sigma=0.1),
+			"mutation_rate": 0.2
+		}
+	}
+	selection_strategy = {"pool": {"top": 4}, "parents": {"weighting_function": library.get_polynomial_weighting_function(power=1.4)}}
+
+	def evolve(self, n_generations, storage_options={}, resume=False):
+		evolver = PopulationEvolver(lambda genomes: [sum(genome["x"]) for genome in genomes], self.genome_params, self.selection_strategy)
+		return evolver.evolve(
+			generation_params={"population_size": 12, "n_random": 2},
+			stop_conditions={"n_generations": n_generations},
+			storage_options=storage_options,
+			resume=resume
+		)
+
+	def test_resumes_where_it_left_off(self):
+		'''PopulationEvolver.evolve(resume=True) evolves the same generations as a run that never stopped'''
+		random.seed(11)
+		uninterrupted = self.evolve(6)
+
+		with tempfile.TemporaryDirectory() as directory:
+			storage_options = {"checkpoint": {"path": os.path.join(directory, "checkpoint.npz"), "interval": 2}}
+			random.seed(11)
+			self.evolve(5, storage_options)
+			random.seed(0)
+			resumed = self.evolve(6, storage_options, resume=True)
+
+		self.assertListEqual(resumed, uninterrupted)
+
+	def test_needs_checkpoint_storage_to_resume(self):
+		'''PopulationEvolver.evolve(resume=True) without a checkpoint path is an error'''
+		with self.assertRaises(ValueError):
+			self.evolve(2, resume=True)
+
+
+if __name__ == '__main__':
+	unittest.main()
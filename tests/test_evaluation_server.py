@@ -0,0 +1,146 @@
+import os
+import json
+import time
+import socket
+import asyncio
+import tempfile
+import threading
+import unittest
+
+import profiling
+from evaluation_server import EvaluationServer, RemoteFitness, parse_address
+
+
+def sum_each(genomes, offset=0):
+	return [sum(genome) + offset for genome in genomes]
+
+def slow_sum_each(genomes):
+	time.sleep(0.05)
+	return sum_each(genomes)
+
+def count_ticks(genomes):
+	profiling.collected.count("ticks", len(genomes))
+	return sum_each(genomes)
+
+def fail(genomes):
+	raise ValueError("bad genome")
+
+async def finish_tasks():
+	# lets the connections the clients closed finish before the loop stops
+	await asyncio.gather(*(asyncio.all_tasks() - {asyncio.current_task()}))
+
+
+class ServerThread:
+	# runs an EvaluationServer on its own event loop in a thread, on a fresh unix socket
+	def __init__(self, population_fitness_function, **server_options):
+		self.directory = tempfile.TemporaryDirectory()
+		self.address = 'unix:' + os.path.join(self.directory.name, 'evaluation.sock')
+		self.server = EvaluationServer(population_fitness_function, **server_options)
+		self.loop = asyncio.new_event_loop()
+		self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+		self.thread.start()
+		self.socket_server = asyncio.run_coroutine_threadsafe(self.server.start(self.address), self.loop).result()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.socket_server.close()
+		asyncio.run_coroutine_threadsafe(self.socket_server.wait_closed(), self.loop).result()
+		asyncio.run_coroutine_threadsafe(finish_tasks(), self.loop).result()
+		self.loop.call_soon_threadsafe(self.loop.stop)
+		self.thread.join()
+		self.loop.close()
+		self.server.close()
+		self.directory.cleanup()
+
+
+class EvaluationServerTest(unittest.TestCase):
+	def test_returns_scores_in_the_original_order(self):
+		'''RemoteFitness gets a score for every genome, in the order of the genomes'''
+		genomes = [[i, i % 7] for i in range(101)]
+
+		with ServerThread(sum_each, num_workers=2, chunk_size=6) as server, RemoteFitness(server.address) as remote_fitness:
+			scores = remote_fitness(genomes)
+
+		self.assertListEqual(scores, sum_each(genomes))
+
+	def test_sends_genomes_in_the_request_without_shared_memory(self):
+		'''RemoteFitness with shared=False sends the genomes themselves and gets the same scores'''
+		genomes = [[i, i % 7] for i in range(20)]
+
+		with ServerThread(sum_each, num_workers=2, chunk_size=6) as server, RemoteFitness(server.address, shared=False) as remote_fitness:
+			scores = remote_fitness(genomes)
+
+		self.assertListEqual(scores, sum_each(genomes))
+		self.assertIsNone(remote_fitness.population.memory)
+
+	def test_streams_chunks_as_they_finish(self):
+		'''RemoteFitness.stream yields every chunk of a batch once'''
+		genomes = [[i] for i in range(10)]
+
+		with ServerThread(sum_each, num_workers=2, chunk_size=3) as server, RemoteFitness(server.address) as remote_fitness:
+			chunks = sorted(remote_fitness.stream(genomes))
+
+		self.assertListEqual(chunks, [(0, [0, 1, 2]), (3, [3, 4, 5]), (6, [6, 7, 8]), (9, [9])])
+
+	def test_passes_keyword_arguments_to_the_fitness_function(self):
+		'''keyword arguments (e.g. a seed) go along with the batch'''
+		with ServerThread(sum_each, num_workers=1) as server, RemoteFitness(server.address) as remote_fitness:
+			self.assertListEqual(remote_fitness([[1], [2]], offset=10), [11, 12])
+			self.assertListEqual(remote_fitness([[1], [2]]), [1, 2])
+
+	def test_serves_several_clients_with_a_bounded_queue(self):
+		'''clients sharing a server with room for one queued chunk all get their own scores'''
+		results = {}
+		def evaluate(address, i):
+			with RemoteFitness(address) as remote_fitness:
+				results[i] = remote_fitness([[i, j] for j in range(8)])
+
+		with ServerThread(slow_sum_each, num_workers=2, chunk_size=2, max_pending_chunks=1) as server:
+			threads = [threading.Thread(target=evaluate, args=(server.address, i)) for i in range(3)]
+			for thread in threads:
+				thread.start()
+			for thread in threads:
+				thread.join()
+
+		self.assertDictEqual(results, {i: [i + j for j in range(8)] for i in range(3)})
+
+	def test_merges_the_workers_profiles(self):
+		'''what the server's boards were profiled into ends up in the client's profiling.collected'''
+		profiling.drain()
+		with ServerThread(count_ticks, num_workers=1, chunk_size=2) as server, RemoteFitness(server.address) as remote_fitness:
+			remote_fitness([[1]] * 5)
+
+		self.assertEqual(profiling.drain().counts["ticks"], 5)
+
+	def test_raises_when_the_fitness_function_fails(self):
+		'''errors on the server are raised by the client'''
+		with ServerThread(fail, num_workers=1) as server, RemoteFitness(server.address) as remote_fitness:
+			with self.assertRaises(RuntimeError):
+				remote_fitness([[1]])
+
+
+	def test_answers_malformed_requests_with_an_error(self):
+		'''requests that are not JSON or have no genomes get an error back, and the connection stays open'''
+		with ServerThread(sum_each, num_workers=1) as server:
+			with socket.socket(socket.AF_UNIX) as client:
+				client.connect(parse_address(server.address)[1])
+				lines = client.makefile('rb')
+				client.sendall(b'not json\n{"batch": 3}\n{"batch": 4, "genomes": [[1]]}\n')
+				messages = [json.loads(lines.readline()) for _ in range(4)]
+				lines.close()
+
+		self.assertEqual(messages[0]["batch"], None)
+		self.assertIn("error", messages[0])
+		self.assertEqual(messages[1]["batch"], 3)
+		self.assertIn("error", messages[1])
+		self.assertListEqual([message.get("scores") for message in messages[2:]], [[1], None])
+		self.assertTrue(messages[3]["done"])
+
+
+class ParseAddressTest(unittest.TestCase):
+	def test_parses_unix_and_tcp_addresses(self):
+		'''addresses are unix:/path or host:port'''
+		self.assertEqual(parse_address('unix:/tmp/a.sock')[1], '/tmp/a.sock')
+		self.assertEqual(parse_address('127.0.0.1:8765')[1], ('127.0.0.1', 8765))
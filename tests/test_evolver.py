@@ -0,0 +1,133 @@
+import os
+import random
+import tempfile
+import unittest
+import numpy as np
+from mock import patch
+
+from evolver import Evolver
+
+
+def score_genes(genes):
+	return abs(genes[0]) + abs(genes[5]) + 1
+
+
+class EvolverVectorizedTest(unittest.TestCase):
+	def setUp(self):
+		self.evolver = Evolver(1, 50, 5, vectorized=True, seed=3)
+		self.gene_pool = self.evolver.generate_random_genes(20)
+		self.scores = np.arange(20, dtype=float)
+
+	def test_generates_random_genes_as_an_array(self):
+		'''generate_random_genes gives an (N, 302) array of turn angles in [0, pi) and weights in [-100, 100)'''
+		self.assertEqual(self.gene_pool.shape, (20, 302))
+		self.assertTrue(np.all((self.gene_pool[:, :2] >= 0) & (self.gene_pool[:, :2] < np.pi)))
+		self.assertTrue(np.all((self.gene_pool[:, 2:] >= -100) & (self.gene_pool[:, 2:] < 100)))
+
+	def test_breeds_a_full_generation(self):
+		'''generate_next_generation takes evaluation results and returns pop_per_generation genomes'''
+		results = [[score, genes] for score, genes in zip(self.scores, self.gene_pool)]
+
+		next_generation = self.evolver.generate_next_generation(results)
+
+		self.assertEqual(next_generation.shape, (50, 302))
+
+	def test_is_reproducible_with_a_seed(self):
+		'''two vectorized evolvers with the same seed breed the same generation'''
+		other = Evolver(1, 50, 5, vectorized=True, seed=3)
+		gene_pool = other.generate_random_genes(20)
+
+		np.testing.assert_array_equal(gene_pool, self.gene_pool)
+		np.testing.assert_array_equal(
+			self.evolver.generate_next_generation_array(self.scores, self.gene_pool),
+			other.generate_next_generation_array(self.scores, gene_pool)
+		)
+
+	def test_chooses_two_different_parents_in_proportion_to_probability(self):
+		'''choose_parent_pairs never pairs a genome with itself and never picks zero-probability genomes'''
+		probabilities = np.array([0, 0.5, 0.3, 0.2])
+
+		parents = self.evolver.choose_parent_pairs(probabilities, 10000)
+
+		self.assertTrue(np.all(parents[:, 0] != parents[:, 1]))
+		self.assertFalse(np.any(parents == 0))
+		self.assertAlmostEqual(np.mean(parents[:, 0] == 1), 0.5, delta=0.02)
+
+	def test_raises_an_error_without_two_possible_parents(self):
+		'''choose_parent_pairs raises a ValueError if only one genome can be chosen'''
+		with self.assertRaises(ValueError):
+			self.evolver.choose_parent_pairs(np.array([0, 1, 0]), 3)
+
+	def test_crossover_takes_each_gene_from_one_parent(self):
+		'''crossover_array takes every gene from one of the two parents, about half from each'''
+		a, b = np.zeros((100, 302)), np.ones((100, 302))
+
+		children = self.evolver.crossover_array(a, b)
+
+		self.assertTrue(np.all((children == 0) | (children == 1)))
+		self.assertAlmostEqual(children.mean(), 0.5, delta=0.02)
+
+	def test_mutate_scales_every_gene_by_a_factor_between_minus_two_and_two(self):
+		'''mutate_array multiplies each gene by its own factor in [-2, 2)'''
+		genomes = np.full((100, 302), 3.0)
+
+		mutated = self.evolver.mutate_array(genomes)
+
+		self.assertTrue(np.all((mutated >= -6) & (mutated < 6)))
+		self.assertGreater(len(np.unique(mutated)), 100 * 302 - 10)
+		np.testing.assert_array_equal(genomes, 3.0)
+
+
+@patch('evolver.evaluate_genes', side_effect=score_genes)
+class EvolverCheckpointTest(unittest.TestCase):
+	def evolve(self, generations, vectorized, checkpoint_path=None, resume=False):
+		random.seed(4)
+		np.random.seed(4)
+		evolver = Evolver(generations, 10, 2, vectorized=vectorized, seed=4, checkpoint_path=checkpoint_path, checkpoint_interval=2)
+		gene_pool = evolver.generate_random_genes(10)
+		if resume:
+			# the checkpoint, not the generators' seeds, decides what comes next
+			random.seed(0)
+			np.random.seed(0)
+			evolver.rng = np.random.default_rng(0)
+			gene_pool = None
+		return evolver.evolve(gene_pool, resume=resume)
+
+	def assert_resumes_where_it_left_off(self, vectorized):
+		uninterrupted_results, uninterrupted_max_scores = self.evolve(7, vectorized)
+
+		with tempfile.TemporaryDirectory() as directory:
+			path = os.path.join(directory, "checkpoint.npz")
+			self.evolve(5, vectorized, path)
+			results, max_scores = self.evolve(7, vectorized, path, resume=True)
+
+		self.assertListEqual(max_scores, uninterrupted_max_scores)
+		np.testing.assert_array_equal([genes for score, genes in results], [genes for score, genes in uninterrupted_results])
+
+	def test_resumes_where_it_left_off(self, mock_evaluate_genes):
+		'''Evolver.evolve(resume=True) breeds the same generations as a run that never stopped'''
+		self.assert_resumes_where_it_left_off(vectorized=False)
+
+	def test_resumes_vectorized_runs_where_they_left_off(self, mock_evaluate_genes):
+		'''Evolver.evolve(resume=True) restores the Generator a vectorized run breeds from'''
+		self.assert_resumes_where_it_left_off(vectorized=True)
+
+	def test_raises_errors(self, mock_evaluate_genes):
+		'''Evolver.evolve does not swallow errors from evaluation'''
+		mock_evaluate_genes.side_effect = ValueError("no")
+
+		with self.assertRaises(ValueError):
+			self.evolve(2, vectorized=False)
+
+	def test_stops_on_keyboard_interrupts(self, mock_evaluate_genes):
+		'''Evolver.evolve returns the last whole generation when stopped by hand'''
+		mock_evaluate_genes.side_effect = [1] * 10 + [KeyboardInterrupt()]
+
+		results, max_scores = self.evolve(3, vectorized=False)
+
+		self.assertEqual(len(results), 10)
+		self.assertListEqual(max_scores, [1])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,104 @@
+import math
+import random
+import unittest
+import numpy as np
+
+from board import Board
+from food import Food
+from snake import Snake
+from fast_math import FastMath, SIGMOID_ONE
+from genomes import load_samples, generate_random_genome
+
+
+def food_at(distance, angle):
+	return Food((100 + distance * math.cos(angle), 100 + distance * math.sin(angle)))
+
+
+class FastMathLookTest(unittest.TestCase):
+	def setUp(self):
+		self.fast_math = FastMath()
+
+	def look(self, foods, direction=1.0, eye_angles=[0]):
+		return self.fast_math.look((100, 100), direction, eye_angles, foods, [food.position for food in foods])
+
+	def test_sees_within_the_half_width_of_an_object(self):
+		'''an eye sees an object within asin(size / distance) of where it looks, and no further'''
+		half_width = math.asin(3 / 50)
+
+		self.assertEqual(self.look([food_at(50, 1.0 + half_width * 0.99)])[:2], [0, 1])
+		self.assertEqual(self.look([food_at(50, 1.0 - half_width * 0.99)])[:2], [0, 1])
+		self.assertEqual(self.look([food_at(50, 1.0 + half_width * 1.01)]), [0, 0, 0])
+		self.assertEqual(self.look([food_at(50, 1.0 + math.pi)]), [0, 0, 0])
+
+	def test_reports_the_exact_distance_of_the_closest_object(self):
+		'''each eye reports the closest object it sees, at the distance Snake.look reports'''
+		foods = [food_at(80, 1.0), food_at(30, 1.0), food_at(30, 2.5)]
+		distance = math.sqrt((foods[1].position[0] - 100) ** 2 + (foods[1].position[1] - 100) ** 2)
+
+		self.assertEqual(self.look(foods, eye_angles=[0, 1.5]), [0, 1, distance, 0, 1, math.sqrt((foods[2].position[0] - 100) ** 2 + (foods[2].position[1] - 100) ** 2)])
+
+	def test_sees_objects_it_is_inside(self):
+		'''an object closer than its size is seen by every eye'''
+		self.assertEqual(self.look([food_at(1, 4.0)], eye_angles=[0, 2])[1::3], [1, 1])
+
+	def test_sees_across_angle_zero(self):
+		'''unlike Snake.look, an eye looking just below angle 0 sees an object just above it'''
+		foods = [food_at(50, 0.02)]
+
+		self.assertEqual(self.look(foods, direction=2 * math.pi - 0.02)[:2], [0, 1])
+
+	def test_array_path_matches_one_at_a_time(self):
+		'''look gives the same result for many objects as it does checking them one at a time'''
+		rng = random.Random(1)
+		foods = [food_at(rng.random() * 100, rng.random() * 2 * math.pi) for _ in range(20)]
+		eye_angles = [0, 0.4, -0.4, 1.2, -1.2]
+
+		visuals = self.look(foods, eye_angles=eye_angles)
+		eye_vectors = self.fast_math.eye_vectors(1.0, eye_angles)
+
+		self.assertListEqual(visuals, self.fast_math.look_at_each((100, 100), eye_vectors, foods, [food.position for food in foods]))
+
+	def test_mostly_matches_snake_look(self):
+		'''on a sample genome's episode fast math sees what Snake.look sees on nearly every tick'''
+		board = Board(400, 300, snake_genome=load_samples()[1], num_food=5, seed=2, animation_on=False)
+		snake = board.snake
+		same = 0
+		for _ in range(500):
+			fast_vision = self.fast_math.look(snake.body[0].position, snake.direction, snake.eye_angles, board.foods + snake.body[2:], [food.position for food in board.foods] + snake.body.positions[2:len(snake.body)].tolist())
+			same += fast_vision == snake.look(board.foods)
+			board.update()
+
+		self.assertGreater(same, 490)
+
+
+class FastMathDecideTest(unittest.TestCase):
+	def test_decides_like_the_brain(self):
+		'''decide picks the output Snake.Brain.forward makes largest'''
+		fast_math = FastMath()
+		rng = np.random.default_rng(3)
+		genomes = load_samples() + [generate_random_genome(random.Random(i)) for i in range(5)]
+		for genome in genomes:
+			brain = Snake.Brain([genome["w1"], genome["w2"]])
+			for vision in rng.random((50, 15)) * rng.choice([1, 100], (50, 15)):
+				with np.errstate(over='ignore'):
+					self.assertEqual(fast_math.decide(brain.layers, vision.tolist()), brain.forward(vision).argmax())
+
+	def test_clips_where_the_sigmoid_rounds_to_one(self):
+		'''outputs above SIGMOID_ONE tie, as the exact sigmoid rounds them all to 1'''
+		layers = [np.eye(2), np.array([[1.0, 0.0], [0.0, 1.0]])]
+		with np.errstate(over='ignore'):
+			self.assertEqual(1 / (1 + np.exp(-np.nextafter(SIGMOID_ONE, np.inf))), 1.0)
+
+		self.assertEqual(FastMath().decide([np.array([[40.0, 0], [0, 50.0]])], [1, 1]), 0)
+		self.assertEqual(FastMath().decide(layers, [1, 2]), 1)
+
+
+class FastMathBoardTest(unittest.TestCase):
+	def test_runs_episodes(self):
+		'''a Board with use_fast_math plays episodes with the fast look and decide'''
+		board = Board(400, 300, snake_genome=load_samples()[0], num_food=5, seed=1, animation_on=False, use_fast_math=True)
+
+		length, time_passed, is_alive = board.run(time_limit=300, max_time=300)
+
+		self.assertIs(board.snake.fast_math, board.fast_math)
+		self.assertGreater(time_passed, 0)
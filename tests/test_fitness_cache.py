@@ -0,0 +1,101 @@
+import unittest
+import os
+import tempfile
+
+from fitness_cache import CachedFitness, hash_genome
+
+
+class CountingFitness:
+	def __init__(self):
+		self.evaluated = []
+
+	def __call__(self, genomes):
+		self.evaluated += genomes
+		return [sum(genome["w"]) for genome in genomes]
+
+
+class HashGenomeTest(unittest.TestCase):
+	def test_is_stable_and_depends_on_genome_and_params(self):
+		'''hash_genome gives equal genomes and params the same key, and different ones different keys'''
+		genome = {"w": [0.1, 2.5], "eye_angles": [1, 2]}
+		same_genome = {"eye_angles": [1, 2], "w": [0.1, 2.5]}
+
+		self.assertEqual(hash_genome(genome, {"seed": 1}), hash_genome(same_genome, {"seed": 1}))
+		self.assertNotEqual(hash_genome(genome, {"seed": 1}), hash_genome(genome, {"seed": 2}))
+		self.assertNotEqual(hash_genome(genome), hash_genome({"w": [0.1, 2.5000001], "eye_angles": [1, 2]}))
+
+
+class CachedFitnessCallTest(unittest.TestCase):
+	def setUp(self):
+		self.fitness_function = CountingFitness()
+		self.genomes = [{"w": [i, 1]} for i in range(5)]
+
+	def test_only_evaluates_genomes_it_has_not_seen(self):
+		'''CachedFitness passes only new genomes to the fitness function and returns every score in order'''
+		cached_fitness_function = CachedFitness(self.fitness_function)
+		cached_fitness_function(self.genomes[:3])
+
+		scores = cached_fitness_function(self.genomes)
+
+		self.assertListEqual(scores, [1, 2, 3, 4, 5])
+		self.assertListEqual(self.fitness_function.evaluated, self.genomes)
+
+	def test_evaluates_duplicates_within_a_generation_once(self):
+		'''CachedFitness scores a genome that appears several times in one generation only once'''
+		cached_fitness_function = CachedFitness(self.fitness_function)
+
+		scores = cached_fitness_function([self.genomes[0], self.genomes[1], dict(self.genomes[0])])
+
+		self.assertListEqual(scores, [1, 2, 1])
+		self.assertEqual(len(self.fitness_function.evaluated), 2)
+
+	def test_records_hits_and_misses_per_generation(self):
+		'''CachedFitness.history has the hit and miss counts of every call'''
+		cached_fitness_function = CachedFitness(self.fitness_function)
+		cached_fitness_function(self.genomes[:3])
+		cached_fitness_function(self.genomes)
+
+		self.assertListEqual(cached_fitness_function.history, [
+			{"hits": 0, "disk_hits": 0, "misses": 3},
+			{"hits": 3, "disk_hits": 0, "misses": 2}
+		])
+
+	def test_evicts_least_recently_used_scores(self):
+		'''CachedFitness keeps at most max_size scores in memory, dropping the least recently used'''
+		cached_fitness_function = CachedFitness(self.fitness_function, max_size=2)
+		cached_fitness_function(self.genomes[:2])
+		cached_fitness_function(self.genomes[:1])
+		cached_fitness_function(self.genomes[2:3])
+
+		cached_fitness_function(self.genomes[:2])
+
+		self.assertEqual(len(cached_fitness_function.scores), 2)
+		self.assertListEqual(self.fitness_function.evaluated[-1:], [self.genomes[1]])
+
+	def test_returns_every_score_when_the_generation_is_larger_than_the_cache(self):
+		'''CachedFitness returns all scores of a generation even if they do not all fit in memory'''
+		cached_fitness_function = CachedFitness(self.fitness_function, max_size=2)
+
+		scores = cached_fitness_function(self.genomes)
+
+		self.assertListEqual(scores, [1, 2, 3, 4, 5])
+
+	def test_persists_scores_on_disk_across_instances(self):
+		'''with a path, CachedFitness reuses scores stored by an earlier run'''
+		with tempfile.TemporaryDirectory() as directory:
+			path = os.path.join(directory, 'cache.sqlite')
+			first_run = CachedFitness(self.fitness_function, params={"seed": 1}, path=path)
+			first_run(self.genomes)
+			first_run.close()
+
+			second_run = CachedFitness(self.fitness_function, params={"seed": 1}, path=path)
+			scores = second_run(self.genomes)
+			second_run.close()
+
+		self.assertListEqual(scores, [1, 2, 3, 4, 5])
+		self.assertEqual(len(self.fitness_function.evaluated), 5)
+		self.assertEqual(second_run.history[-1]["disk_hits"], 5)
+
+
+if __name__ == '__main__':
+	unittest.main()
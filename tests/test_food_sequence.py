@@ -0,0 +1,66 @@
+import unittest
+import random
+import numpy as np
+
+from food_sequence import FoodSequence
+from board import Board
+from genomes import generate_random_genome
+
+
+class FoodSequenceTest(unittest.TestCase):
+	def test_gives_the_positions_the_global_random_module_gave_after_seeding(self):
+		'''FoodSequence draws x then y from its own random.Random, like random.seed(seed) did'''
+		rng = random.Random(42)
+		expected = [(rng.random() * 200, rng.random() * 150) for _ in range(100)]
+
+		positions = FoodSequence(200, 150, 42, block_size=16).precompute(100)
+
+		self.assertListEqual([tuple(position) for position in positions.tolist()], expected)
+
+	def test_takes_positions_in_order(self):
+		'''FoodSequence.take hands out the precomputed positions one after the other'''
+		food_sequence = FoodSequence(200, 150, 3, block_size=4)
+		expected = FoodSequence(200, 150, 3).precompute(10)
+
+		taken = np.concatenate([food_sequence.take(num) for num in [1, 3, 0, 6]])
+
+		np.testing.assert_array_equal(taken, expected)
+
+
+class BoardRandomStateTest(unittest.TestCase):
+	def test_does_not_touch_the_global_random_state(self):
+		'''running a Board leaves the random module where it was'''
+		random.seed(7)
+		state = random.getstate()
+
+		Board(200, 150, generate_random_genome(random.Random(1)), num_food=5, seed=3, animation_on=False).run(time_limit=200, max_time=200)
+
+		self.assertEqual(random.getstate(), state)
+
+	def test_interleaved_boards_play_the_same_episodes_as_serial_ones(self):
+		'''boards stepped in turn get the same food as boards run one after another'''
+		genomes = [generate_random_genome(random.Random(seed)) for seed in range(4)]
+		serial_results = [Board(200, 150, genome, num_food=3, seed=9, animation_on=False).run(time_limit=300, max_time=300) for genome in genomes]
+
+		boards = [Board(200, 150, genome, num_food=3, seed=9, animation_on=False) for genome in genomes]
+		times = [0] * len(boards)
+		for _ in range(300):
+			for i, board in enumerate(boards):
+				if board.snake.is_alive:
+					board.update()
+					times[i] += 1
+
+		self.assertListEqual([(len(board.snake.body), t, board.snake.is_alive) for board, t in zip(boards, times)], serial_results)
+
+	def test_random_brains_come_from_the_board_seed(self):
+		'''a genome without weights gets the same random brain on boards with the same seed'''
+		genome = {"eye_angles": [0.5, 1]}
+		first = Board(200, 150, genome, seed=5, animation_on=False).snake.brain.layers
+		second = Board(200, 150, genome, seed=5, animation_on=False).snake.brain.layers
+
+		for a, b in zip(first, second):
+			np.testing.assert_array_equal(a, b)
+
+
+if __name__ == '__main__':
+	unittest.main()
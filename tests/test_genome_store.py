@@ -0,0 +1,87 @@
+import unittest
+import os
+import json
+import tempfile
+import numpy as np
+
+from genome_store import GenomeStore, genes_to_genome, record_to_genome
+
+
+def make_genome(value):
+	return {"eye_angles": [value, value / 2], "w1": [value] * (15 * 15), "w2": [-value] * (5 * 15)}
+
+
+class GenomeStoreTest(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.path = os.path.join(self.directory.name, 'genomes.npy')
+
+	def tearDown(self):
+		self.directory.cleanup()
+
+	def test_appends_generations_to_a_plain_npy_file(self):
+		'''GenomeStore.append adds each generation's records to a file np.load can read'''
+		store = GenomeStore(self.path)
+		store.append(0, [(1, make_genome(0.1)), (3, make_genome(0.3))])
+		store.append(1, [(2, make_genome(0.2))])
+
+		records = np.load(self.path)
+
+		self.assertEqual(len(store), 3)
+		self.assertListEqual(records["generation"].tolist(), [0, 0, 1])
+		self.assertListEqual(records["fitness"].tolist(), [3, 1, 2])
+		self.assertEqual(record_to_genome(records[2]), make_genome(0.2))
+
+	def test_keeps_only_the_top_genomes_of_each_generation(self):
+		'''with top set, GenomeStore.append only stores the fittest genomes of a generation'''
+		store = GenomeStore(self.path, top=2)
+
+		store.append(0, [(fitness, make_genome(fitness)) for fitness in [5, 1, 9, 3]])
+
+		self.assertListEqual(store.load()["fitness"].tolist(), [9, 5])
+
+	def test_reopens_an_existing_store(self):
+		'''a new GenomeStore on an existing file keeps appending after its records'''
+		GenomeStore(self.path).append(0, [(1, make_genome(0.1))])
+
+		store = GenomeStore(self.path)
+		store.append(1, [(2, make_genome(0.2))])
+
+		self.assertListEqual(GenomeStore(self.path).load()["fitness"].tolist(), [1, 2])
+
+	def test_returns_the_top_genomes_fittest_first(self):
+		'''GenomeStore.top_genomes gives the k fittest genomes, overall or for one generation'''
+		store = GenomeStore(self.path)
+		store.append(0, [(fitness, make_genome(fitness)) for fitness in [5, 1, 9]])
+		store.append(1, [(fitness, make_genome(fitness)) for fitness in [4, 7]])
+
+		self.assertListEqual(store.top_genomes(2), [make_genome(9), make_genome(7)])
+		self.assertListEqual(store.top_genomes(5, generation_num=1), [make_genome(7), make_genome(4)])
+
+	def test_imports_results_json_and_brains_out(self):
+		'''GenomeStore imports holland results files and flat gene lists'''
+		results_path = os.path.join(self.directory.name, 'results.json')
+		with open(results_path, 'w') as f:
+			f.write(json.dumps({"results": [[10, make_genome(0.5)]]}))
+		brains_path = os.path.join(self.directory.name, 'brains.out')
+		genes = [0.25] * (2 + 15 * 15 + 5 * 15)
+		with open(brains_path, 'w') as f:
+			f.write(str(genes) + '\r\n')
+
+		store = GenomeStore(self.path)
+		store.import_results_json(results_path)
+		store.import_brains_out(brains_path)
+
+		self.assertListEqual(store.top_genomes(2), [make_genome(0.5), genes_to_genome(genes)])
+		self.assertTrue(np.isnan(store.load()["fitness"][1]))
+
+	def test_refuses_files_that_do_not_hold_genome_records(self):
+		'''GenomeStore raises a ValueError for other .npy files'''
+		np.save(self.path, np.zeros(3))
+
+		with self.assertRaises(ValueError):
+			GenomeStore(self.path)
+
+
+if __name__ == '__main__':
+	unittest.main()
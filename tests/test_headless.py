@@ -0,0 +1,29 @@
+import unittest
+import os
+import sys
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class HeadlessSimulationTest(unittest.TestCase):
+	def run_in_fresh_interpreter(self, code):
+		return subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+
+	def test_simulation_does_not_import_pygame(self):
+		'''running boards without animation never imports pygame'''
+		code = '\n'.join([
+			'import sys',
+			'import evolution, evolver, batch_board',
+			'from board import Board',
+			'Board(200, 150, snake_genome={"eye_angles": [0.5, 1]}, animation_on=False).run(time_limit=50)',
+			'print("pygame" in sys.modules)'
+		])
+
+		output = self.run_in_fresh_interpreter(code)
+
+		self.assertEqual(output.strip(), 'False')
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,177 @@
+import os
+import queue
+import random
+import tempfile
+import threading
+import unittest
+from holland import library
+
+from islands import IslandEvolver, Migration, get_neighbors, island_storage_options
+
+
+def sum_each(genomes):
+	return [sum(genome["x"]) for genome in genomes]
+
+genome_params = {
+	"x": {
+		"type": "[float]",
+		"size": 3,
+		"initial_distribution": lambda: random.random(),
+		"crossover_function": library.get_uniform_crossover_function(),
+		"mutation_function": library.get_gaussian_mutation_function(sigma=0.1),
+		"mutation_rate": 0.2
+	}
+}
+
+selection_strategy = {
+	"pool": {
+		"top": 4
+	},
+	"parents": {
+		"weighting_function": library.get_uniform_weighting_function()
+	}
+}
+
+
+class GetNeighborsTest(unittest.TestCase):
+	def test_ring(self):
+		'''get_neighbors sends each island's migrants to the next island on a ring'''
+		self.assertListEqual(get_neighbors("ring", 3), [[1], [2], [0]])
+		self.assertListEqual(get_neighbors("ring", 1), [[]])
+
+	def test_full(self):
+		'''get_neighbors sends each island's migrants to every other island on a full topology'''
+		self.assertListEqual(get_neighbors("full", 3), [[1, 2], [0, 2], [0, 1]])
+
+	def test_explicit(self):
+		'''get_neighbors uses the destinations it is given for each island'''
+		self.assertListEqual(get_neighbors({0: [1]}, 2), [[1], []])
+		self.assertListEqual(get_neighbors([[1], [0]], 2), [[1], [0]])
+		with self.assertRaises(ValueError):
+			get_neighbors("star", 2)
+
+
+class IslandStorageOptionsTest(unittest.TestCase):
+	def test_puts_each_island_in_its_own_directory(self):
+		'''island_storage_options moves every path under island_<n>/ and creates it'''
+		with tempfile.TemporaryDirectory() as directory:
+			storage_options = {
+				"fitness": {"format": "csv", "file_name": "fitness.csv", "path": directory},
+				"genome_store": {"path": os.path.join(directory, "genomes.npy"), "top": 10}
+			}
+
+			island_options = island_storage_options(storage_options, 2)
+
+			self.assertEqual(island_options["fitness"]["path"], os.path.join(directory, "island_2", ""))
+			self.assertEqual(island_options["genome_store"]["path"], os.path.join(directory, "island_2", "genomes.npy"))
+			self.assertEqual(island_options["genome_store"]["top"], 10)
+			self.assertTrue(os.path.isdir(os.path.join(directory, "island_2")))
+			self.assertEqual(storage_options["fitness"]["path"], directory)
+
+
+class MigrationTest(unittest.TestCase):
+	def test_only_migrates_every_interval_generations(self):
+		'''Migration leaves the results alone between migrations'''
+		inboxes = [queue.Queue(), queue.Queue()]
+		migration = Migration(0, inboxes, [1], [], interval=3, num_migrants=1)
+		results = [(1, "a"), (2, "b")]
+
+		self.assertIs(migration(0, results), results)
+		self.assertIs(migration(1, results), results)
+		self.assertTrue(inboxes[1].empty())
+		migration(2, results)
+		self.assertEqual(inboxes[1].get_nowait(), (2, 0, [(2, "b")]))
+
+	def test_swaps_the_best_for_the_worst(self):
+		'''Migration sends the island's best results to its neighbour and replaces its worst with the neighbour's'''
+		inboxes = [queue.Queue(), queue.Queue()]
+		migrations = [Migration(i, inboxes, [1 - i], [1 - i], interval=1, num_migrants=2) for i in range(2)]
+		island_results = [
+			[(0, "a0"), (1, "a1"), (2, "a2"), (3, "a3")],
+			[(10, "b0"), (11, "b1"), (12, "b2"), (13, "b3")]
+		]
+		migrated = [None, None]
+		def migrate(i):
+			migrated[i] = migrations[i](0, island_results[i])
+		threads = [threading.Thread(target=migrate, args=(i,)) for i in range(2)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join(5)
+
+		self.assertListEqual(migrated[0], [(2, "a2"), (3, "a3"), (12, "b2"), (13, "b3")])
+		self.assertListEqual(migrated[1], [(2, "a2"), (3, "a3"), (12, "b2"), (13, "b3")])
+
+	def test_keeps_early_migrants_for_their_generation(self):
+		'''Migration holds on to migrants sent for a later generation until that generation'''
+		inboxes = [queue.Queue(), queue.Queue(), queue.Queue()]
+		migration = Migration(0, inboxes, [], [1, 2], interval=1, num_migrants=1)
+		inboxes[0].put((0, 1, [(5, "a")]))
+		inboxes[0].put((1, 1, [(9, "late a")]))
+		inboxes[0].put((0, 2, [(6, "b")]))
+		inboxes[0].put((1, 2, [(8, "late b")]))
+
+		self.assertListEqual(migration(0, [(0, "x"), (1, "y"), (2, "z")]), [(2, "z"), (5, "a"), (6, "b")])
+		self.assertListEqual(migration(1, [(0, "x"), (1, "y"), (2, "z")]), [(2, "z"), (8, "late b"), (9, "late a")])
+
+	def test_stops_waiting_for_islands_that_went_past(self):
+		'''Migration does not wait for an island that resumed from a later generation'''
+		inboxes = [queue.Queue(), queue.Queue()]
+		migration = Migration(0, inboxes, [], [1], interval=1, num_migrants=1)
+		inboxes[0].put((4, 1, [(9, "ahead")]))
+
+		self.assertListEqual(migration(2, [(0, "a"), (1, "b")]), [(0, "a"), (1, "b")])
+		self.assertListEqual(migration(4, [(0, "a"), (1, "b")]), [(1, "b"), (9, "ahead")])
+
+	def test_stops_waiting_for_islands_that_stopped(self):
+		'''Migration does not wait for migrants from an island that has finished'''
+		inboxes = [queue.Queue(), queue.Queue()]
+		Migration(1, inboxes, [0], [], interval=1).close()
+		migration = Migration(0, inboxes, [], [1], interval=1, num_migrants=1)
+
+		self.assertListEqual(migration(0, [(0, "a"), (1, "b")]), [(0, "a"), (1, "b")])
+
+
+class IslandEvolverEvolveTest(unittest.TestCase):
+	def evolve(self, seed, **kwargs):
+		evolver = IslandEvolver(sum_each, genome_params, selection_strategy, num_islands=3, migration_interval=2, num_migrants=2, seed=seed)
+		return evolver.evolve(generation_params={"population_size": 10}, stop_conditions={"n_generations": 5}, **kwargs)
+
+	def test_returns_every_island_s_results_together(self):
+		'''IslandEvolver.evolve returns the final results of all islands, sorted best last'''
+		results = self.evolve(seed=1)
+
+		self.assertEqual(len(results), 30)
+		scores = [score for score, genome in results]
+		self.assertListEqual(scores, sorted(scores))
+
+	def test_is_reproducible_with_a_seed(self):
+		'''IslandEvolver.evolve evolves the same populations when given the same seed'''
+		self.assertListEqual(self.evolve(seed=3), self.evolve(seed=3))
+
+	def test_stores_each_island_separately(self):
+		'''IslandEvolver.evolve records each island's fitness in its own directory'''
+		with tempfile.TemporaryDirectory() as directory:
+			self.evolve(seed=1, storage_options={"fitness": {"should_record_fitness": True, "format": "csv", "file_name": "fitness.csv", "path": directory}})
+
+			for island_num in range(3):
+				with open(os.path.join(directory, "island_{}".format(island_num), "fitness.csv")) as file:
+					# a header and a row per generation
+					self.assertEqual(len(file.read().strip().split("\n")), 6)
+
+	def test_starts_from_the_initial_population(self):
+		'''IslandEvolver.evolve deals the initial population out to the islands'''
+		initial_population = [{"x": [100, 100, 100]} for _ in range(30)]
+
+		results = self.evolve(seed=1, initial_population=initial_population)
+
+		self.assertGreater(results[-1][0], 200)
+
+	def test_reports_islands_that_fail(self):
+		'''IslandEvolver.evolve raises when an island stops without finishing'''
+		def fail(genomes):
+			raise ValueError("no")
+		evolver = IslandEvolver(fail, genome_params, selection_strategy, num_islands=2, seed=1)
+
+		with self.assertRaises(RuntimeError):
+			evolver.evolve(generation_params={"population_size": 4}, stop_conditions={"n_generations": 2}, logging_options={"level": 100})
@@ -0,0 +1,69 @@
+import unittest
+
+from multi_fidelity import SuccessiveHalvingFitness
+
+
+class TimedFitness:
+	# a genome's score grows with its skill and the time it gets, plus a seed-dependent wobble
+	def __init__(self):
+		self.calls = []
+
+	def __call__(self, genomes, seed=0, max_time=100):
+		self.calls.append((seed, max_time, [genome["skill"] for genome in genomes]))
+		return [genome["skill"] * max_time / 100 + (seed + genome["skill"]) % 2 / 10 for genome in genomes]
+
+
+class SuccessiveHalvingFitnessCallTest(unittest.TestCase):
+	def setUp(self):
+		self.fitness_function = TimedFitness()
+		self.genomes = [{"skill": skill} for skill in [5, 0, 8, 1, 7, 2, 6, 3]]
+		self.rungs = [{"seeds": [1], "max_time": 10}, {"seeds": [1], "max_time": 100}, {"seeds": [1, 2], "max_time": 100}]
+
+	def test_promotes_the_best_of_each_rung(self):
+		'''every genome runs the first rung and only the best 1/eta of each rung run the next'''
+		SuccessiveHalvingFitness(self.fitness_function, self.rungs, eta=2)(self.genomes)
+
+		self.assertListEqual(self.fitness_function.calls, [
+			(1, 10, [5, 0, 8, 1, 7, 2, 6, 3]),
+			(1, 100, [5, 8, 7, 6]),
+			(1, 100, [8, 7]),
+			(2, 100, [8, 7])
+		])
+
+	def test_promotes_at_least_min_promoted(self):
+		'''min_promoted genomes run every rung however small 1/eta of the population is'''
+		fitness_function = SuccessiveHalvingFitness(self.fitness_function, self.rungs, eta=8, min_promoted=3)
+
+		fitness_function(self.genomes)
+
+		self.assertListEqual(fitness_function.history[-1]["rung_sizes"], [8, 3, 3])
+		self.assertEqual(fitness_function.history[-1]["episodes"], 8 + 3 + 6)
+
+	def test_ranks_genomes_by_the_last_rung_they_ran(self):
+		'''the genomes that made the last rung get its scores, and every genome dropped earlier ranks below them'''
+		fitness = SuccessiveHalvingFitness(self.fitness_function, self.rungs, eta=2)(self.genomes)
+
+		self.assertAlmostEqual(fitness[2], (8.1 + 8) / 2)
+		self.assertAlmostEqual(fitness[4], (7 + 7.1) / 2)
+		self.assertAlmostEqual(fitness[0], 5)
+		self.assertAlmostEqual(fitness[1], 0.1)
+		for dropped in [0, 1, 3, 5, 6, 7]:
+			self.assertLess(fitness[dropped], min(fitness[2], fitness[4]))
+
+	def test_caps_genomes_dropped_early_at_those_promoted(self):
+		'''a genome dropped early never ranks above a genome promoted past it'''
+		def shrinking_fitness(genomes, max_time):
+			# long episodes score the genomes that looked best far lower
+			return [genome["skill"] * (100 - max_time) if max_time > 10 else genome["skill"] for genome in genomes]
+		rungs = [{"max_time": 10}, {"max_time": 100}]
+
+		fitness = SuccessiveHalvingFitness(shrinking_fitness, rungs, eta=2)(self.genomes)
+
+		self.assertListEqual(fitness, [0, 0, 0, 0, 0, 0, 0, 0])
+
+	def test_needs_rungs(self):
+		'''successive halving needs a rung and an eta above 1'''
+		with self.assertRaises(ValueError):
+			SuccessiveHalvingFitness(self.fitness_function, [])
+		with self.assertRaises(ValueError):
+			SuccessiveHalvingFitness(self.fitness_function, self.rungs, eta=1)
@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+
+from multi_seed_fitness import MultiSeedFitness
+
+
+class SeededFitness:
+	# a genome's score on a seed is its skill plus a small seed-dependent wobble
+	def __init__(self):
+		self.calls = []
+
+	def __call__(self, genomes, seed):
+		self.calls.append((seed, len(genomes)))
+		return [genome["skill"] + (seed * 7 + int(genome["skill"])) % 3 for genome in genomes]
+
+
+class MultiSeedFitnessCallTest(unittest.TestCase):
+	def setUp(self):
+		self.fitness_function = SeededFitness()
+		self.genomes = [{"skill": skill} for skill in [50, 0, 10, 49, 1, 2, 45, 3]]
+		self.seeds = [1, 2, 3, 4, 5, 6]
+
+	def test_scores_every_genome_on_the_same_seeds(self):
+		'''MultiSeedFitness runs every seed once over the population, in order'''
+		MultiSeedFitness(self.fitness_function, self.seeds)(self.genomes)
+
+		self.assertListEqual(self.fitness_function.calls, [(seed, len(self.genomes)) for seed in self.seeds])
+
+	def test_aggregates_scores_across_seeds(self):
+		'''MultiSeedFitness aggregates each genome's per-seed scores with mean, min or a quantile'''
+		per_seed_scores = np.array([self.fitness_function(self.genomes, seed=seed) for seed in self.seeds]).T
+
+		for aggregate, expected in [
+			("mean", per_seed_scores.mean(axis=1)),
+			("min", per_seed_scores.min(axis=1)),
+			("quantile", np.quantile(per_seed_scores, 0.25, axis=1))
+		]:
+			fitness = MultiSeedFitness(self.fitness_function, self.seeds, aggregate=aggregate)(self.genomes)
+
+			self.assertListEqual(fitness, list(expected))
+
+	def test_stops_evaluating_genomes_that_cannot_make_the_pool(self):
+		'''with a pool_size, genomes that cannot reach the pool are dropped after min_seeds rounds'''
+		multi_seed_fitness = MultiSeedFitness(self.fitness_function, self.seeds, pool_size=3, min_seeds=2)
+
+		multi_seed_fitness(self.genomes)
+
+		stats = multi_seed_fitness.history[-1]
+		self.assertLess(stats["episodes"], stats["max_episodes"])
+		self.assertEqual(self.fitness_function.calls[2], (3, 3))
+
+	def test_keeps_the_same_top_genomes_and_scores_as_a_full_evaluation(self):
+		'''early stopping does not change which genomes make the pool or their fitness'''
+		full_fitness = MultiSeedFitness(self.fitness_function, self.seeds)(self.genomes)
+		fitness = MultiSeedFitness(self.fitness_function, self.seeds, pool_size=3, min_seeds=2)(self.genomes)
+
+		top = lambda scores: sorted(range(len(scores)), key=lambda i: scores[i])[-3:]
+		self.assertListEqual(top(fitness), top(full_fitness))
+		self.assertListEqual([fitness[i] for i in top(fitness)], [full_fitness[i] for i in top(full_fitness)])
+
+	def test_raises_an_error_for_unknown_aggregates(self):
+		'''MultiSeedFitness only accepts mean, min and quantile aggregates'''
+		with self.assertRaises(ValueError):
+			MultiSeedFitness(self.fitness_function, self.seeds, aggregate="max")
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import numpy as np
+
+from snake import Snake
+from population_brain import PopulationBrain
+
+
+def generate_random_brain(rng):
+	w1 = list(rng.uniform(-100, 100, 15 * 15))
+	w2 = list(rng.uniform(-100, 100, 5 * 15))
+	return Snake.Brain([w1, w2])
+
+
+class PopulationBrainInitTest(unittest.TestCase):
+	def test_stacks_layers_of_every_brain(self):
+		'''PopulationBrain stacks the layers of N brains into (N,15,15) and (N,5,15) tensors'''
+		rng = np.random.default_rng(0)
+		brains = [generate_random_brain(rng) for _ in range(4)]
+
+		population_brain = PopulationBrain(brains)
+
+		self.assertEqual(population_brain.layers[0].shape, (4, 15, 15))
+		self.assertEqual(population_brain.layers[1].shape, (4, 5, 15))
+		self.assertTrue(np.array_equal(population_brain.layers[1][2], brains[2].layers[1]))
+
+	def test_float32_mode_stores_float32_weights(self):
+		'''PopulationBrain stores its weights (and computes) in the requested dtype'''
+		rng = np.random.default_rng(0)
+		population_brain = PopulationBrain([generate_random_brain(rng)], dtype=np.float32)
+
+		output = population_brain.forward(rng.uniform(0, 100, (1, 15)))
+
+		self.assertEqual(population_brain.layers[0].dtype, np.float32)
+		self.assertEqual(output.dtype, np.float32)
+
+
+class PopulationBrainForwardTest(unittest.TestCase):
+	def setUp(self):
+		rng = np.random.default_rng(1)
+		self.brains = [generate_random_brain(rng) for _ in range(200)]
+		self.population_brain = PopulationBrain(self.brains)
+		encodings = rng.integers(0, 2, (200, 5, 2))
+		distances = rng.uniform(0, 250, (200, 5, 1))
+		self.information = np.concatenate([encodings, distances], axis=2).reshape(200, 15)
+
+	def test_outputs_are_bit_identical_to_per_snake_forward(self):
+		'''in float64 mode PopulationBrain.forward returns exactly what each Snake.Brain.forward returns'''
+		outputs = self.population_brain.forward(self.information)
+
+		for brain, information, output in zip(self.brains, self.information, outputs):
+			self.assertTrue(np.array_equal(output, brain.forward(information)))
+
+	def test_decisions_match_per_snake_argmax(self):
+		'''PopulationBrain.decide returns the argmax of every snake's own brain output'''
+		decisions = self.population_brain.decide(self.information)
+
+		expected_decisions = [brain.forward(information).argmax() for brain, information in zip(self.brains, self.information)]
+		self.assertListEqual(list(decisions), expected_decisions)
+
+	def test_rows_selects_brains_for_a_subset_of_snakes(self):
+		'''when given rows, PopulationBrain.decide evaluates each vector with the brain at the matching row'''
+		rows = np.array([3, 50, 199])
+
+		decisions = self.population_brain.decide(self.information[rows], rows=rows)
+
+		expected_decisions = [self.brains[i].forward(self.information[i]).argmax() for i in rows]
+		self.assertListEqual(list(decisions), expected_decisions)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+import os
+import csv
+import random
+import tempfile
+
+import profiling
+from profiling import Profile, PHASES, COUNTERS
+from board import Board
+from spatial_grid import SpatialGrid
+from vision_prefilter import VisionPrefilter
+from genomes import generate_random_genome
+from batch_board import BatchBoard
+from evaluation import ProcessPoolFitness
+
+
+def profiled_ticks(genomes):
+	# a population fitness function whose boards profile into the worker's profile
+	board = BatchBoard(200, 150, genomes, seed=4, profile=profiling.collected)
+	return [time for length, time, alive in board.run(time_limit=50, max_time=50)]
+
+
+class ProfileTest(unittest.TestCase):
+	def test_adds_the_time_between_laps_to_each_phase(self):
+		'''Profile.lap adds the time since the last start or lap to the given phase'''
+		profile = Profile()
+		profile.start()
+		profile.lap("look")
+		profile.lap("look")
+		profile.lap("move")
+
+		self.assertGreater(profile.times["look"], 0)
+		self.assertGreater(profile.times["move"], 0)
+		self.assertEqual(profile.times["render"], 0)
+
+	def test_merges_times_and_counts(self):
+		'''Profile.merge adds up the times and counts of two profiles'''
+		profile, other = Profile(), Profile()
+		profile.times["look"], other.times["look"] = 1.5, 2
+		profile.count("ticks", 3)
+		other.count("ticks", 4)
+
+		profile.merge(other)
+
+		self.assertEqual(profile.times["look"], 3.5)
+		self.assertEqual(profile.counts["ticks"], 7)
+
+	def test_has_a_column_for_every_phase_and_counter(self):
+		'''Profile.as_row always has the same columns, so rows line up in the csv'''
+		row = Profile().as_row(3)
+
+		self.assertEqual(row["generation"], 3)
+		self.assertEqual(set(row), {"generation", "objects_per_tick"} | {phase + "_seconds" for phase in PHASES} | set(COUNTERS))
+
+
+class BoardProfileTest(unittest.TestCase):
+	def test_counts_ticks_and_times_every_phase_without_changing_the_result(self):
+		'''a profiled Board.run gives the same result and counts every tick'''
+		genome = generate_random_genome(random.Random(1))
+		result = Board(200, 150, genome, num_food=5, seed=3, animation_on=False).run(time_limit=300, max_time=300)
+		profile = Profile()
+
+		profiled_result = Board(200, 150, genome, num_food=5, seed=3, animation_on=False, profile=profile).run(time_limit=300, max_time=300)
+
+		self.assertEqual(profiled_result, result)
+		self.assertEqual(profile.counts["evaluations"], 1)
+		self.assertEqual(profile.counts["ticks"], result[1])
+		self.assertEqual(profile.counts["food_eaten"], result[0] - 1)
+		for phase in ["look", "decide", "act", "move", "check_tail", "eat"]:
+			self.assertGreater(profile.times[phase], 0)
+
+	def test_counts_only_the_objects_look_scans(self):
+		'''with the vision prefilter or the spatial index, objects_seen counts the candidates look checked, not every object'''
+		genome = generate_random_genome(random.Random(1))
+		counts = {}
+		# with thresholds that never turn them off
+		for option, options in [("plain", {}), ("use_vision_prefilter", {"use_vision_prefilter": VisionPrefilter(min_objects=0)}), ("use_spatial_index", {"use_spatial_index": SpatialGrid(min_foods=0, foods_per_piece=0)})]:
+			profile = Profile()
+			Board(400, 300, genome, num_food=50, seed=3, animation_on=False, profile=profile, **options).run(time_limit=100, max_time=100)
+			counts[option] = profile.counts["objects_seen"]
+
+		self.assertEqual(counts["plain"], 50 * 100)
+		self.assertLess(counts["use_vision_prefilter"], counts["plain"])
+		self.assertLess(counts["use_spatial_index"], counts["plain"])
+
+	def test_batch_board_counts_snake_ticks(self):
+		'''a profiled BatchBoard counts one tick per snake per step and the food eaten'''
+		rng = random.Random(2)
+		genomes = [generate_random_genome(rng) for _ in range(10)]
+		profile = Profile()
+
+		results = BatchBoard(200, 150, genomes, num_food=5, seed=3, profile=profile).run(time_limit=300, max_time=300)
+
+		self.assertEqual(profile.counts["evaluations"], 10)
+		self.assertEqual(profile.counts["ticks"], sum(time for length, time, alive in results))
+		self.assertEqual(profile.counts["food_eaten"], sum(length - 1 for length, time, alive in results))
+
+
+class RecordProfileTest(unittest.TestCase):
+	def setUp(self):
+		profiling.drain()
+
+	def test_collects_profiles_from_pool_workers(self):
+		'''ProcessPoolFitness merges what its workers profiled into this process's profile'''
+		rng = random.Random(3)
+		genomes = [generate_random_genome(rng) for _ in range(8)]
+
+		with ProcessPoolFitness(profiled_ticks, num_workers=2, chunk_size=3) as pool_fitness_function:
+			times = pool_fitness_function(genomes)
+
+		profile = profiling.drain()
+		self.assertEqual(profile.counts["evaluations"], 8)
+		self.assertEqual(profile.counts["ticks"], sum(times))
+
+	def test_writes_one_row_per_generation_and_starts_over(self):
+		'''record_profile appends what was collected to a csv and clears it for the next generation'''
+		with tempfile.TemporaryDirectory() as directory:
+			for generation_num in range(2):
+				profiling.collected.count("ticks", 10 + generation_num)
+				profiling.record_profile(generation_num, format="csv", file_name="profile.csv", path=directory)
+
+			with open(os.path.join(directory, "profile.csv")) as f:
+				rows = list(csv.DictReader(f))
+
+		self.assertListEqual([row["ticks"] for row in rows], ["10", "11"])
+		self.assertEqual(profiling.collected.counts["ticks"], 0)
+
+
+if __name__ == '__main__':
+	unittest.main()
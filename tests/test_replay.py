@@ -0,0 +1,91 @@
+import unittest
+import os
+import json
+import tempfile
+
+from board import Board
+from replay import ReplayRecorder, Replay, render_frames
+
+
+def load_sample_genome():
+	with open('samples/sample1.json', 'r') as f:
+		return json.loads(f.readline())["results"][0][1]
+
+
+class TrackingRecorder(ReplayRecorder):
+	# also keeps the board's actual state after every tick to compare the replay with
+	def start(self, board):
+		super().start(board)
+		self.states = [self.copy_state(board)]
+
+	def record_tick(self, board):
+		super().record_tick(board)
+		self.states.append(self.copy_state(board))
+
+	def copy_state(self, board):
+		body = board.snake.body
+		return body.positions[:len(body)].tolist(), [tuple(food.position) for food in board.foods]
+
+
+class ReplayTest(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.path = os.path.join(self.directory.name, 'replay.npz')
+		self.recorder = TrackingRecorder()
+		board = Board(400, 300, load_sample_genome(), num_food=5, seed=11, animation_on=False, recorder=self.recorder)
+		self.result = board.run(max_time=1500)
+		self.recorder.save(self.path)
+
+	def tearDown(self):
+		self.directory.cleanup()
+
+	def test_rebuilds_every_tick_exactly(self):
+		'''a saved replay gives the body and food of every tick of the recorded run'''
+		replay = Replay.load(self.path)
+
+		self.assertEqual(len(replay), self.result[1])
+		self.assertGreater(self.result[0], 1)
+		for tick, (body_positions, food_positions) in enumerate(self.recorder.states):
+			replay.seek(tick)
+			self.assertListEqual(replay.body.positions[:len(replay.body)].tolist(), body_positions)
+			self.assertListEqual([tuple(food.position) for food in replay.foods], food_positions)
+
+	def test_can_seek_backwards(self):
+		'''Replay.seek goes back to an earlier tick from the nearest keyframe before it'''
+		replay = Replay.load(self.path)
+		replay.seek(len(replay))
+
+		replay.seek(20)
+
+		self.assertEqual(replay.tick, 20)
+		self.assertListEqual(replay.body.positions[:len(replay.body)].tolist(), self.recorder.states[20][0])
+		self.assertEqual(sorted(replay.keyframes), list(range(100, len(replay) + 1, 100)))
+		for tick in [len(replay) - 1, 250, 199, 200, 3]:
+			replay.seek(tick)
+			self.assertListEqual(replay.body.positions[:len(replay.body)].tolist(), self.recorder.states[tick][0])
+			self.assertListEqual([tuple(food.position) for food in replay.foods], self.recorder.states[tick][1])
+
+	def test_seeks_forward_from_a_keyframe(self):
+		'''Replay.seek skips ahead to a keyframe it has already played past'''
+		replay = Replay.load(self.path, keyframe_interval=50)
+		replay.seek(len(replay))
+		replay.seek(10)
+		replay.step = None # any stepping would now fail
+
+		replay.seek(150)
+
+		self.assertEqual(replay.tick, 150)
+		self.assertListEqual(replay.body.positions[:len(replay.body)].tolist(), self.recorder.states[150][0])
+
+	def test_renders_frames_without_a_window(self):
+		'''render_frames writes one PNG per rendered tick'''
+		frames_directory = os.path.join(self.directory.name, 'frames')
+
+		paths = render_frames(Replay.load(self.path), frames_directory, every=500)
+
+		self.assertEqual(len(paths), self.result[1] // 500 + 1)
+		self.assertTrue(all(os.path.getsize(path) > 0 for path in paths))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,90 @@
+import random
+import unittest
+import numpy as np
+
+import profiling
+from shared_population import SharedPopulation, genomes_to_rows, row_to_genome, profile_to_array, array_to_profile, score_rows, detach
+from genomes import generate_random_genome
+
+
+def sum_each(genomes):
+	profiling.collected.count("evaluations", len(genomes))
+	return [sum(np.sum(genes) for genes in genome.values()) for genome in genomes]
+
+
+class GenomesToRowsTest(unittest.TestCase):
+	def test_lays_dict_genomes_out_end_to_end(self):
+		'''genomes_to_rows puts each gene after the last, and row_to_genome takes them back apart'''
+		genomes = [generate_random_genome(random.Random(i)) for i in range(3)]
+
+		layout, rows = genomes_to_rows(genomes)
+
+		self.assertListEqual(layout, [("eye_angles", 2), ("w1", 225), ("w2", 75)])
+		self.assertEqual(rows.shape, (3, 302))
+		for row, genome in zip(rows, genomes):
+			self.assertDictEqual({gene: genes.tolist() for gene, genes in row_to_genome(row, layout).items()}, genome)
+
+	def test_lays_gene_lists_out_as_they_are(self):
+		'''flat gene lists are rows as they are'''
+		layout, rows = genomes_to_rows([[1, 2], [3, 4]])
+
+		self.assertListEqual(layout, [(None, 2)])
+		self.assertListEqual(row_to_genome(rows[1], layout).tolist(), [3, 4])
+
+	def test_refuses_genomes_laid_out_differently(self):
+		'''genomes_to_rows gives None for genomes that do not all have the same genes and sizes'''
+		self.assertEqual(genomes_to_rows([[1, 2], [3]]), (None, None))
+		self.assertEqual(genomes_to_rows([{"x": [1]}, {"y": [1]}]), (None, None))
+		self.assertEqual(genomes_to_rows([{"x": [1]}, {"x": [1, 2]}]), (None, None))
+
+
+class SharedPopulationTest(unittest.TestCase):
+	def setUp(self):
+		self.population = SharedPopulation()
+
+	def tearDown(self):
+		detach()
+		self.population.close()
+
+	def test_workers_write_scores_and_profiles_in_place(self):
+		'''score_rows reads the genomes from the shared memory and writes their scores and profile back'''
+		genomes = [{"x": [i, 1.0]} for i in range(6)]
+		self.assertTrue(self.population.write(genomes))
+		profiling.drain()
+
+		for start, stop in [(0, 4), (4, 6)]:
+			score_rows(sum_each, self.population.name, self.population.capacity, self.population.layout, start, stop)
+		self.population.merge_profiles([0, 4])
+
+		self.assertListEqual(self.population.scores.tolist(), [i + 1.0 for i in range(6)])
+		self.assertEqual(profiling.drain().counts["evaluations"], 6)
+
+	def test_grows_for_larger_populations(self):
+		'''SharedPopulation keeps its memory for populations that fit and makes it anew for those that do not'''
+		self.population.write([[1.0, 2.0]] * 4)
+		name = self.population.name
+		self.population.write([[1.0, 2.0]] * 3)
+		self.assertEqual(self.population.name, name)
+
+		self.population.write([[1.0, 2.0, 3.0]] * 5)
+
+		self.assertNotEqual(self.population.name, name)
+		self.assertEqual(self.population.genomes.shape, (5, 3))
+
+	def test_writes_nothing_it_can_not_lay_out(self):
+		'''SharedPopulation.write is false for genomes that are not laid out alike'''
+		self.assertFalse(self.population.write([[1], [2, 3]]))
+		self.assertIsNone(self.population.memory)
+
+
+class ProfileArrayTest(unittest.TestCase):
+	def test_round_trips_a_profile(self):
+		'''profile_to_array and array_to_profile give back the same times and counts'''
+		profile = profiling.Profile()
+		profile.times["look"] = 1.5
+		profile.count("ticks", 7)
+
+		copied = array_to_profile(profile_to_array(profile))
+
+		self.assertDictEqual(copied.times, profile.times)
+		self.assertDictEqual(copied.counts, profile.counts)
@@ -133,6 +133,23 @@ class SnakeLookTest(unittest.TestCase):
 		expected_output = expected_seen_object.visual_encoding + [10]
 		self.assertListEqual(output, expected_output)
 
+	def test_sees_the_same_with_arrays_as_one_object_at_a_time(self):
+		'''with many objects Snake.look measures them all at once, and sees what it sees one at a time, ties and all'''
+		rng = np.random.default_rng(3)
+		self.snake.eye_angles = [0, 0.5, -0.5, 1.5, -1.5]
+		for _ in range(20):
+			self.snake.body.append(Snake.BodyPiece(rng.uniform(-30, 30, 2).tolist()))
+		other_objects = [MockObject(rng.uniform(-30, 30, 2).tolist(), rng.choice([1, 3, 5]), [i, 0]) for i in range(30)]
+		other_objects += [MockObject([0, 12], 3, [-1, 0]), MockObject([0, 12], 3, [-2, 0])]
+
+		for direction in np.linspace(0, 2*np.pi, 50, endpoint=False):
+			self.snake.direction = direction
+			head_position = self.snake.body[0].position
+			objects = other_objects + self.snake.body[2:]
+			expected_output = self.snake.look_at_each(head_position, objects, [o.position for o in objects])
+
+			self.assertListEqual(self.snake.look(other_objects), expected_output)
+
 
 class SnakeDecideTest(unittest.TestCase):
 	def setUp(self):
@@ -345,6 +362,34 @@ class SnakeCheckIfTouchingTailTest(unittest.TestCase):
 
 		self.assertTrue(self.snake.is_alive)
 
+	def test_checks_long_tails_with_find_touching(self):
+		'''long tails are checked with one utils.find_touching call on the positions of the pieces from the third on'''
+		for _ in range(10):
+			self.snake.body.append(Snake.BodyPiece([0,0]))
+		num_tail = len(self.snake.body) - 2
+
+		with patch('utils.find_touching', return_value=np.arange(num_tail) == 3) as mock_find_touching:
+			self.snake.check_if_touching_tail()
+		self.assertFalse(self.snake.is_alive)
+		np.testing.assert_array_equal(mock_find_touching.call_args[0][2], self.snake.body.positions[2:len(self.snake.body)])
+
+		self.snake.is_alive = True
+		with patch('utils.find_touching', return_value=np.zeros(num_tail, dtype=bool)):
+			self.snake.check_if_touching_tail()
+		self.assertTrue(self.snake.is_alive)
+
+	def test_ignores_the_piece_behind_the_head(self):
+		'''only pieces from the third on count, and they count once they are within both sizes of the head'''
+		snake = Snake([0,0], 0)
+		snake.body.append(Snake.BodyPiece([1,0]))
+		snake.body.append(Snake.BodyPiece([10.5,0]))
+		snake.check_if_touching_tail()
+		self.assertTrue(snake.is_alive)
+
+		snake.body.append(Snake.BodyPiece([10,0]))
+		snake.check_if_touching_tail()
+		self.assertFalse(snake.is_alive)
+
 
 class SnakeDrawTest(unittest.TestCase):
 	def setUp(self):
@@ -425,7 +470,54 @@ class SnakeBodyPieceUpdateHistoryTest(unittest.TestCase):
 		self.assertListEqual(self.body_piece.history, init_history + [expected_position])
 
 
+class SnakeBodyTest(unittest.TestCase):
+	def setUp(self):
+		init_position = [0,0]
+		init_direction = 0
+		genome = {"eye_angles": [0.3, 1.2]}
+		self.snake = Snake(init_position, init_direction, genome=genome)
+		self.list_snake = Snake(init_position, init_direction, genome=genome)
+		self.list_snake.body = [Snake.BodyPiece(init_position)]
+
+	def test_follows_the_head_like_a_list_of_body_pieces(self):
+		'''a Snake.Body moves every piece to the same place as a list of Snake.BodyPiece does'''
+		for tick in range(300):
+			for snake in [self.snake, self.list_snake]:
+				snake.turn(0.05 if tick % 40 < 25 else -0.1)
+				snake.move()
+				if tick % 7 == 0 and tick < 200:
+					snake.grow()
+
+		self.assertEqual(len(self.snake.body), len(self.list_snake.body))
+		for piece, list_piece in zip(self.snake.body, self.list_snake.body):
+			self.assertListEqual(piece.position, list_piece.position)
+			self.assertListEqual(piece.history, list_piece.history)
+
+	def test_keeps_at_most_max_history_positions(self):
+		'''a Snake.Body piece's history is a ring of the last max_history positions, oldest first'''
+		head = self.snake.body[0]
+		positions = [[x, 0] for x in range(1, 10)]
+
+		for position in positions:
+			head.move_to(position)
+
+		self.assertListEqual(head.history, positions[-head.max_history:])
+
+	def test_returns_the_same_piece_objects_every_time(self):
+		'''indexing a Snake.Body returns persistent pieces, so they can be tracked by identity'''
+		self.snake.grow()
+
+		self.assertIs(self.snake.body[1], self.snake.body[1])
+		self.assertIs(self.snake.body[1:][0], self.snake.body[1])
+
+	def test_grows_past_its_initial_capacity(self):
+		'''a Snake.Body keeps every piece when it has to reallocate its arrays'''
+		self.snake.body[0].history = [[3,4]]
+		for _ in range(40):
+			self.snake.grow()
 
+		self.assertEqual(len(self.snake.body), 41)
+		self.assertListEqual(self.snake.body[-1].position, [3,4])
 
 
 
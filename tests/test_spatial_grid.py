@@ -0,0 +1,153 @@
+import unittest
+import random
+import numpy as np
+
+from spatial_grid import SpatialGrid
+from snake import Snake
+from board import Board
+from genomes import load_samples
+
+
+class MockObject:
+	def __init__(self, position, size, visual_encoding=[1,1]):
+		self.position = position
+		self.size = size
+		self.visual_encoding = visual_encoding
+
+
+class SpatialGridQueryRadiusTest(unittest.TestCase):
+	def setUp(self):
+		self.grid = SpatialGrid(cell_size=10, slack=2)
+
+	def test_finds_objects_close_to_the_position(self):
+		'''SpatialGrid.query_radius returns every object whose disc comes within the radius of the position'''
+		near = MockObject([12,12], 2)
+		far = MockObject([80,80], 2)
+		self.grid.insert(near)
+		self.grid.insert(far)
+
+		found = self.grid.query_radius([5,5], 5)
+
+		self.assertIn(near, found)
+		self.assertNotIn(far, found)
+
+	def test_does_not_find_removed_objects(self):
+		'''SpatialGrid.remove takes an object out of every cell it was registered in'''
+		obj = MockObject([12,12], 2)
+		self.grid.insert(obj)
+
+		self.grid.remove(obj)
+
+		self.assertListEqual(self.grid.query_radius([12,12], 5), [])
+		self.assertDictEqual(self.grid.cells, {})
+
+	def test_finds_objects_after_they_move(self):
+		'''SpatialGrid.move re-registers an object that has moved away from where it was inserted'''
+		obj = MockObject([12,12], 2)
+		self.grid.insert(obj)
+
+		for x in range(12, 100, 1):
+			obj.position = [x, 12]
+			self.grid.move(obj)
+
+		self.assertIn(obj, self.grid.query_radius([99,12], 1))
+		self.assertNotIn(obj, self.grid.query_radius([12,12], 1))
+
+
+class SpatialGridCastRayTest(unittest.TestCase):
+	def setUp(self):
+		self.grid = SpatialGrid(cell_size=10, slack=0)
+
+	def test_yields_objects_along_the_ray_in_order(self):
+		'''SpatialGrid.cast_ray yields the objects in the cells crossed by the ray, nearest cells first'''
+		objects = [MockObject([x, 5], 1) for x in [45, 25, 85]]
+		for obj in objects:
+			self.grid.insert(obj)
+
+		found = [obj for entry_distance, cell_objects in self.grid.cast_ray([5,5], 0) for obj in cell_objects]
+
+		self.assertListEqual(found, [objects[1], objects[0], objects[2]])
+
+	def test_does_not_yield_objects_off_the_ray(self):
+		'''SpatialGrid.cast_ray does not touch cells the ray never crosses'''
+		self.grid.insert(MockObject([5,45], 1))
+		self.grid.insert(MockObject([-35,5], 1))
+
+		found = list(self.grid.cast_ray([5,5], 0))
+
+		self.assertListEqual(found, [])
+
+
+class SnakeLookWithIndexTest(unittest.TestCase):
+	def test_sees_the_same_objects_as_look(self):
+		'''with a spatial index, Snake.look returns exactly what the linear scan returns'''
+		rng = random.Random(0)
+		objects = [MockObject([rng.uniform(-50,50), rng.uniform(-50,50)], rng.choice([3,5]), visual_encoding=[0,1]) for _ in range(60)]
+		grid = SpatialGrid()
+		snake = Snake([0,0], 0, genome={"eye_angles": [0.4, 1.3]}, spatial_index=grid)
+		for obj in objects:
+			grid.insert(obj)
+
+		for direction in np.linspace(0, 2*np.pi, 40, endpoint=False):
+			snake.direction = direction
+			output = snake.look(objects)
+			snake.spatial_index = None
+			expected_output = snake.look(objects)
+			snake.spatial_index = grid
+
+			self.assertListEqual(output, expected_output)
+
+
+class SnakeUpdateIndexTest(unittest.TestCase):
+	def test_keeps_every_piece_findable_as_the_snake_moves_and_grows(self):
+		'''re-registering only the pieces that drifted keeps every piece in the cells around it'''
+		grid = SpatialGrid()
+		snake = Snake([0,0], 0, genome={"eye_angles": [0.4, 1.3]}, spatial_index=grid)
+
+		for tick in range(300):
+			if tick % 10 == 0:
+				snake.grow()
+			snake.turn(0.03)
+			snake.move()
+			for piece in snake.body:
+				self.assertIn(id(piece), {id(o) for o in grid.query_radius(piece.position, 0)})
+
+		self.assertEqual(len(grid), len(snake.body))
+
+
+class BoardWithSpatialIndexRunTest(unittest.TestCase):
+	def test_matches_board_run_without_the_index(self):
+		'''Board.run returns the same results with and without use_spatial_index'''
+		rng = random.Random(2)
+		for _ in range(10):
+			genome = {
+				"eye_angles": [rng.random() * np.pi for _ in range(2)],
+				"w1": [rng.random() * 200 - 100 for _ in range(15 * 15)],
+				"w2": [rng.random() * 200 - 100 for _ in range(5 * 15)]
+			}
+			board_params = {"width": 400, "height": 300, "num_food": 25, "seed": 7, "animation_on": False}
+			run_params = {"time_limit": 200, "time_bonus": 100, "max_time": 500}
+
+			expected_result = Board(snake_genome=genome, **board_params).run(**run_params)
+			result = Board(snake_genome=genome, use_spatial_index=SpatialGrid(min_foods=0, foods_per_piece=0), **board_params).run(**run_params)
+
+			self.assertEqual(result, expected_result)
+
+	def test_keeps_the_index_only_while_it_pays_off(self):
+		'''a Board only indexes many foods, and drops the index once the body outgrows it'''
+		self.assertIsNone(Board(400, 300, snake_genome=load_samples()[0], num_food=25, use_spatial_index=True, animation_on=False).spatial_index)
+		genome = load_samples()[1]
+		board_params = {"width": 200, "height": 150, "num_food": 100, "seed": 3, "animation_on": False}
+		board = Board(snake_genome=genome, use_spatial_index=SpatialGrid(min_foods=100, foods_per_piece=20), **board_params)
+		self.assertIsNotNone(board.spatial_index)
+
+		result = board.run(time_limit=300, max_time=300)
+
+		self.assertGreater(result[0], 5)
+		self.assertIsNone(board.spatial_index)
+		self.assertIsNone(board.snake.spatial_index)
+		self.assertEqual(result, Board(snake_genome=genome, **board_params).run(time_limit=300, max_time=300))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import random
+
+import tick_kernel
+from board import Board
+from genomes import load_samples, mutate
+
+
+class TickKernelTest(unittest.TestCase):
+	def assertMatchesBoard(self, genome, board_params, run_params, compiled=True):
+		expected = Board(snake_genome=genome, animation_on=False, **board_params).run(**run_params)
+		self.assertTupleEqual(tick_kernel.run(snake_genome=genome, compiled=compiled, **board_params, **run_params), expected)
+
+	def test_plays_the_same_episodes_as_board_on_the_samples(self):
+		'''tick_kernel.run gives Board.run's result for the sample genomes'''
+		for genome in load_samples():
+			for seed in [1, 2, 98]:
+				for num_food in [1, 5, 25]:
+					board_params = {"width": 400, "height": 300, "num_food": num_food, "seed": seed}
+					self.assertMatchesBoard(genome, board_params, {"time_limit": 2000, "max_time": 2000})
+
+	def test_plays_the_same_episodes_as_board_on_mutated_samples(self):
+		'''tick_kernel.run gives Board.run's result for mutants of the samples, including ones that die'''
+		rng = random.Random(4)
+		samples = load_samples()
+		for _ in range(20):
+			board_params = {"width": 200, "height": 150, "num_food": rng.choice([1, 3]), "seed": rng.randrange(1000)}
+			self.assertMatchesBoard(mutate(rng.choice(samples), rng), board_params, {"time_limit": 200, "time_bonus": 100, "max_time": 1000})
+
+	def test_the_python_fallback_plays_the_same_episodes(self):
+		'''the uncompiled kernel gives the same results'''
+		for genome in load_samples():
+			self.assertMatchesBoard(genome, {"width": 200, "height": 150, "num_food": 1, "seed": 98}, {"time_limit": 200, "time_bonus": 100, "max_time": 1000}, compiled=False)
+
+	def test_gives_random_brains_the_boards_weights(self):
+		'''a genome without weights gets the same random brain as on a Board with that seed'''
+		self.assertMatchesBoard({"eye_angles": [0.5, 1]}, {"width": 200, "height": 150, "num_food": 3, "seed": 5}, {"time_limit": 300})
+
+	def test_snakes_with_invalid_eye_angles_die_at_once(self):
+		'''eye angles above pi kill the snake before it moves, as on a Board'''
+		self.assertTupleEqual(tick_kernel.run(200, 150, {"eye_angles": [4, 1]}), (1, 0, False))
+
+	def test_computes_more_food_when_it_runs_out(self):
+		'''an episode that eats more food than was computed ahead is played again with more'''
+		genome = load_samples()[0]
+		board_params = {"width": 400, "height": 300, "num_food": 25, "seed": 1}
+		expected = Board(snake_genome=genome, animation_on=False, **board_params).run(time_limit=2000)
+
+		result = tick_kernel.run(snake_genome=genome, time_limit=2000, num_foods=1, **board_params)
+
+		self.assertGreater(expected[0], 2)
+		self.assertTupleEqual(result, expected)
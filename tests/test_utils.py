@@ -75,5 +75,46 @@ class AreTouchingTest(unittest.TestCase):
 			self.assertFalse(output)
 
 
+class ArrayGeometryTest(unittest.TestCase):
+	def setUp(self):
+		rng = np.random.default_rng(0)
+		self.origins = rng.uniform(-50, 50, (4, 2))
+		self.points = rng.uniform(-50, 50, (7, 2))
+
+	def test_calc_distances_matches_calc_distance(self):
+		'''utils.calc_distances gives calc_distance's distances from one origin, and from each of several'''
+		expected = [[utils.calc_distance(origin, point) for point in self.points.tolist()] for origin in self.origins.tolist()]
+
+		self.assertListEqual(utils.calc_distances(self.origins[0], self.points).tolist(), expected[0])
+		self.assertListEqual(utils.calc_distances(self.origins, self.points[None]).tolist(), expected)
+
+	def test_calc_angles_are_between_zero_and_two_pi(self):
+		'''utils.calc_angles wraps angles into [0, 2pi) like calc_angle'''
+		angles = utils.calc_angles(self.origins, self.points[None])
+		expected = [[utils.calc_angle(origin, point) for point in self.points.tolist()] for origin in self.origins.tolist()]
+
+		self.assertTrue(((angles >= 0) & (angles < 2*np.pi)).all())
+		np.testing.assert_allclose(angles, expected, rtol=0, atol=1e-12)
+		self.assertEqual(utils.calc_angles([0,0], [[1,-1e-300]])[0], 0)
+		self.assertEqual(utils.calc_angle([0,0], [1,-1e-300]), 0)
+
+	def test_each_origin_can_have_its_own_points(self):
+		'''points shaped (N, M, 2) are measured from their own row's origin'''
+		points = np.stack([self.points + i for i in range(len(self.origins))])
+
+		distances = utils.calc_distances(self.origins, points)
+
+		for i, origin in enumerate(self.origins):
+			self.assertListEqual(distances[i].tolist(), utils.calc_distances(origin, points[i]).tolist())
+
+	def test_find_touching_matches_are_touching(self):
+		'''utils.find_touching marks the points within both sizes of the origin'''
+		sizes = np.array([1, 2, 3, 5, 10, 20, 40], dtype=float)
+		expected = [utils.are_touching(MockObject(self.origins[0].tolist(), 5), MockObject(point, size)) for point, size in zip(self.points.tolist(), sizes)]
+
+		self.assertListEqual(utils.find_touching(self.origins[0], 5, self.points, sizes).tolist(), expected)
+		self.assertEqual(utils.find_touching([0,0], 5, [[8,0], [8.01,0]], 3).tolist(), [True, False])
+
+
 if __name__ == '__main__':
 	unittest.main()
\ No newline at end of file
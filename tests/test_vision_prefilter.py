@@ -0,0 +1,77 @@
+import unittest
+import random
+import numpy as np
+
+from vision_prefilter import VisionPrefilter
+from board import Board
+from food import Food
+
+
+class VisionPrefilterFindCandidatesTest(unittest.TestCase):
+	def setUp(self):
+		self.prefilter = VisionPrefilter()
+		self.head_position = [100, 100]
+
+	def test_drops_objects_outside_every_view_cone(self):
+		'''find_candidates only keeps objects an eye's view angle passes through'''
+		foods = [Food((150, 100)), Food((100, 150)), Food((50, 100)), Food((150, 101))]
+
+		candidates = self.prefilter.find_candidates(self.head_position, foods, np.empty((0, 2)), 5, [0, np.pi])
+
+		self.assertListEqual(candidates.tolist(), [0, 2, 3])
+
+	def test_keeps_objects_the_head_is_inside_of(self):
+		'''find_candidates keeps objects closer to the head than their size, which every eye sees'''
+		candidates = self.prefilter.find_candidates(self.head_position, [], np.array([[100, 103], [100, 200]]), 5, [0])
+
+		self.assertListEqual(candidates.tolist(), [0])
+
+	def test_keeps_objects_on_either_side_of_angle_zero(self):
+		'''find_candidates does not lose objects whose angle wraps around 2pi'''
+		# just below the head's y the angle is a hair under 2pi, far from a view angle of 0
+		foods = [Food((150, 100 - 1e-13), size=1e-9), Food((150, 100 + 1e-13), size=1e-9)]
+
+		candidates = self.prefilter.find_candidates(self.head_position, foods, np.empty((0, 2)), 5, [0])
+
+		self.assertListEqual(candidates.tolist(), [0, 1])
+
+	def test_rebuilds_food_arrays_only_when_the_foods_change(self):
+		'''the food positions are kept until the list holds different foods'''
+		foods = [Food((1, 2)), Food((3, 4))]
+		self.prefilter.update_foods(foods)
+		food_positions = self.prefilter.food_positions
+
+		self.prefilter.update_foods(list(foods))
+		self.assertIs(self.prefilter.food_positions, food_positions)
+
+		self.prefilter.update_foods([foods[0], Food((5, 6))])
+		self.assertListEqual(self.prefilter.food_positions.tolist(), [[1, 2], [5, 6]])
+
+
+class SnakeLookWithVisionPrefilterTest(unittest.TestCase):
+	def test_sees_the_same_as_a_plain_scan(self):
+		'''Snake.look gives the same result with and without a vision prefilter'''
+		rng = random.Random(5)
+		for trial in range(10):
+			genome = {
+				"eye_angles": [rng.random() * 3, rng.random() * 3],
+				"w1": [rng.random() * 20 - 10 for _ in range(15 * 15)],
+				"w2": [rng.random() * 20 - 10 for _ in range(5 * 15)]
+			}
+			board = Board(300, 200, snake_genome=genome, num_food=40, seed=trial, animation_on=False)
+			snake = board.snake
+			for _ in range(30):
+				snake.grow()
+			prefilter = VisionPrefilter(min_objects=0)
+
+			for _ in range(100):
+				if not snake.is_alive: break
+				snake.vision_prefilter = None
+				scanned = snake.look(board.foods)
+				snake.vision_prefilter = prefilter
+				self.assertListEqual(snake.look(board.foods), scanned)
+				board.update()
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,187 @@
+import sys
+import math
+import numpy as np
+
+from snake import Snake, SNAKE_SPEED, BODY_PIECE_SIZE
+from food import Food
+from brain_config import DEFAULT_BRAIN_CONFIG
+from food_sequence import FoodSequence
+
+try:
+	from numba import njit
+except ImportError:
+	njit = None
+
+MAX_HISTORY = int(BODY_PIECE_SIZE * 2 / SNAKE_SPEED)
+FOOD_SIZE = Food((0, 0)).size
+RAN_OUT_OF_FOOD = -1
+# exp overflows above this; the sigmoid is then 0, as numpy's gives
+MAX_EXP = math.log(sys.float_info.max)
+
+
+def run_episode(width, height, eye_angles, turns, food_encoding, body_encoding, w1, w2, food_positions, num_food, time_limit, time_bonus, max_time):
+	# One Board.run on flat arrays: look, decide, act, move, check the tail and eat until
+	# the snake dies or runs out of time. The body follows the head through per-piece
+	# ring buffers of past positions, as Snake.Body does. turns is the angle each decision
+	# turns by and food_encoding and body_encoding what an eye shows the brain before the
+	# distance, as a BrainConfig gives them. food_positions is the board's food sequence;
+	# if the snake needs more food than it holds, time_passed comes back as
+	# RAN_OUT_OF_FOOD. The geometry is utils' geometry.
+	capacity = 1 + len(food_positions) - num_food
+	positions = np.zeros((capacity, 2))
+	history = np.zeros((capacity, MAX_HISTORY, 2))
+	history_start = np.zeros(capacity, dtype=np.int64)
+	history_count = np.zeros(capacity, dtype=np.int64)
+	length = 1
+	positions[0, 0], positions[0, 1] = width / 2, height / 2
+	history[0, 0] = positions[0]
+	history_count[0] = 1
+
+	foods = np.zeros((num_food, 2))
+	foods[:] = food_positions[:num_food]
+	num_foods_used = num_food
+
+	direction = 0.0
+	num_objects_max = num_food + capacity
+	object_positions = np.zeros((num_objects_max, 2))
+	num_eyes = len(eye_angles)
+	encoding_width = len(food_encoding) + 1
+	vision = np.zeros(num_eyes * encoding_width)
+	seen = np.zeros(num_eyes, dtype=np.bool_)
+	hidden = np.zeros(w1.shape[0])
+	output = np.zeros(w2.shape[0])
+	body_reach = BODY_PIECE_SIZE + BODY_PIECE_SIZE
+	food_reach = BODY_PIECE_SIZE + FOOD_SIZE
+
+	# the genome's own angles are the eyes at 1, 3, 5...
+	for i in range(1, num_eyes, 2):
+		if eye_angles[i] > np.pi:
+			return length, 0, False
+
+	is_alive = True
+	time_passed = 0
+	while is_alive and time_passed < min(time_limit, max_time):
+		# look: foods first, then the body from the third piece on; the later of two
+		# equally close objects wins, as in Snake.look
+		head_x, head_y = positions[0, 0], positions[0, 1]
+		num_objects = num_food + max(length - 2, 0)
+		object_positions[:num_food] = foods
+		object_positions[num_food:num_objects] = positions[2:length]
+		vision[:] = 0
+		seen[:] = False
+		for k in range(num_objects):
+			dx = object_positions[k, 0] - head_x
+			dy = object_positions[k, 1] - head_y
+			distance = math.sqrt(dx*dx + dy*dy)
+			angle = math.atan2(dy, dx) % (2*np.pi)
+			if angle >= 2*np.pi:
+				angle = 0.0
+			is_food = k < num_food
+			size = FOOD_SIZE if is_food else BODY_PIECE_SIZE
+			view_angle_freedom = math.asin(size / distance) if distance >= size else 2*np.pi
+			for i in range(num_eyes):
+				start = encoding_width * i
+				if seen[i] and distance > vision[start + encoding_width - 1]:
+					continue
+				view_angle = (eye_angles[i] + direction) % (2*np.pi)
+				if abs(view_angle - angle) <= view_angle_freedom:
+					for j in range(encoding_width - 1):
+						vision[start + j] = food_encoding[j] if is_food else body_encoding[j]
+					vision[start + encoding_width - 1] = distance
+					seen[i] = True
+
+		# decide
+		for i in range(w1.shape[0]):
+			total = 0.0
+			for j in range(w1.shape[1]):
+				total += w1[i, j] * vision[j]
+			hidden[i] = 0.0 if -total > MAX_EXP else 1 / (1 + math.exp(-total))
+		decision = 0
+		for i in range(w2.shape[0]):
+			total = 0.0
+			for j in range(w2.shape[1]):
+				total += w2[i, j] * hidden[j]
+			output[i] = 0.0 if -total > MAX_EXP else 1 / (1 + math.exp(-total))
+			if output[i] > output[decision]:
+				decision = i
+
+		# act
+		if turns[decision] != 0:
+			direction = (direction + turns[decision]) % (2*np.pi)
+
+		# move: each piece moves to the oldest position in the history of the piece
+		# before it, after that piece has moved
+		positions[0, 0] = head_x + SNAKE_SPEED * math.cos(direction)
+		positions[0, 1] = head_y + SNAKE_SPEED * math.sin(direction)
+		for i in range(length):
+			if i > 0:
+				positions[i] = history[i - 1, history_start[i - 1]]
+			if history_count[i] < MAX_HISTORY:
+				history[i, (history_start[i] + history_count[i]) % MAX_HISTORY] = positions[i]
+				history_count[i] += 1
+			else:
+				history[i, history_start[i]] = positions[i]
+				history_start[i] = (history_start[i] + 1) % MAX_HISTORY
+
+		# check the tail
+		head_x, head_y = positions[0, 0], positions[0, 1]
+		for i in range(2, length):
+			dx = positions[i, 0] - head_x
+			dy = positions[i, 1] - head_y
+			if math.sqrt(dx*dx + dy*dy) <= body_reach:
+				is_alive = False
+				break
+
+		# eat: uneaten food keeps its order and new food is appended, as in Board.update
+		num_left = 0
+		for f in range(num_food):
+			dx = foods[f, 0] - head_x
+			dy = foods[f, 1] - head_y
+			if math.sqrt(dx*dx + dy*dy) <= food_reach:
+				new_piece = history[length - 1, history_start[length - 1]]
+				positions[length] = new_piece
+				history[length, 0] = new_piece
+				history_start[length] = 0
+				history_count[length] = 1
+				length += 1
+			else:
+				foods[num_left] = foods[f]
+				num_left += 1
+		num_eaten = num_food - num_left
+		if num_eaten:
+			if num_foods_used + num_eaten > len(food_positions):
+				return length, RAN_OUT_OF_FOOD, is_alive
+			foods[num_left:] = food_positions[num_foods_used:num_foods_used + num_eaten]
+			num_foods_used += num_eaten
+			time_limit += num_eaten * time_bonus
+
+		time_passed += 1
+
+	return length, time_passed, is_alive
+
+compiled_run_episode = njit(cache=True)(run_episode) if njit is not None else None
+
+
+def run(width, height, snake_genome, num_food=1, seed=2188357, time_limit=np.inf, time_bonus=0, max_time=np.inf, num_foods=64, compiled=True, brain_config=DEFAULT_BRAIN_CONFIG):
+	# Board(width, height, snake_genome, num_food, seed, animation_on=False).run(time_limit,
+	# time_bonus, max_time), in one call to the kernel; compiled with numba when it is
+	# installed, plain Python otherwise. If the snake eats through the num_foods food
+	# positions computed ahead, the episode is played again with twice as many.
+	eye_angles = np.array(brain_config.eye_angles(snake_genome["eye_angles"]), dtype=float)
+	turns = np.array(brain_config.turn_angles(snake_genome["eye_angles"]), dtype=float)
+	food_encoding = np.array(brain_config.encode(Food((0, 0)).visual_encoding), dtype=float)
+	body_encoding = np.array(brain_config.encode(Snake.BodyPiece([0, 0]).visual_encoding), dtype=float)
+	brain = Snake.Brain([snake_genome.get("w1", []), snake_genome.get("w2", [])], np.random.default_rng(seed), brain_config.dimensions)
+	w1, w2 = [np.ascontiguousarray(layer, dtype=float) for layer in brain.layers]
+	kernel = compiled_run_episode if compiled and compiled_run_episode is not None else run_episode
+
+	food_sequence = FoodSequence(width, height, seed)
+	while True:
+		food_positions = food_sequence.precompute(num_food + num_foods)
+		length, time_passed, is_alive = kernel(
+			float(width), float(height), eye_angles, turns, food_encoding, body_encoding, w1, w2,
+			food_positions, num_food, float(time_limit), float(time_bonus), float(max_time)
+		)
+		if time_passed != RAN_OUT_OF_FOOD:
+			return int(length), int(time_passed), bool(is_alive)
+		num_foods *= 2
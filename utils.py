@@ -4,14 +4,46 @@ import numpy as np
 def calc_distance(a, b):
 	dx = b[0] - a[0]
 	dy = b[1] - a[1]
-	return math.sqrt(dx**2 + dy**2)
+	return math.sqrt(dx*dx + dy*dy)
 
 def calc_angle(a, b):
 	dx = b[0] - a[0]
 	dy = b[1] - a[1]
-	return math.atan2(dy, dx) % (2*np.pi)
+	angle = math.atan2(dy, dx) % (2*np.pi)
+	# angles a hair below 0 round up to 2pi exactly; that is 0 as well
+	return angle if angle < 2*np.pi else 0.0
 
 def are_touching(a, b):
 	distance = calc_distance(a.position, b.position)
 	min_touching_distance = a.size + b.size
-	return distance <= min_touching_distance
\ No newline at end of file
+	return distance <= min_touching_distance
+
+# fewer points than this are quicker to handle one at a time than with the array versions
+MIN_ARRAY_POINTS = 8
+
+# Array versions. origins is one point (2,) or N points (N, 2), and points has one more
+# axis than origins: M points (M, 2) from one origin give M results, and (N, M, 2)
+# points give N rows of M results, each row from its own origin. N origins to the same
+# M points is points[None]. Distances come out exactly as calc_distance's do; numpy's
+# arctan2 and arcsin can differ from math's in the last bit.
+
+def calc_deltas(origins, points):
+	origins = np.asarray(origins, dtype=float)
+	points = np.asarray(points, dtype=float)
+	return points[..., 0] - origins[..., None, 0], points[..., 1] - origins[..., None, 1]
+
+def calc_distances(origins, points):
+	dx, dy = calc_deltas(origins, points)
+	return np.sqrt(dx*dx + dy*dy)
+
+def calc_angles(origins, points):
+	# in [0, 2pi), like calc_angle. Differences between these angles are not wrapped
+	# around 2pi anywhere they are compared; see Snake.look.
+	dx, dy = calc_deltas(origins, points)
+	angles = np.arctan2(dy, dx) % (2*np.pi)
+	return np.where(angles < 2*np.pi, angles, 0.0)
+
+def find_touching(origins, origin_sizes, points, sizes):
+	# which points are touching their origin, as are_touching decides it for objects
+	origin_sizes = np.asarray(origin_sizes, dtype=float)
+	return calc_distances(origins, points) <= origin_sizes[..., None] + sizes
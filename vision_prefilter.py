@@ -0,0 +1,45 @@
+import numpy as np
+
+
+class VisionPrefilter:
+	# Narrows down the objects Snake.look has to check exactly. The foods' positions and
+	# sizes are kept in arrays that are only rebuilt when the foods change (the body
+	# positions already live in an array). An object can only be seen by an eye whose
+	# ray passes within its size of it, in front of the head, or if the head is inside
+	# it; that is tested for every eye and object at once with dot and cross products,
+	# without any trig or square roots, and the objects no eye could see are dropped.
+	# look then checks the rest as before, so the result is the same. The test is widened
+	# by margin so rounding never drops an object look would see.
+	def __init__(self, min_objects=256, margin=1e-9):
+		self.min_objects = min_objects # below this the plain scan is quicker, see benchmarks/bench_vision.py
+		self.margin = margin
+		self.foods = ()
+		self.food_positions = np.empty((0, 2))
+		self.food_sizes = np.empty(0)
+
+	def update_foods(self, foods):
+		# holding on to the foods keeps their ids from being reused while cached
+		if len(foods) == len(self.foods) and all(map(lambda a, b: a is b, foods, self.foods)):
+			return
+		self.foods = tuple(foods)
+		self.food_positions = np.array([food.position for food in foods], dtype=float).reshape(-1, 2)
+		self.food_sizes = np.array([food.size for food in foods], dtype=float)
+
+	def find_candidates(self, head_position, foods, body_positions, body_size, view_angles):
+		# indices into foods + body pieces of the objects that may be seen, in order
+		self.update_foods(foods)
+		positions = np.concatenate([self.food_positions, body_positions])
+		sizes = np.concatenate([self.food_sizes, np.full(len(body_positions), float(body_size))])
+
+		dx = positions[:, 0] - head_position[0]
+		dy = positions[:, 1] - head_position[1]
+		# at least the distance, to scale the margin by
+		reach = np.abs(dx) + np.abs(dy)
+		slack = self.margin * (reach + sizes)
+		inside = dx*dx + dy*dy <= (sizes + slack) ** 2
+
+		view_angles = np.asarray(view_angles, dtype=float)[:, None]
+		eye_x, eye_y = np.cos(view_angles), np.sin(view_angles)
+		in_front = eye_x * dx + eye_y * dy >= -slack
+		near_ray = np.abs(eye_x * dy - eye_y * dx) <= sizes + slack
+		return np.flatnonzero(inside | (in_front & near_ray).any(axis=0))